@@ -0,0 +1,109 @@
+"""
+Alpha-pyramid padding: time, memory and output vs the LayerDiffuse reference.
+
+Runs LayerDiffuseProcessor.pad_rgb_with_alpha (power-of-two pyramid) and the
+reference LayerDiffuse padding (factor 1.2 pyramid) on one RGBA image or a
+synthetic soft-edged sprite, and prints the time, pyramid levels and size,
+peak traced memory, and the difference between the two outputs.
+
+Usage:
+    python bench_alpha_pyramid.py [image_path | size]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.core.layerdiffuse_remover import LayerDiffuseProcessor
+
+
+def make_sprite(size: int) -> np.ndarray:
+    """Soft-edged disc with a colour gradient on a fully transparent background."""
+    yy, xx = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    rgba = np.zeros((size, size, 4), np.uint8)
+    rgba[..., 0] = xx * 255
+    rgba[..., 1] = yy * 255
+    rgba[..., 2] = 128
+    dist = np.hypot(xx - 0.5, yy - 0.5)
+    rgba[..., 3] = np.clip((0.3 - dist) * 20, 0, 1) * 255
+    return rgba
+
+
+def reference_pad(np_rgba_hwc_uint8: np.ndarray, dk: float = 1.2):
+    """The original LayerDiffuse padding: factor 1.2 pyramid, out-of-place ops."""
+    np_rgba_hwc = np_rgba_hwc_uint8.astype(np.float32) / 255.0
+    current_c = np_rgba_hwc[..., :3] * np_rgba_hwc[..., 3:]
+    current_a = np_rgba_hwc[..., 3:]
+    pyramid = []
+    while True:
+        pyramid.append((current_c, current_a))
+        H, W, _ = current_a.shape
+        if min(H, W) <= 1:
+            break
+        current_c = cv2.resize(current_c, (int(W / dk), int(H / dk)), interpolation=cv2.INTER_AREA)
+        current_a = cv2.resize(current_a, (int(W / dk), int(H / dk)), interpolation=cv2.INTER_AREA)[:, :, None]
+    pyramid = pyramid[::-1]
+
+    top_c, top_a = pyramid[0]
+    fg = np.sum(top_c, axis=(0, 1), keepdims=True) / np.sum(top_a, axis=(0, 1), keepdims=True).clip(1e-8, 1e32)
+    for layer_c, layer_a in pyramid:
+        layer_h, layer_w, _ = layer_c.shape
+        fg = cv2.resize(fg, (layer_w, layer_h), interpolation=cv2.INTER_LINEAR)
+        fg = layer_c + fg * (1.0 - layer_a)
+    return fg, pyramid
+
+
+def measure(fn, *args):
+    """Return (result, seconds, peak traced MB) of fn(*args)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def pyramid_mb(pyramid) -> float:
+    return sum(c.nbytes + a.nbytes for c, a in pyramid) / 2**20
+
+
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else "4096"
+    if arg.isdigit():
+        rgba = make_sprite(int(arg))
+        label = f"synthetic sprite {arg}x{arg}"
+    else:
+        rgba = np.asarray(Image.open(arg).convert('RGBA'))
+        label = arg
+
+    processor = LayerDiffuseProcessor()
+    color = rgba[..., :3].astype(np.float32) / 255.0
+    alpha = rgba[..., 3:].astype(np.float32) / 255.0
+    new_pyramid = processor.build_alpha_pyramid(color, alpha)
+    del color, alpha
+
+    (ref_out, ref_pyramid), ref_time, ref_peak = measure(reference_pad, rgba)
+    new_out, new_time, new_peak = measure(processor.pad_rgb_with_alpha, rgba)
+
+    print(f"Image: {label}, {rgba.shape[1]}x{rgba.shape[0]}")
+    print(f"{'Method':<18} {'Time ms':>9} {'Levels':>7} {'Pyramid MB':>11} {'Peak MB':>9}")
+    print(f"{'reference (1.2x)':<18} {ref_time * 1000:9.1f} {len(ref_pyramid):7d} "
+          f"{pyramid_mb(ref_pyramid):11.1f} {ref_peak:9.1f}")
+    print(f"{'pyramid (2x)':<18} {new_time * 1000:9.1f} {len(new_pyramid):7d} "
+          f"{pyramid_mb(new_pyramid):11.1f} {new_peak:9.1f}")
+
+    # Opaque pixels must match exactly; transparent fill may differ slightly
+    diff = np.abs(new_out - ref_out) * 255
+    a = rgba[..., 3]
+    print(f"Max diff, opaque pixels:      {diff[a == 255].max(initial=0):.3f} / 255")
+    print(f"Mean diff, translucent pixels: {diff[(a > 0) & (a < 255)].mean():.3f} / 255")
+    print(f"Mean diff, transparent pixels: {diff[a == 0].mean():.3f} / 255")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from .interfaces import BackgroundRemover, AdvancedBackgroundRemover, Background
 from .removers import InspyrenetRemover, LayerDiffuseRemover
 from .factory import RemoverFactory, RemoverManager, RemoverType
 from .processor import ProcessingEngine, ProcessingStats
+from .manifest import CompletedManifest, FileJob
 
 __all__ = [
     'BackgroundRemover',
@@ -18,4 +19,6 @@ __all__ = [
     'RemoverType',
     'ProcessingEngine',
     'ProcessingStats',
+    'CompletedManifest',
+    'FileJob',
 ]
\ No newline at end of file
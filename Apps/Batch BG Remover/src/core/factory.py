@@ -8,6 +8,8 @@ from typing import Dict, Type, Optional, List
 from enum import Enum
 import logging
 
+from PIL import Image
+
 from .interfaces import BackgroundRemover
 from .removers import InspyrenetRemover, LayerDiffuseRemover
 
@@ -143,6 +145,42 @@ class RemoverManager:
         
         raise RuntimeError("No available background removers")
     
+    def remove_background_image(self, image: Image.Image, prefer_primary: bool = True) -> Image.Image:
+        """
+        Remove background from a decoded image with automatic fallback.
+        
+        Same as remove_background, but takes and returns PIL Images so
+        callers serialize only once.
+        
+        Args:
+            image: Input PIL Image
+            prefer_primary: Whether to try primary remover first
+            
+        Returns:
+            RGBA image with transparent background
+            
+        Raises:
+            RuntimeError: If no removers are available
+        """
+        if prefer_primary and self._primary_remover and self._primary_remover.is_available():
+            try:
+                self._logger.debug(f"Using primary remover: {self.primary_type.value}")
+                return self._primary_remover.remove_background_image(image)
+            except Exception as e:
+                self._logger.warning(f"Primary remover failed: {e}")
+                # Fall through to fallback
+        
+        # Try fallback remover
+        if self._fallback_remover and self._fallback_remover.is_available():
+            try:
+                self._logger.debug(f"Using fallback remover: {self.fallback_type.value}")
+                return self._fallback_remover.remove_background_image(image)
+            except Exception as e:
+                self._logger.error(f"Fallback remover also failed: {e}")
+                raise RuntimeError("All background removers failed") from e
+        
+        raise RuntimeError("No available background removers")
+    
     def get_active_remover_info(self) -> Dict:
         """Get information about the currently active remover."""
         if self._primary_remover and self._primary_remover.is_available():
@@ -164,12 +202,20 @@ class RemoverManager:
         """
         Switch to a different primary remover.
         
+        Switching to the current type without new arguments is a no-op.
+        The new remover's model starts loading in the background before the
+        old remover is cleaned up, so a model both use stays in the pool.
+        
         Args:
             new_primary: New primary remover type
             **kwargs: Arguments for the new remover
         """
+        if new_primary == self.primary_type and not kwargs and self._primary_remover:
+            return
+        
         try:
             new_remover = RemoverFactory.create_remover(new_primary, **kwargs)
+            new_remover.warm_up()
             
             # Clean up old primary
             if self._primary_remover:
@@ -184,6 +230,15 @@ class RemoverManager:
             self._logger.error(f"Failed to switch primary remover: {e}")
             raise
     
+    def warm_up(self):
+        """Start loading the primary and fallback models in the background."""
+        for remover in (self._primary_remover, self._fallback_remover):
+            if remover:
+                try:
+                    remover.warm_up()
+                except Exception as e:
+                    self._logger.warning(f"Warm-up failed: {e}")
+    
     def configure_remover(self, remover_type: RemoverType, **kwargs) -> bool:
         """
         Configure a specific remover.
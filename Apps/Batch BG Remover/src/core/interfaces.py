@@ -34,6 +34,25 @@ class BackgroundRemover(ABC):
         """
         pass
     
+    def remove_background_image(self, image: Image.Image) -> Image.Image:
+        """
+        Remove background from a decoded image, without PNG serialization.
+        
+        The default implementation round-trips through remove_background;
+        removers that work on images natively override it.
+        
+        Args:
+            image: Input PIL Image
+            
+        Returns:
+            RGBA PIL Image with transparent background
+            
+        Raises:
+            BackgroundRemovalError: If processing fails
+        """
+        result_data = self.remove_background(image_to_bytes(image, format='PNG'))
+        return load_image_from_bytes(result_data).convert('RGBA')
+    
     @abstractmethod
     def configure(self, **kwargs) -> bool:
         """
@@ -66,6 +85,10 @@ class BackgroundRemover(ABC):
         """
         return True
     
+    def warm_up(self):
+        """Start loading models in the background so the first image is fast."""
+        pass
+    
     def cleanup(self):
         """Clean up resources if needed."""
         pass
@@ -92,6 +115,20 @@ class AdvancedBackgroundRemover(BackgroundRemover):
         """
         pass
     
+    def remove_image_with_material_type(self, image: Image.Image, material_hint: str = "general") -> Image.Image:
+        """
+        Material-specific removal on a decoded image, without PNG serialization.
+        
+        Args:
+            image: Input PIL Image
+            material_hint: Type of material ("glass", "transparent", "solid", "general")
+            
+        Returns:
+            RGBA PIL Image with advanced transparency handling
+        """
+        result_data = self.remove_with_material_type(image_to_bytes(image, format='PNG'), material_hint)
+        return load_image_from_bytes(result_data).convert('RGBA')
+    
     @abstractmethod
     def get_supported_materials(self) -> list[str]:
         """Get list of supported material types."""
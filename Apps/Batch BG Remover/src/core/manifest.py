@@ -0,0 +1,98 @@
+"""
+Completed-Output Manifest
+SOLID: Single Responsibility - only tracks which outputs are done
+KISS: Append-only JSON lines file next to the outputs
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+
+@dataclass
+class FileJob:
+    """One input image to process, with its output path and manifest."""
+    input_path: Path
+    output_path: Path
+    label: str
+    manifest: "CompletedManifest"
+
+
+class CompletedManifest:
+    """
+    Record of completed outputs for one output folder, used to resume runs.
+
+    Each completed file appends one JSON line (input name, input size and
+    mtime, output name) to FILENAME in the output folder, so an interrupted
+    run loses at most the line being written. On load, the output folder is
+    listed once; a job counts as completed when its output is in that
+    listing and the recorded input signature still matches (or the output
+    predates the manifest). Modified inputs and deleted outputs are redone.
+    """
+
+    FILENAME = ".bg_remover_completed.jsonl"
+
+    def __init__(self, output_folder: Path):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.output_folder = Path(output_folder)
+        self.path = self.output_folder / self.FILENAME
+        self._records: Dict[str, Tuple[int, int]] = {}
+        self._outputs: Set[str] = set()
+        self._load()
+
+    def _load(self):
+        """Read the manifest and list the output folder once."""
+        if not self.output_folder.is_dir():
+            return
+
+        self._outputs = {p.name for p in self.output_folder.iterdir()}
+
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                            self._records[entry['input']] = (entry['size'], entry['mtime_ns'])
+                        except (ValueError, KeyError):
+                            continue  # Skip a torn or foreign line
+            except OSError as e:
+                self._logger.warning(f"Could not read manifest {self.path}: {e}")
+
+    @staticmethod
+    def _signature(input_path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = input_path.stat()
+            return stat.st_size, stat.st_mtime_ns
+        except OSError:
+            return None
+
+    def is_completed(self, input_path: Path, output_path: Path) -> bool:
+        """Return True if output_path is already up to date for input_path."""
+        if output_path.name not in self._outputs:
+            return False
+
+        record = self._records.get(input_path.name)
+        return record is None or record == self._signature(input_path)
+
+    def mark_completed(self, input_path: Path, output_path: Path):
+        """Record that output_path was written for input_path."""
+        signature = self._signature(input_path)
+        if signature is None:
+            return
+
+        self._records[input_path.name] = signature
+        self._outputs.add(output_path.name)
+        entry = {
+            'input': input_path.name,
+            'size': signature[0],
+            'mtime_ns': signature[1],
+            'output': output_path.name,
+        }
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            self._logger.warning(f"Could not update manifest {self.path}: {e}")
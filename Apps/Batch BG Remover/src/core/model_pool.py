@@ -0,0 +1,147 @@
+"""
+Shared InSPyReNet Model Pool
+SOLID: Single Responsibility - owns model lifetime, removers only borrow
+KISS: One reference-counted entry per (mode, jit, device)
+"""
+
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from .interfaces import BackgroundRemovalError
+
+
+ModelKey = Tuple[str, bool, str]
+
+
+class PooledModel:
+    """
+    One pooled transparent_background Remover and its reference count.
+
+    The model may still be loading in the background; get() waits for it.
+    """
+
+    def __init__(self, key: ModelKey):
+        self.key = key
+        self.refs = 0
+        self._ready = threading.Event()
+        self._remover = None
+        self._error: Optional[Exception] = None
+
+    def load(self):
+        """Build the Remover (runs once, possibly on a warm-up thread)."""
+        logger = logging.getLogger(ModelPool.__name__)
+        mode, jit, device = self.key
+        try:
+            from transparent_background import Remover
+
+            logger.info(f"Loading InSPyReNet model (mode={mode}, jit={jit}, device={device})...")
+            self._remover = Remover(mode=mode, jit=jit, device=device)
+            logger.info("InSPyReNet model ready")
+        except Exception as e:
+            self._error = e
+            # Let the next acquire() retry instead of reusing the failure
+            ModelPool._forget(self)
+        finally:
+            self._ready.set()
+
+    @property
+    def is_ready(self) -> bool:
+        """True once loading has finished (successfully or not)."""
+        return self._ready.is_set()
+
+    def get(self):
+        """
+        Return the loaded Remover, waiting for a background load to finish.
+
+        Raises:
+            BackgroundRemovalError: If the model failed to load
+        """
+        self._ready.wait()
+        if self._error is not None:
+            raise BackgroundRemovalError("Failed to initialize InSPyReNet", "InSPyReNet", self._error)
+        return self._remover
+
+
+class ModelPool:
+    """
+    Process-wide pool of InSPyReNet models shared by all removers.
+
+    Removers acquire() a model instead of building their own, so the
+    standalone remover, LayerDiffuse's base remover and the fallback remover
+    share one network per (mode, jit, device). A model is dropped when its
+    last reference is released. With background=True the model loads on a
+    daemon thread, which is how the GUI warms it up before the first image.
+    """
+
+    _lock = threading.Lock()
+    _models: Dict[ModelKey, PooledModel] = {}
+
+    @staticmethod
+    def _resolve_device(device: Optional[str]) -> str:
+        """Pick the device the way transparent_background does: CUDA, then Apple MPS, then CPU."""
+        if device:
+            return device
+        try:
+            import torch
+        except ImportError:
+            return "cpu"
+        if torch.cuda.is_available():
+            return "cuda:0"
+        mps = getattr(torch.backends, "mps", None)
+        if mps is not None and mps.is_available():
+            return "mps:0"
+        return "cpu"
+
+    @classmethod
+    def acquire(cls, mode: str = "base", jit: bool = False, device: Optional[str] = None,
+                background: bool = False) -> PooledModel:
+        """
+        Take a reference to the model for (mode, jit, device), loading it if needed.
+
+        Args:
+            mode: transparent_background model mode
+            jit: Whether to use the TorchScript-traced model
+            device: Torch device; None picks CUDA, then MPS, when available
+            background: Load on a daemon thread instead of blocking
+
+        Returns:
+            The pooled model; call get() for the Remover and release() when done
+        """
+        key = (mode, bool(jit), cls._resolve_device(device))
+        with cls._lock:
+            pooled = cls._models.get(key)
+            is_new = pooled is None
+            if is_new:
+                pooled = cls._models[key] = PooledModel(key)
+            pooled.refs += 1
+
+        if is_new:
+            if background:
+                threading.Thread(target=pooled.load, name="model-warmup", daemon=True).start()
+            else:
+                pooled.load()
+        return pooled
+
+    @classmethod
+    def release(cls, pooled: PooledModel):
+        """Drop a reference; the model is freed when none remain."""
+        with cls._lock:
+            pooled.refs -= 1
+            if pooled.refs > 0:
+                return
+            if cls._models.get(pooled.key) is pooled:
+                del cls._models[pooled.key]
+        logging.getLogger(cls.__name__).info(f"Released InSPyReNet model {pooled.key}")
+
+    @classmethod
+    def _forget(cls, pooled: PooledModel):
+        with cls._lock:
+            if cls._models.get(pooled.key) is pooled:
+                del cls._models[pooled.key]
+
+    @classmethod
+    def loaded_keys(cls) -> list:
+        """Keys of the models currently in the pool."""
+        with cls._lock:
+            return list(cls._models)
@@ -5,11 +5,18 @@ KISS: Simple processing logic with clear interfaces
 """
 
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
 from pathlib import Path
 from typing import Callable, Optional, List, Tuple
 from dataclasses import dataclass, field
 
+from PIL import Image
+
 from .factory import RemoverManager, RemoverType
+from .interfaces import image_to_bytes
+from .manifest import CompletedManifest, FileJob
 from ..config.settings import config
 
 
@@ -93,25 +100,27 @@ class ProcessingEngine:
             True if processing successful, False otherwise
         """
         try:
-            # Read input image
-            image_data = input_path.read_bytes()
+            # Decode input image once
+            with Image.open(input_path) as img:
+                img.load()
+                image = img
 
             # Use material-specific processing only when the active primary remover supports it.
             active_remover = self._remover_manager._primary_remover
             if (
                 active_remover
-                and hasattr(active_remover, "remove_with_material_type")
+                and hasattr(active_remover, "remove_image_with_material_type")
                 and active_remover.is_available()
             ):
-                result_data = active_remover.remove_with_material_type(image_data, self.material_hint)
+                result = active_remover.remove_image_with_material_type(image, self.material_hint)
             else:
-                result_data = self._remover_manager.remove_background(image_data)
+                result = self._remover_manager.remove_background_image(image)
             
             # Ensure output directory exists
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Write result
-            output_path.write_bytes(result_data)
+            # Encode once and write result
+            output_path.write_bytes(image_to_bytes(result, format='PNG'))
             
             self._logger.debug(f"Successfully processed: {input_path.name}")
             return True
@@ -142,68 +151,18 @@ class ProcessingEngine:
             Processing statistics
         """
         input_folder = Path(input_folder)
-        output_folder = Path(output_folder)
-
-        # Find all supported image files.
-        image_files = self._collect_image_files(input_folder)
+        jobs = self._build_manifest([(input_folder, Path(output_folder))], labelled=False)
         
-        if not image_files:
+        if not jobs:
             raise FileNotFoundError(f"No supported image files found in {input_folder}")
         
         # Reset stats for this operation
         folder_stats = ProcessingStats()
-        folder_stats.total_files = len(image_files)
+        folder_stats.total_files = len(jobs)
         
-        self._logger.info(f"Processing {len(image_files)} files from {input_folder}")
+        self._logger.info(f"Processing {len(jobs)} files from {input_folder}")
         
-        # Create output folder
-        output_folder.mkdir(parents=True, exist_ok=True)
-        
-        # Process each file
-        for idx, input_path in enumerate(image_files, 1):
-            if self._cancelled:
-                self._logger.info("Processing cancelled by user")
-                break
-            
-            # Generate output path
-            output_filename = input_path.stem + config.processing_settings.suffix + ".png"
-            output_path = output_folder / output_filename
-            
-            # Skip if output already exists (optional)
-            if output_path.exists():
-                self._logger.debug(f"Skipping existing file: {output_filename}")
-                folder_stats.skipped_files += 1
-                folder_stats.skipped_paths.append(str(input_path))
-                if progress_callback:
-                    try:
-                        progress_callback(idx, len(image_files), f"{input_path.name} (skipped)")
-                    except Exception as e:
-                        self._logger.warning(f"Progress callback failed: {e}")
-                continue
-            
-            # Process the image
-            success = self.process_single_image(input_path, output_path)
-            
-            if success:
-                folder_stats.processed_files += 1
-                
-                # Show preview if requested
-                if show_preview and preview_callback:
-                    try:
-                        preview_data = output_path.read_bytes()
-                        preview_callback(preview_data)
-                    except Exception as e:
-                        self._logger.warning(f"Preview callback failed: {e}")
-            else:
-                folder_stats.failed_files += 1
-                folder_stats.failed_paths.append(str(input_path))
-            
-            # Update progress (include filename as info)
-            if progress_callback:
-                try:
-                    progress_callback(idx, len(image_files), input_path.name)
-                except Exception as e:
-                    self._logger.warning(f"Progress callback failed: {e}")
+        self._run_jobs(jobs, folder_stats, progress_callback, preview_callback, show_preview)
         
         self._logger.info(f"Folder processing complete: {folder_stats}")
         return folder_stats
@@ -216,7 +175,12 @@ class ProcessingEngine:
         show_preview: bool = False,
     ) -> ProcessingStats:
         """
-        Process multiple folder pairs (input, output).
+        Process multiple folder pairs (input, output) as one job queue.
+        
+        Every input folder is scanned once into a manifest of jobs. Jobs are
+        interleaved across folders and run through one shared worker pool
+        (or the batched pipeline), and completed outputs are recorded per
+        output folder so an interrupted run resumes where it stopped.
         
         Args:
             folder_pairs: List of (input_folder, output_folder) tuples
@@ -231,66 +195,266 @@ class ProcessingEngine:
         self.reset_stats()
         self.reset_cancel()
         
-        # Count total files across all folders
-        for input_folder, _ in folder_pairs:
-            try:
-                image_files = self._collect_image_files(Path(input_folder))
-                self._stats.total_files += len(image_files)
-            except Exception as e:
-                self._logger.warning(f"Could not count files in {input_folder}: {e}")
+        jobs = self._build_manifest([(Path(i), Path(o)) for i, o in folder_pairs], labelled=True)
+        self._stats.total_files = len(jobs)
         
         if self._stats.total_files == 0:
             raise FileNotFoundError("No supported image files found in any input folders")
         
         self._logger.info(f"Starting queue processing: {len(folder_pairs)} folders, {self._stats.total_files} total files")
         
-        current_file = 0
+        self._run_jobs(jobs, self._stats, progress_callback, preview_callback, show_preview)
+        
+        self._logger.info(f"Queue processing finished: {self._stats}")
+        return self._stats
+    
+    def _build_manifest(self, folder_pairs: List[Tuple[Path, Path]], labelled: bool) -> List[FileJob]:
+        """
+        Scan each input folder once and interleave its files with the other folders'.
         
-        # Process each folder pair
-        for folder_idx, (input_folder, output_folder) in enumerate(folder_pairs, 1):
-            if self._cancelled:
-                break
+        Files are taken round-robin across folders so every folder makes
+        progress from the start. Folders that cannot be scanned are logged
+        and skipped. With labelled=True progress labels include the folder name.
+        """
+        per_folder = []
+        manifests = {}
+        for input_folder, output_folder in folder_pairs:
+            try:
+                image_files = self._collect_image_files(input_folder)
+            except Exception as e:
+                self._logger.error(f"Could not scan folder {input_folder}: {e}")
+                continue
             
-            folder_name = Path(input_folder).name
-            self._logger.info(f"Processing folder {folder_idx}/{len(folder_pairs)}: {folder_name}")
+            manifest = manifests.get(output_folder)
+            if manifest is None:
+                manifest = manifests[output_folder] = CompletedManifest(output_folder)
             
-            try:
-                # Process this folder
-                folder_stats = self.process_folder(
-                    input_folder,
-                    output_folder,
-                    progress_callback=lambda curr, total, filename: progress_callback(
-                        current_file + curr, 
-                        self._stats.total_files,
-                        f"{folder_name}/{filename}"
-                    ) if progress_callback else None,
-                    preview_callback=preview_callback,
-                    show_preview=show_preview
+            folder_name = input_folder.name
+            per_folder.append([
+                FileJob(
+                    input_path=input_path,
+                    output_path=self._output_path(input_path, output_folder),
+                    label=f"{folder_name}/{input_path.name}" if labelled else input_path.name,
+                    manifest=manifest,
                 )
+                for input_path in image_files
+            ])
+        
+        return [job for group in zip_longest(*per_folder) for job in group if job is not None]
+    
+    def _output_path(self, input_path: Path, output_folder: Path) -> Path:
+        """Output path for an input image: <stem><suffix>.png in output_folder."""
+        return output_folder / (input_path.stem + config.processing_settings.suffix + ".png")
+    
+    def _report_progress(self, progress_callback: Optional[Callable[[int, int, str], None]],
+                         current: int, total: int, info: str):
+        """Invoke the progress callback, logging (not raising) callback errors."""
+        if progress_callback:
+            try:
+                progress_callback(current, total, info)
+            except Exception as e:
+                self._logger.warning(f"Progress callback failed: {e}")
+    
+    def _get_batch_remover(self):
+        """Return the primary remover if it supports batched inference, else None."""
+        remover = self._remover_manager._primary_remover
+        if remover and hasattr(remover, "remove_batch") and remover.is_available():
+            return remover
+        return None
+    
+    def _run_jobs(
+        self,
+        jobs: List[FileJob],
+        stats: ProcessingStats,
+        progress_callback: Optional[Callable[[int, int, str], None]],
+        preview_callback: Optional[Callable[[bytes], None]],
+        show_preview: bool,
+    ):
+        """
+        Skip completed jobs, run the rest and record results in stats.
+        
+        Uses the batched pipeline when the remover supports it, otherwise a
+        worker pool of config.processing_settings.max_workers threads.
+        """
+        total = len(jobs)
+        done = 0
+        
+        def report(job: FileJob, info: str = ""):
+            nonlocal done
+            done += 1
+            self._report_progress(progress_callback, done, total, job.label + info)
+        
+        def finish(job: FileJob, success: bool, result_data: Optional[bytes] = None):
+            if not success:
+                stats.failed_files += 1
+                stats.failed_paths.append(str(job.input_path))
+            else:
+                stats.processed_files += 1
+                job.manifest.mark_completed(job.input_path, job.output_path)
+                if show_preview and preview_callback:
+                    try:
+                        preview_callback(result_data if result_data is not None
+                                         else job.output_path.read_bytes())
+                    except Exception as e:
+                        self._logger.warning(f"Preview callback failed: {e}")
+            report(job)
+        
+        pending = []
+        for job in jobs:
+            if job.manifest.is_completed(job.input_path, job.output_path):
+                self._logger.debug(f"Skipping completed file: {job.output_path.name}")
+                stats.skipped_files += 1
+                stats.skipped_paths.append(str(job.input_path))
+                report(job, " (skipped)")
+            else:
+                pending.append(job)
+        
+        for output_folder in {job.output_path.parent for job in pending}:
+            output_folder.mkdir(parents=True, exist_ok=True)
+        
+        batch_remover = self._get_batch_remover()
+        if batch_remover is not None and config.processing_settings.batch_size > 1:
+            self._run_pipelined(batch_remover, pending, finish)
+        else:
+            self._run_pooled(pending, finish)
+        
+        if self._cancelled:
+            self._logger.info("Processing cancelled by user")
+    
+    def _run_pooled(self, jobs: List[FileJob], finish: Callable[..., None]):
+        """Run jobs with process_single_image on a shared thread pool."""
+        workers = max(1, config.processing_settings.max_workers)
+        
+        pending_jobs = iter(jobs)
+        in_flight = deque()
+        
+        with ThreadPoolExecutor(workers, thread_name_prefix="bg-worker") as pool:
+            while not self._cancelled:
+                # Keep every worker busy without submitting the whole queue
+                while len(in_flight) < 2 * workers:
+                    job = next(pending_jobs, None)
+                    if job is None:
+                        break
+                    in_flight.append((job, pool.submit(self.process_single_image, job.input_path, job.output_path)))
                 
-                # Update overall stats
-                self._stats.processed_files += folder_stats.processed_files
-                self._stats.failed_files += folder_stats.failed_files
-                self._stats.skipped_files += folder_stats.skipped_files
-                # Merge path lists
-                self._stats.failed_paths.extend(folder_stats.failed_paths)
-                self._stats.skipped_paths.extend(folder_stats.skipped_paths)
-                
-                # Update file counter
-                current_file += folder_stats.total_files
+                if not in_flight:
+                    break
                 
-            except Exception as e:
-                self._logger.error(f"Failed to process folder {folder_name}: {e}")
-                # Still update file counter for failed folders
+                job, future = in_flight.popleft()
+                try:
+                    finish(job, future.result())
+                except Exception as e:
+                    self._logger.error(f"Failed to process {job.input_path.name}: {e}")
+                    finish(job, False)
+            
+            # Files already started still finish and are recorded
+            for job, future in in_flight:
+                if future.cancel():
+                    continue
                 try:
-                    image_files = self._collect_image_files(Path(input_folder))
-                    current_file += len(image_files)
-                    self._stats.failed_files += len(image_files)
-                except Exception as counter_error:
-                    self._logger.warning(f"Could not update failure counters for {folder_name}: {counter_error}")
+                    finish(job, future.result())
+                except Exception:
+                    finish(job, False)
+    
+    def _run_pipelined(self, remover, jobs: List[FileJob],
+                       finish: Callable[..., None]):
+        """
+        Run jobs as a decode -> batched inference -> encode/write pipeline.
         
-        self._logger.info(f"Queue processing finished: {self._stats}")
-        return self._stats
+        A thread pool decodes up to two batches ahead of the model and a
+        second pool PNG-encodes and writes results, so the model does not
+        wait on disk reads or PNG compression. Batch size comes from
+        config.processing_settings.batch_size and the pool size from
+        max_workers (at least 2). Progress is reported as writes finish.
+        """
+        batch_size = config.processing_settings.batch_size
+        io_workers = max(2, config.processing_settings.max_workers)
+        
+        def finish_write(job: FileJob, future):
+            try:
+                result_data = future.result()
+            except Exception as e:
+                self._logger.error(f"Failed to write {job.input_path.name}: {e}")
+                finish(job, False)
+                return
+            self._logger.debug(f"Successfully processed: {job.input_path.name}")
+            finish(job, True, result_data)
+        
+        pending_jobs = iter(jobs)
+        decodes = deque()
+        writes = deque()
+        
+        with ThreadPoolExecutor(io_workers, thread_name_prefix="bg-decode") as decode_pool, \
+             ThreadPoolExecutor(io_workers, thread_name_prefix="bg-encode") as encode_pool:
+            
+            def decode_ahead():
+                while len(decodes) < 2 * batch_size:
+                    job = next(pending_jobs, None)
+                    if job is None:
+                        return
+                    decodes.append((job, decode_pool.submit(self._decode_image, job.input_path)))
+            
+            decode_ahead()
+            while decodes and not self._cancelled:
+                batch = []
+                while decodes and len(batch) < batch_size:
+                    job, future = decodes.popleft()
+                    try:
+                        batch.append((job, future.result()))
+                    except Exception as e:
+                        self._logger.error(f"Failed to read {job.input_path.name}: {e}")
+                        finish(job, False)
+                
+                # Keep the decoders busy while the model runs
+                decode_ahead()
+                
+                for (job, _), result in zip(batch, self._remove_batch(remover, batch)):
+                    if result is None:
+                        finish(job, False)
+                    else:
+                        writes.append((job, encode_pool.submit(self._encode_and_write, result, job.output_path)))
+                
+                # Report finished writes; block only if too many results are waiting
+                while writes and (writes[0][1].done() or len(writes) > 2 * batch_size):
+                    finish_write(*writes.popleft())
+            
+            for _, future in decodes:
+                future.cancel()
+            
+            # Results already computed are still written
+            while writes:
+                finish_write(*writes.popleft())
+    
+    def _remove_batch(self, remover, batch: List[tuple]) -> List[Optional[Image.Image]]:
+        """Run one inference batch; on failure retry image by image (None = failed)."""
+        images = [image for _, image in batch]
+        try:
+            return remover.remove_batch(images)
+        except Exception as e:
+            self._logger.warning(f"Batch inference failed, retrying images one by one: {e}")
+        
+        results = []
+        for job, image in batch:
+            try:
+                results.append(remover.remove_batch([image])[0])
+            except Exception as e:
+                self._logger.error(f"Failed to process {job.input_path.name}: {e}")
+                results.append(None)
+        return results
+    
+    @staticmethod
+    def _decode_image(input_path: Path) -> Image.Image:
+        """Decode an input file into a fully loaded RGB image."""
+        with Image.open(input_path) as img:
+            return img.convert('RGB')
+    
+    @staticmethod
+    def _encode_and_write(image: Image.Image, output_path: Path) -> bytes:
+        """PNG-encode a result and write it; returns the encoded bytes for previews."""
+        result_data = image_to_bytes(image, format='PNG')
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(result_data)
+        return result_data
     
     def switch_remover(self, new_type: RemoverType, **kwargs):
         """Switch to a different background remover."""
@@ -301,6 +465,10 @@ class ProcessingEngine:
             self._logger.error(f"Failed to switch remover: {e}")
             raise
     
+    def warm_up(self):
+        """Start loading the remover models in the background."""
+        self._remover_manager.warm_up()
+    
     def configure_remover(self, **kwargs) -> bool:
         """Configure the current primary remover."""
         return self._remover_manager.configure_remover(self._remover_manager.primary_type, **kwargs)
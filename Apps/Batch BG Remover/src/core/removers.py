@@ -4,11 +4,14 @@ SOLID: Single Responsibility, Open/Closed principle
 KISS: Clean implementation without unnecessary complexity
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from transparent_background import Remover
+from PIL import Image
+import numpy as np
 import logging
 
 from .interfaces import BackgroundRemover, AdvancedBackgroundRemover, BackgroundRemovalError, load_image_from_bytes, image_to_bytes
+from .model_pool import ModelPool, PooledModel
 
 
 class InspyrenetRemover(BackgroundRemover):
@@ -22,25 +25,42 @@ class InspyrenetRemover(BackgroundRemover):
     def __init__(self, use_jit: bool = False, threshold: float = 0.5):
         self.use_jit = use_jit
         self.threshold = threshold
-        self._remover: Optional[Remover] = None
+        self._model: Optional[PooledModel] = None
+        # (remover, matches): whether the batched path reproduced Remover.process() for that model
+        self._batch_check: Optional[tuple] = None
         self._logger = logging.getLogger(self.__class__.__name__)
     
     def _get_remover(self) -> Remover:
         """
         Lazy initialization of remover to avoid loading model until needed.
         
+        The model is borrowed from the shared ModelPool, so removers with
+        the same settings share one network. If warm_up() started loading
+        it in the background, this waits for that load to finish.
+        
         Returns:
             Initialized Remover instance
         """
-        if self._remover is None:
-            try:
-                self._logger.info("Initializing InSPyReNet remover...")
-                self._remover = Remover(jit=self.use_jit)
-                self._logger.info("InSPyReNet remover initialized successfully")
-            except Exception as e:
-                raise BackgroundRemovalError("Failed to initialize InSPyReNet", "InSPyReNet", e)
+        if self._model is None:
+            self._model = ModelPool.acquire(jit=self.use_jit)
         
-        return self._remover
+        try:
+            return self._model.get()
+        except BackgroundRemovalError:
+            # Drop the failed entry so the next call retries the load
+            self._release_model()
+            raise
+    
+    def warm_up(self):
+        """Start loading the model in the background if it is not loaded yet."""
+        if self._model is None:
+            self._model = ModelPool.acquire(jit=self.use_jit, background=True)
+    
+    def _release_model(self):
+        self._batch_check = None
+        if self._model is not None:
+            model, self._model = self._model, None
+            ModelPool.release(model)
     
     def remove_background(self, image_data: bytes) -> bytes:
         """
@@ -56,21 +76,135 @@ class InspyrenetRemover(BackgroundRemover):
             BackgroundRemovalError: If processing fails
         """
         try:
-            # Load input image
+            # Load input image, process it and encode the result
             img = load_image_from_bytes(image_data)
+            return image_to_bytes(self.remove_background_image(img), format='PNG')
             
-            # Process with InSPyReNet
-            remover = self._get_remover()
-            result = remover.process(img, type='rgba', threshold=self.threshold)
+        except BackgroundRemovalError:
+            raise  # Re-raise our custom errors
+        except Exception as e:
+            raise BackgroundRemovalError("InSPyReNet processing failed", "InSPyReNet", e)
+    
+    def remove_background_image(self, image: Image.Image) -> Image.Image:
+        """
+        Remove background from a decoded image using InSPyReNet.
+        
+        Args:
+            image: Input PIL Image
+            
+        Returns:
+            RGBA PIL Image with transparent background
             
-            # Convert to bytes
-            return image_to_bytes(result, format='PNG')
+        Raises:
+            BackgroundRemovalError: If processing fails
+        """
+        try:
+            remover = self._get_remover()
+            return remover.process(image, type='rgba', threshold=self.threshold)
             
         except BackgroundRemovalError:
             raise  # Re-raise our custom errors
         except Exception as e:
             raise BackgroundRemovalError("InSPyReNet processing failed", "InSPyReNet", e)
     
+    def remove_batch(self, images: List[Image.Image]) -> List[Image.Image]:
+        """
+        Remove background from several images with one model call per batch.
+        
+        Each image goes through the Remover's own transform (resize to the
+        model input size + normalize), so the tensors are stacked without
+        letterboxing and each prediction matches single-image processing.
+        Images whose transformed size differs (dynamic resize) are batched
+        separately. Falls back to per-image processing with JIT, since the
+        traced model is fixed to batch size 1.
+        
+        The batched path copies Remover.process()'s post-processing, so the
+        first batch on each model also runs its first image through
+        process() and compares. If the two differ (e.g. after a library
+        upgrade), every image goes through process() instead.
+        
+        Args:
+            images: Input images
+            
+        Returns:
+            RGBA images with transparent background, in input order
+            
+        Raises:
+            BackgroundRemovalError: If processing fails
+        """
+        try:
+            remover = self._get_remover()
+            images = [img if img.mode == 'RGB' else img.convert('RGB') for img in images]
+            
+            model = getattr(remover, 'model', None)
+            transform = getattr(remover, 'transform', None)
+            if self.use_jit or model is None or transform is None or len(images) == 1:
+                return [remover.process(img, type='rgba', threshold=self.threshold) for img in images]
+            
+            results: List[Optional[Image.Image]] = [None] * len(images)
+            pending = list(range(len(images)))
+            if self._batch_check is None or self._batch_check[0] is not remover:
+                reference = remover.process(images[0], type='rgba', threshold=self.threshold)
+                matches = self._same_output(reference, self._process_batch(remover, images[:1])[0])
+                if not matches:
+                    self._logger.warning("Batched InSPyReNet output differs from Remover.process(); "
+                                         "processing images one at a time")
+                self._batch_check = (remover, matches)
+                results[0] = reference
+                pending = pending[1:]
+            
+            if not self._batch_check[1]:
+                for idx in pending:
+                    results[idx] = remover.process(images[idx], type='rgba', threshold=self.threshold)
+                return results
+            
+            for idx, result in zip(pending, self._process_batch(remover, [images[idx] for idx in pending])):
+                results[idx] = result
+            return results
+            
+        except BackgroundRemovalError:
+            raise  # Re-raise our custom errors
+        except Exception as e:
+            raise BackgroundRemovalError("InSPyReNet batch processing failed", "InSPyReNet", e)
+    
+    def _process_batch(self, remover: Remover, images: List[Image.Image]) -> List[Image.Image]:
+        """Run RGB images through the model, one forward pass per transformed size."""
+        import torch
+        
+        tensors = [remover.transform(img) for img in images]
+        groups: Dict[tuple, List[int]] = {}
+        for idx, tensor in enumerate(tensors):
+            groups.setdefault(tuple(tensor.shape), []).append(idx)
+        
+        results: List[Optional[Image.Image]] = [None] * len(images)
+        for indices in groups.values():
+            batch = torch.stack([tensors[idx] for idx in indices]).to(remover.device)
+            with torch.no_grad():
+                preds = remover.model(batch)
+            for pos, idx in enumerate(indices):
+                results[idx] = self._prediction_to_rgba(images[idx], preds[pos:pos + 1])
+        return results
+    
+    @staticmethod
+    def _same_output(expected: Image.Image, actual: Image.Image, max_mismatch: float = 0.001) -> bool:
+        """True if both RGBA images match, allowing a few alpha flips at the threshold from GPU nondeterminism."""
+        expected, actual = np.asarray(expected), np.asarray(actual)
+        if expected.shape != actual.shape:
+            return False
+        mismatched = np.any(expected != actual, axis=-1).mean()
+        return mismatched <= max_mismatch
+    
+    def _prediction_to_rgba(self, img: Image.Image, pred) -> Image.Image:
+        """Turn one 1x1xhxw model prediction into an RGBA image, as Remover.process does (transparent-background 1.3.4)."""
+        import torch.nn.functional as F
+        
+        pred = F.interpolate(pred, img.size[::-1], mode='bilinear', align_corners=True)
+        pred = pred.data.cpu().numpy().squeeze()
+        pred = (pred > self.threshold).astype(np.float64)
+        
+        alpha = (pred * 255).astype(np.uint8)
+        return Image.fromarray(np.dstack([np.asarray(img), alpha]))
+    
     def configure(self, **kwargs) -> bool:
         """
         Configure the InSPyReNet remover.
@@ -99,8 +233,11 @@ class InspyrenetRemover(BackgroundRemover):
                 new_jit = bool(kwargs['use_jit'])
                 if new_jit != self.use_jit:
                     self.use_jit = new_jit
-                    # Reset remover to apply new JIT setting
-                    self._remover = None
+                    # Swap to the pooled model for the new JIT setting,
+                    # loading it in the background if it was in use
+                    if self._model is not None:
+                        self._release_model()
+                        self.warm_up()
                     self._logger.info(f"Updated JIT setting to {new_jit}")
             
             return True
@@ -153,10 +290,10 @@ class InspyrenetRemover(BackgroundRemover):
     
     def cleanup(self):
         """Clean up InSPyReNet resources."""
-        if self._remover is not None:
+        if self._model is not None:
             try:
-                # InSPyReNet doesn't need explicit cleanup, but we clear the reference
-                self._remover = None
+                # The pool frees the model once no remover holds it
+                self._release_model()
                 self._logger.info("InSPyReNet resources cleaned up")
             except Exception as e:
                 self._logger.warning(f"Cleanup warning: {e}")
@@ -184,6 +321,14 @@ class LayerDiffuseRemover(AdvancedBackgroundRemover):
         """Remove background with material-specific processing."""
         return self._impl.remove_with_material_type(image_data, material_hint)
     
+    def remove_background_image(self, image: Image.Image) -> Image.Image:
+        """LayerDiffuse background removal on a decoded image."""
+        return self._impl.remove_background_image(image)
+    
+    def remove_image_with_material_type(self, image: Image.Image, material_hint: str = "general") -> Image.Image:
+        """Material-specific processing on a decoded image."""
+        return self._impl.remove_image_with_material_type(image, material_hint)
+    
     def get_supported_materials(self) -> list[str]:
         """Get list of supported material types."""
         return self._impl.get_supported_materials()
@@ -200,6 +345,10 @@ class LayerDiffuseRemover(AdvancedBackgroundRemover):
         """LayerDiffuse is now available."""
         return self._impl.is_available()
     
+    def warm_up(self):
+        """Start loading the LayerDiffuse base model in the background."""
+        self._impl.warm_up()
+    
     def cleanup(self):
         """Clean up LayerDiffuse resources."""
         self._impl.cleanup()
\ No newline at end of file
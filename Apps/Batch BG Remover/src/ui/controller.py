@@ -46,6 +46,8 @@ class UIController:
         """Initialize the processing engine."""
         try:
             self.engine = ProcessingEngine(RemoverType.INSPYRENET)
+            # Load the model while the user picks folders
+            self.engine.warm_up()
             self._logger.info("Processing engine initialized")
         except Exception as e:
             self._logger.error(f"Failed to initialize processing engine: {e}")
@@ -525,6 +527,13 @@ class UIController:
             messagebox.showerror("Switch Error", f"Failed to switch remover:\n{e}")
             return False
     
+    def select_remover(self, remover_choice: str):
+        """Switch to the remover picked in the UI so its model warms up before the run."""
+        if self.is_processing:
+            return  # The next run switches when it starts
+        target_remover = RemoverType.LAYERDIFFUSE if "LayerDiffuse" in remover_choice else RemoverType.INSPYRENET
+        self.switch_remover(target_remover)
+    
     def cleanup(self):
         """Clean up controller resources."""
         if self.engine:
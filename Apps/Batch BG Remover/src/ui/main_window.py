@@ -368,7 +368,8 @@ class MainWindow:
             font=CyberpunkTheme.get_body_font(),
             state="readonly",
             fg_color=CyberpunkTheme.SECONDARY,
-            button_color=CyberpunkTheme.ACCENT
+            button_color=CyberpunkTheme.ACCENT,
+            command=self.controller.select_remover
         )
         self.remover_combo.set(remover_options[0])
         self.remover_combo.pack(side="left", padx=5)
@@ -0,0 +1,48 @@
+"""
+Encode time vs file size for each output encoding preset.
+
+Processes one image (or a synthetic sprite) with the default settings and
+then encodes the result with every OutputEncoding preset, printing a table
+of the encode time and output size of each.
+
+Usage:
+    python bench_encode.py [image_path | size]
+"""
+
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from bench_fringe_fix import make_sprite
+from src.config import OutputEncoding, ProcessingConfig
+from src.io_handler import IOHandler
+from src.processor import ImageProcessor
+
+
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else "1024"
+    if arg.isdigit():
+        source = make_sprite(int(arg))
+        label = f"synthetic sprite {arg}x{arg}"
+    else:
+        source = np.asarray(Image.open(arg).convert('RGBA'))
+        label = arg
+
+    image = ImageProcessor().process_array(source, ProcessingConfig())
+    io_handler = IOHandler()
+    raw_size = image.width * image.height * 4
+
+    print(f"Image: {label}, {image.width}x{image.height}, raw RGBA {raw_size / 1024:.0f} KB")
+    print(f"{'Encoding':<18} {'Encode ms':>10} {'Size KB':>10} {'Ratio':>7}")
+    for encoding in OutputEncoding:
+        start = time.perf_counter()
+        data = io_handler.encode_image(image, encoding)
+        elapsed = time.perf_counter() - start
+        print(f"{encoding.value:<18} {elapsed * 1000:10.1f} {len(data) / 1024:10.1f} "
+              f"{raw_size / len(data):6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Before/after benchmark for ImageProcessor._fix_fringe.
+
+Compares the vectorized normalized-convolution fringe fix against the
+original per-pixel loop on a synthetic soft-edged sprite and reports the
+runtime of both and the difference between their outputs.
+
+The vectorized version reads neighbours from the input image. The original
+loop read them from the channel it was updating, so its output depended on
+scan order. The two differ by far more than rounding: at 256 px the max
+difference is 60 levels, the mean is 0.49 levels over the whole image
+(10.6 over the fringe pixels the loop changed), and 2,773 pixels differ by
+more than 1. Against the order-independent loop the difference is at most 1.
+
+Usage:
+    python bench_fringe_fix.py [size]
+"""
+
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from src.config import ProcessingConfig
+from src.processor import ImageProcessor
+
+
+def reference_fix_fringe(img_array: np.ndarray, config: ProcessingConfig,
+                         in_place: bool = True) -> np.ndarray:
+    """
+    The original per-pixel implementation, kept here as the baseline.
+
+    With in_place=True neighbours are read from the channel being updated, as
+    the original code did, so the result depends on scan order. in_place=False
+    reads neighbours from the untouched input, which is what the vectorized
+    version computes.
+    """
+    result = img_array.copy()
+    height, width = img_array.shape[:2]
+    alpha = img_array[:, :, 3]
+
+    band_size = config.fringe_band
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (band_size * 2 + 1, band_size * 2 + 1))
+    edge_mask = (alpha > 10) & (alpha < 240)
+    dilated_edges = cv2.dilate(edge_mask.astype(np.uint8), kernel, iterations=1)
+    edge_band = dilated_edges & (alpha > 0)
+
+    for c in range(3):
+        channel = result[:, :, c].astype(np.float32)
+        source = channel if in_place else channel.copy()
+        edge_pixels = np.where(edge_band)
+        if len(edge_pixels[0]) == 0:
+            continue
+        for i in range(len(edge_pixels[0])):
+            y, x = edge_pixels[0][i], edge_pixels[1][i]
+            y_min, y_max = max(0, y - band_size), min(height, y + band_size + 1)
+            x_min, x_max = max(0, x - band_size), min(width, x + band_size + 1)
+            neighbor_alpha = alpha[y_min:y_max, x_min:x_max]
+            neighbor_color = source[y_min:y_max, x_min:x_max]
+            solid_mask = neighbor_alpha > 200
+            if np.any(solid_mask):
+                solid_colors = neighbor_color[solid_mask]
+                weights = neighbor_alpha[solid_mask].astype(np.float32) / 255.0
+                weighted_avg = np.average(solid_colors, weights=weights)
+                strength = config.fringe_strength / 3.0
+                channel[y, x] = channel[y, x] * (1 - strength) + weighted_avg * strength
+        result[:, :, c] = np.clip(channel, 0, 255).astype(np.uint8)
+
+    return result
+
+
+def make_sprite(size: int) -> np.ndarray:
+    """Noisy RGBA disc with a wide soft edge and a white halo."""
+    rng = np.random.default_rng(0)
+    yy, xx = np.mgrid[:size, :size]
+    radius = np.hypot(yy - size / 2, xx - size / 2)
+    alpha = np.clip((size * 0.4 - radius) / (size * 0.02) * 255, 0, 255).astype(np.uint8)
+    rgb = rng.integers(0, 180, (size, size, 3), dtype=np.uint8)
+    rgb[(alpha > 0) & (alpha < 255)] = 250  # white matte contamination on the edge
+    return np.dstack([rgb, alpha])
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    config = ProcessingConfig()
+    img = make_sprite(size)
+    processor = ImageProcessor()
+
+    start = time.perf_counter()
+    fast = processor._fix_fringe(img.copy(), config)
+    fast_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = reference_fix_fringe(img, config)
+    slow_time = time.perf_counter() - start
+
+    exact = reference_fix_fringe(img, config, in_place=False)
+    band_pixels = int(np.count_nonzero(np.any(slow != img, axis=2)))
+
+    print(f"Image              : {size}x{size}, {band_pixels} fringe pixels changed")
+    print(f"Per-pixel loop     : {slow_time * 1000:10.1f} ms")
+    print(f"Vectorized         : {fast_time * 1000:10.1f} ms  ({slow_time / fast_time:.0f}x faster)")
+    for label, reference in (("in-place loop", slow), ("order-free loop", exact)):
+        diff = np.abs(fast.astype(np.int16) - reference.astype(np.int16))
+        changed = np.any(reference != img, axis=2)
+        band_mean = diff[changed][:, :3].mean() if changed.any() else 0.0
+        print(f"vs {label:<16}: max abs diff {int(diff.max())}, "
+              f"mean {diff[..., :3].mean():.4f} (fringe pixels {band_mean:.2f}), "
+              f"pixels > 1: {int(np.count_nonzero(diff.max(axis=2) > 1))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ from typing import Optional, Dict, Any
 from pathlib import Path
 
 from .controller import Controller
-from .config import MattePreset
+from .config import MattePreset, OutputEncoding
 try:
     from .config_professional import ProcessorType, MaterialType, PresetConfigs, ProfessionalConfig
 except Exception:
@@ -77,6 +77,7 @@ class AppUI:
         self.fringe_band_var = tk.IntVar(value=2)
         self.fringe_strength_var = tk.IntVar(value=2)
         self.skip_existing_var = tk.BooleanVar(value=True)
+        self.output_encoding_var = tk.StringVar(value=OutputEncoding.PNG_BALANCED.value)
         
         # Professional processing variables
         if ProcessorType:
@@ -585,6 +586,17 @@ class AppUI:
                                                variable=self.skip_existing_var)
         self.skip_existing_cb.pack(side="left", padx=10)
         
+        ctk.CTkLabel(options_row, text="Output:").pack(side="left", padx=(10, 5))
+        self.output_encoding_dropdown = ctk.CTkOptionMenu(
+            options_row,
+            variable=self.output_encoding_var,
+            values=[encoding.value for encoding in OutputEncoding],
+            button_color=CYBERPUNK_COLORS['accent_cyan'],
+            button_hover_color=CYBERPUNK_COLORS['hover'],
+            dropdown_hover_color=CYBERPUNK_COLORS['hover']
+        )
+        self.output_encoding_dropdown.pack(side="left", padx=5)
+        
         ctk.CTkButton(options_row, text="Reset to Defaults", 
                      command=self.reset_defaults).pack(side="right", padx=10)
         
@@ -596,6 +608,10 @@ class AppUI:
                                         command=self.generate_preview)
         self.preview_btn.pack(side="left", padx=(0, 5))
         
+        self.full_preview_btn = ctk.CTkButton(button_row, text="Full-Res Preview", 
+                                             command=self.generate_full_preview)
+        self.full_preview_btn.pack(side="left", padx=(0, 5))
+        
         self.run_btn = ctk.CTkButton(button_row, text="Run Batch", 
                                     command=self.start_processing,
                                     fg_color="green", hover_color="darkgreen")
@@ -684,10 +700,18 @@ class AppUI:
         # Options
         self.skip_existing_var.trace_add("write", lambda *args: 
                                         self.controller.update_skip_existing(self.skip_existing_var.get()))
+        self.output_encoding_var.trace_add("write", lambda *args: 
+                                          self.controller.update_output_encoding(self.output_encoding_var.get()))
         
         # Bind iterations spinbox to controller
         self.iterations_var.trace_add("write", lambda *args: 
             self.controller.update_process_iterations(self.iterations_var.get()))
+        
+        # Live preview: re-render the preview proxy when a processing setting changes
+        for var in (self.matte_preset_var, self.smooth_var, self.feather_var, self.contrast_var,
+                    self.shift_edge_var, self.fringe_fix_var, self.fringe_band_var,
+                    self.fringe_strength_var, self.iterations_var):
+            var.trace_add("write", self.refresh_preview)
     
     def update_smooth(self, *args):
         """Update smooth value and label."""
@@ -770,6 +794,7 @@ class AppUI:
         self.fringe_band_var.set(config['fringe_band'])
         self.fringe_strength_var.set(config['fringe_strength'])
         self.skip_existing_var.set(config['skip_existing'])
+        self.output_encoding_var.set(config['output_encoding'])
     
     def start_processing(self):
         """Start batch processing."""
@@ -891,6 +916,36 @@ class AppUI:
         finally:
             self.preview_btn.configure(state="normal", text="Generate Preview")
     
+    def generate_full_preview(self):
+        """Render the current preview image at full resolution."""
+        if not self.controller.get_input_folder():
+            messagebox.showwarning("Warning", "Please select an input folder first")
+            return
+        
+        self.full_preview_btn.configure(state="disabled", text="Rendering...")
+        self.root.update()
+        
+        try:
+            preview_data = self.controller.generate_full_preview()
+            if preview_data:
+                original, processed = preview_data
+                self.display_preview(original, processed)
+            else:
+                messagebox.showinfo("Info", "No images found or unable to generate preview")
+        except Exception as e:
+            logger.error(f"Full-resolution preview error: {e}")
+            messagebox.showerror("Error", f"Failed to generate preview: {e}")
+        finally:
+            self.full_preview_btn.configure(state="normal", text="Full-Res Preview")
+    
+    def refresh_preview(self, *args):
+        """Schedule a live preview refresh after a settings change."""
+        def on_ready(original: Image.Image, processed: Image.Image):
+            # Called from the preview thread; display on the Tk thread
+            self.root.after(0, lambda: self.display_preview(original, processed))
+        
+        self.controller.request_preview_refresh(on_ready)
+    
     def display_preview(self, original: Image.Image, processed: Image.Image):
         """Display preview images."""
         try:
@@ -1,31 +1,95 @@
 """
-Batch processing runner with threading and progress tracking.
+Batch processing runner with process/thread pools and progress tracking.
 """
 
+import os
 import threading
 import queue
 import logging
 from pathlib import Path
 from typing import Callable, Optional, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor, Executor,
+                                FIRST_COMPLETED, wait)
+
+import numpy as np
 
 from .config import ProcessingConfig, AppState
 from .processor import ImageProcessor
-from .io_handler import IOHandler
+from .io_handler import IOHandler, AsyncWriter
 
 logger = logging.getLogger(__name__)
 
+
+# Per-process processor and IO handler used by pool workers (see _init_worker)
+_worker_processor: Optional[ImageProcessor] = None
+_worker_io: Optional[IOHandler] = None
+
+
+def _init_worker():
+    """Build the worker-local processor and IO handler once per pool process."""
+    global _worker_processor, _worker_io
+    _worker_processor = ImageProcessor()
+    _worker_io = IOHandler()
+
+
+def _process_file(file_path: Path, config: ProcessingConfig) -> Optional[bytes]:
+    """
+    Pool task: decode, process and encode one image.
+
+    The file is decoded exactly once and handed to the processor as an array.
+    The encoded bytes go back to the runner, whose AsyncWriter writes them,
+    so the worker moves on to the next file without waiting on the disk.
+
+    Args:
+        file_path: Path to the input image
+        config: Processing configuration
+
+    Returns:
+        Encoded output file contents, or None if processing failed
+    """
+    if _worker_processor is None:
+        _init_worker()
+
+    try:
+        image = _worker_io.load_image(file_path)
+        if image is None:
+            return None
+
+        processed_image = _worker_processor.process_array(np.asarray(image), config)
+        return _worker_io.encode_image(processed_image, config.output_encoding)
+
+    except Exception as e:
+        logger.error(f"Error processing {file_path}: {e}")
+        return None
+
+
 class BatchRunner:
-    """Manages batch processing with threading and progress updates."""
+    """Manages batch processing with a worker pool and progress updates."""
     
     def __init__(self, app_state: AppState, progress_callback: Optional[Callable] = None,
-                 completion_callback: Optional[Callable] = None):
+                 completion_callback: Optional[Callable] = None,
+                 workers: Optional[int] = None, use_processes: bool = True,
+                 max_in_flight: Optional[int] = None):
+        """
+        Args:
+            app_state: Shared application state
+            progress_callback: Called as (status, processed, total, errors) after every file
+            completion_callback: Called once when the batch finishes
+            workers: Number of pool workers (default: CPU count)
+            use_processes: Process images in a process pool (CPU-bound work);
+                False falls back to a thread pool
+            max_in_flight: Maximum number of submitted but unfinished files
+                (default: 2 per worker)
+        """
         self.app_state = app_state
         self.progress_callback = progress_callback
         self._completion_callback = completion_callback
         self.io_handler = IOHandler()
+        self.workers = workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.max_in_flight = max_in_flight or self.workers * 2
         self._stop_event = threading.Event()
-        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor: Optional[Executor] = None
         
     def start_batch(self) -> bool:
         """
@@ -57,7 +121,7 @@ class BatchRunner:
         self._stop_event.set()
         
         if self._executor:
-            self._executor.shutdown(wait=False)
+            self._executor.shutdown(wait=False, cancel_futures=True)
         
         self.app_state.is_processing = False
         
@@ -87,42 +151,15 @@ class BatchRunner:
             
             logger.info(f"Starting batch processing of {self.app_state.total_count} images")
             
-            # Create processor
-            processor = ImageProcessor()
-            
-            # Process images using ThreadPoolExecutor
-            max_workers = min(4, len(image_files))  # Limit concurrent threads
-            self._executor = ThreadPoolExecutor(max_workers=max_workers)
-            
-            # Submit all tasks
-            future_to_file = {
-                self._executor.submit(self._process_single_image, processor, file_path): file_path 
-                for file_path in image_files
-            }
-            
-            # Process completed tasks
-            for future in as_completed(future_to_file):
-                if self._stop_event.is_set():
-                    break
-                
-                file_path = future_to_file[future]
-                
-                try:
-                    success = future.result()
-                    if success:
-                        self.app_state.processed_count += 1
-                    else:
-                        self.app_state.error_count += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error processing {file_path}: {e}")
+            self._executor = self._create_executor(len(image_files))
+            writer = AsyncWriter(self.io_handler, max_pending=self.max_in_flight)
+            try:
+                self._run_pool(self._executor, writer, image_files)
+            finally:
+                # Files whose encoded output could not be written count as errors
+                for _ in writer.close():
+                    self.app_state.processed_count -= 1
                     self.app_state.error_count += 1
-                
-                # Update progress
-                if self.progress_callback:
-                    status = f"Processing {file_path.name}..."
-                    self.progress_callback(status, self.app_state.processed_count, 
-                                         self.app_state.total_count, self.app_state.error_count)
             
             # Finish batch
             if self._stop_event.is_set():
@@ -135,47 +172,80 @@ class BatchRunner:
             self._finish_batch(f"Error: {e}")
         finally:
             if self._executor:
-                self._executor.shutdown(wait=True)
+                self._executor.shutdown(wait=True, cancel_futures=True)
                 self._executor = None
     
-    def _process_single_image(self, processor: ImageProcessor, file_path: Path) -> bool:
+    def _create_executor(self, file_count: int) -> Executor:
+        """Create the worker pool sized to the machine (or self.workers)."""
+        max_workers = max(1, min(self.workers, file_count))
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker)
+        return ThreadPoolExecutor(max_workers=max_workers)
+    
+    def _run_pool(self, executor: Executor, writer: AsyncWriter, image_files: List[Path]):
         """
-        Process a single image file.
-        
-        Args:
-            processor: ImageProcessor instance
-            file_path: Path to the image file
-            
-        Returns:
-            True if processing succeeded, False otherwise
+        Stream files through the pool with at most self.max_in_flight pending.
+
+        Results are counted and reported as each file finishes, so large
+        batches never queue every future up front. Encoded outputs are
+        handed to writer.
         """
-        try:
-            # Load image
-            image = self.io_handler.load_image(file_path)
-            if image is None:
+        config = self.app_state.processing_config
+        files = iter(image_files)
+        in_flight = {}
+        
+        def submit_next() -> bool:
+            file_path = next(files, None)
+            if file_path is None:
                 return False
+            try:
+                future = executor.submit(_process_file, file_path, config)
+            except RuntimeError:
+                # Pool already shut down by stop_batch()
+                return False
+            in_flight[future] = file_path
+            return True
+        
+        while len(in_flight) < self.max_in_flight and submit_next():
+            pass
+        
+        while in_flight and not self._stop_event.is_set():
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
             
-            # Process image
-            processed_image = processor.process_image(file_path, self.app_state.processing_config)
-            
-            # Generate output path
-            output_path = self.io_handler.generate_output_path(
-                file_path, 
-                self.app_state.output_folder, 
-                self.app_state.processing_config.add_suffix
-            )
-            
-            # Save processed image
-            success = self.io_handler.save_image(processed_image, output_path)
-            
-            if success:
-                logger.debug(f"Successfully processed: {file_path.name}")
-            
-            return success
-            
-        except Exception as e:
-            logger.error(f"Error processing {file_path}: {e}")
-            return False
+            for future in done:
+                file_path = in_flight.pop(future)
+                
+                try:
+                    data = future.result()
+                    if data is not None:
+                        output_path = self.io_handler.generate_output_path(
+                            file_path, 
+                            self.app_state.output_folder, 
+                            config.add_suffix,
+                            config.output_encoding
+                        )
+                        writer.submit(data, output_path)
+                        self.app_state.processed_count += 1
+                    else:
+                        self.app_state.error_count += 1
+                        
+                except Exception as e:
+                    logger.error(f"Error processing {file_path}: {e}")
+                    self.app_state.error_count += 1
+                
+                # Update progress
+                if self.progress_callback:
+                    status = f"Processing {file_path.name}..."
+                    self.progress_callback(status, self.app_state.processed_count, 
+                                         self.app_state.total_count, self.app_state.error_count)
+                
+                # Refill the window
+                if not self._stop_event.is_set():
+                    submit_next()
+        
+        # Drop files that were queued but not started
+        for future in in_flight:
+            future.cancel()
     
     def _filter_existing_files(self, image_files: List[Path]) -> List[Path]:
         """
@@ -193,7 +263,8 @@ class BatchRunner:
             output_path = self.io_handler.generate_output_path(
                 file_path, 
                 self.app_state.output_folder, 
-                self.app_state.processing_config.add_suffix
+                self.app_state.processing_config.add_suffix,
+                self.app_state.processing_config.output_encoding
             )
             
             if not self.io_handler.file_exists(output_path):
@@ -227,36 +298,3 @@ class BatchRunner:
                 self._completion_callback()
         except Exception:
             logger.exception("Completion callback raised an exception")
-    
-    def get_random_preview(self) -> Optional[tuple]:
-        """
-        Generate a preview for a random image from the input folder.
-        
-        Returns:
-            Tuple of (original_image, processed_image) or None
-        """
-        if not self.app_state.input_folder:
-            return None
-        
-        try:
-            image_files = self.io_handler.get_image_files(self.app_state.input_folder)
-            if not image_files:
-                return None
-            
-            # Pick a random file
-            import random
-            random_file = random.choice(image_files)
-            
-            # Load and process
-            original = self.io_handler.load_image(random_file)
-            if original is None:
-                return None
-            
-            processor = ImageProcessor()
-            processed = processor.process_image(random_file, self.app_state.processing_config)
-            
-            return original, processed
-            
-        except Exception as e:
-            logger.error(f"Error generating preview: {e}")
-            return None
@@ -12,6 +12,13 @@ class MattePreset(Enum):
     BLACK_MATTE = "Black Matte"
     AUTO = "Auto"
 
+class OutputEncoding(Enum):
+    """Output encoding presets, from fastest to smallest file."""
+    PNG_FAST = "PNG (fast)"
+    PNG_BALANCED = "PNG (balanced)"
+    PNG_SMALLEST = "PNG (smallest)"
+    WEBP_LOSSLESS = "WebP (lossless)"
+
 @dataclass
 class ProcessingConfig:
     """Configuration for image processing parameters."""
@@ -31,7 +38,7 @@ class ProcessingConfig:
     fringe_strength: int = 2  # 1-3
     
     # Output
-    output_format: str = "PNG"
+    output_encoding: OutputEncoding = OutputEncoding.PNG_BALANCED
     add_suffix: str = "_clean"
     skip_existing: bool = True
     
@@ -6,8 +6,9 @@ import logging
 from typing import Optional, Callable
 from pathlib import Path
 
-from .config import AppState, ProcessingConfig, MattePreset
+from .config import AppState, ProcessingConfig, MattePreset, OutputEncoding
 from .batch_runner import BatchRunner
+from .preview_engine import PreviewEngine
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +18,7 @@ class Controller:
     def __init__(self):
         self.app_state = AppState()
         self.batch_runner: Optional[BatchRunner] = None
+        self.preview_engine = PreviewEngine(self.app_state)
         self._progress_callback: Optional[Callable] = None
         self._processing_complete_callback: Optional[Callable] = None
         
@@ -69,6 +71,15 @@ class Controller:
         except ValueError:
             logger.error(f"Invalid matte preset: {preset_name}")
     
+    def update_output_encoding(self, encoding_name: str):
+        """Update the output encoding preset."""
+        try:
+            encoding = OutputEncoding(encoding_name)
+            self.app_state.processing_config.output_encoding = encoding
+            logger.debug(f"Output encoding updated to: {encoding_name}")
+        except ValueError:
+            logger.error(f"Invalid output encoding: {encoding_name}")
+    
     def update_smooth(self, value: int):
         """Update smooth parameter (0-3)."""
         if 0 <= value <= 3:
@@ -183,11 +194,13 @@ class Controller:
 
                     # Generate output path
                     input_path = Path(input_file)
-                    output_path = ioh.generate_output_path(input_path, output_folder, self.app_state.processing_config.add_suffix)
+                    config = self.app_state.processing_config
+                    output_path = ioh.generate_output_path(input_path, output_folder, config.add_suffix,
+                                                           config.output_encoding)
 
                     success = False
                     if processed_img is not None:
-                        success = ioh.save_image(processed_img, output_path)
+                        success = ioh.save_image(processed_img, output_path, config.output_encoding)
 
                     # Invoke completion callback if provided
                     if completion_callback:
@@ -227,15 +240,37 @@ class Controller:
 
     def generate_preview(self) -> Optional[tuple]:
         """
-        Generate a before/after preview.
+        Pick a random input image and generate a fast (proxy) before/after preview.
+        
+        Returns:
+            Tuple of (original_image, processed_image) or None
+        """
+        if not self.preview_engine.load_random():
+            return None
+        
+        return self.preview_engine.render_proxy()
+    
+    def generate_full_preview(self) -> Optional[tuple]:
+        """
+        Generate the before/after preview of the current preview image at full resolution.
         
         Returns:
             Tuple of (original_image, processed_image) or None
         """
-        if not self.batch_runner:
-            self.batch_runner = BatchRunner(self.app_state, self._progress_callback)
+        if not self.preview_engine.has_source and not self.preview_engine.load_random():
+            return None
         
-        return self.batch_runner.get_random_preview()
+        return self.preview_engine.render_full()
+    
+    def request_preview_refresh(self, callback: Callable):
+        """
+        Re-render the current preview after a settings change (debounced, in the background).
+        
+        Does nothing until a preview has been generated. callback(original, processed)
+        is called from the preview thread.
+        """
+        if self.preview_engine.has_source:
+            self.preview_engine.request_refresh(callback)
     
     def get_input_folder(self) -> Optional[str]:
         """Get current input folder."""
@@ -279,7 +314,8 @@ class Controller:
             'fringe_fix_enabled': config.fringe_fix_enabled,
             'fringe_band': config.fringe_band,
             'fringe_strength': config.fringe_strength,
-            'skip_existing': config.skip_existing
+            'skip_existing': config.skip_existing,
+            'output_encoding': config.output_encoding.value
         }
     
     def reset_to_defaults(self):
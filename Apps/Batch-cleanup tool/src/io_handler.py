@@ -2,14 +2,31 @@
 Input/Output operations for file handling.
 """
 
+import io
 import os
+import queue
 import logging
+import threading
 from pathlib import Path
 from typing import List, Tuple, Optional
 from PIL import Image
 
+from .config import OutputEncoding
+
 logger = logging.getLogger(__name__)
 
+# Pillow format, file extension and save() options for each encoding preset.
+# PNG compress_level trades zlib effort for size; optimize=True adds a much
+# slower search on top of level 9. WebP lossless with exact=True keeps the
+# color of fully transparent pixels, like PNG.
+ENCODER_SETTINGS = {
+    OutputEncoding.PNG_FAST: ('PNG', '.png', {'compress_level': 1}),
+    OutputEncoding.PNG_BALANCED: ('PNG', '.png', {'compress_level': 6}),
+    OutputEncoding.PNG_SMALLEST: ('PNG', '.png', {'optimize': True}),
+    OutputEncoding.WEBP_LOSSLESS: ('WEBP', '.webp', {'lossless': True, 'exact': True,
+                                                     'quality': 0, 'method': 0}),
+}
+
 class IOHandler:
     """Handles file input/output operations."""
     
@@ -60,13 +77,30 @@ class IOHandler:
             logger.error(f"Failed to load image {file_path}: {e}")
             return None
     
-    def save_image(self, image: Image.Image, output_path: Path) -> bool:
+    def encode_image(self, image: Image.Image,
+                     encoding: OutputEncoding = OutputEncoding.PNG_BALANCED) -> bytes:
         """
-        Save an image to file.
+        Encode an image to bytes with the given encoding preset.
         
         Args:
-            image: PIL Image to save
-            output_path: Path where to save the image
+            image: PIL Image to encode
+            encoding: Output encoding preset
+            
+        Returns:
+            Encoded file contents
+        """
+        image_format, _, options = ENCODER_SETTINGS[encoding]
+        buffer = io.BytesIO()
+        image.save(buffer, image_format, **options)
+        return buffer.getvalue()
+    
+    def write_bytes(self, data: bytes, output_path: Path) -> bool:
+        """
+        Write encoded image bytes to file.
+        
+        Args:
+            data: Encoded file contents
+            output_path: Path where to write the file
             
         Returns:
             True if successful, False otherwise
@@ -74,9 +108,7 @@ class IOHandler:
         try:
             # Ensure output directory exists
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Save with PNG format to preserve transparency
-            image.save(output_path, 'PNG', optimize=True)
+            output_path.write_bytes(data)
             logger.debug(f"Saved image to {output_path}")
             return True
             
@@ -84,7 +116,29 @@ class IOHandler:
             logger.error(f"Failed to save image to {output_path}: {e}")
             return False
     
-    def generate_output_path(self, input_path: Path, output_folder: str, suffix: str = "_clean") -> Path:
+    def save_image(self, image: Image.Image, output_path: Path,
+                   encoding: OutputEncoding = OutputEncoding.PNG_BALANCED) -> bool:
+        """
+        Save an image to file.
+        
+        Args:
+            image: PIL Image to save
+            output_path: Path where to save the image
+            encoding: Output encoding preset
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            data = self.encode_image(image, encoding)
+        except Exception as e:
+            logger.error(f"Failed to encode image for {output_path}: {e}")
+            return False
+        
+        return self.write_bytes(data, output_path)
+    
+    def generate_output_path(self, input_path: Path, output_folder: str, suffix: str = "_clean",
+                             encoding: OutputEncoding = OutputEncoding.PNG_BALANCED) -> Path:
         """
         Generate output path for processed image.
         
@@ -92,6 +146,7 @@ class IOHandler:
             input_path: Original image path
             output_folder: Output folder path
             suffix: Suffix to add to filename
+            encoding: Output encoding preset (selects the extension)
             
         Returns:
             Path object for the output file
@@ -99,8 +154,9 @@ class IOHandler:
         # Get filename without extension
         base_name = input_path.stem
         
-        # Add suffix and force PNG extension for transparency support
-        output_name = f"{base_name}{suffix}.png"
+        # Add suffix; the extension comes from the (alpha-capable) output format
+        extension = ENCODER_SETTINGS[encoding][1]
+        output_name = f"{base_name}{suffix}{extension}"
         
         return Path(output_folder) / output_name
     
@@ -153,3 +209,44 @@ class IOHandler:
         except Exception as e:
             logger.error(f"Failed to create backup for {file_path}: {e}")
             return False
+
+
+class AsyncWriter:
+    """
+    Writes encoded images to disk on a background thread.
+
+    Workers hand off encoded bytes with submit() and go back to processing.
+    The queue is bounded, so submit() blocks when the disk falls behind
+    instead of holding an unbounded number of encoded images in memory.
+    """
+    
+    def __init__(self, io_handler: IOHandler, max_pending: int = 16):
+        self.io_handler = io_handler
+        self.failed: List[Path] = []
+        self._queue: "queue.Queue[Optional[Tuple[bytes, Path]]]" = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def submit(self, data: bytes, output_path: Path):
+        """Queue encoded bytes to be written to output_path."""
+        self._queue.put((data, output_path))
+    
+    def close(self) -> List[Path]:
+        """
+        Write everything still queued and stop the writer thread.
+        
+        Returns:
+            Output paths that could not be written
+        """
+        self._queue.put(None)
+        self._thread.join()
+        return self.failed
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            data, output_path = item
+            if not self.io_handler.write_bytes(data, output_path):
+                self.failed.append(output_path)
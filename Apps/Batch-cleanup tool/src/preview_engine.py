@@ -0,0 +1,185 @@
+"""
+Cached, debounced before/after preview for the live preview panel.
+"""
+
+import os
+import random
+import logging
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Optional, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .config import AppState
+from .processor import ImageProcessor
+from .io_handler import IOHandler
+
+logger = logging.getLogger(__name__)
+
+class PreviewEngine:
+    """
+    Keeps one decoded preview source and a downscaled proxy of it.
+
+    Parameter changes reprocess only the proxy, on a background thread:
+    requests are debounced, and a request that arrives while another is
+    waiting or running supersedes it, so only the latest settings are shown.
+    The full-resolution result is rendered only on demand.
+    """
+
+    def __init__(self, app_state: AppState, io_handler: Optional[IOHandler] = None,
+                 proxy_size: int = 768, debounce: float = 0.15):
+        """
+        Args:
+            app_state: Shared application state (input folder and config)
+            io_handler: IOHandler used to list and decode images
+            proxy_size: Longest side of the proxy image in pixels
+            debounce: Seconds without a newer request before the proxy is reprocessed
+        """
+        self.app_state = app_state
+        self.io_handler = io_handler or IOHandler()
+        self.proxy_size = proxy_size
+        self.debounce = debounce
+        self.processor = ImageProcessor()
+
+        # Cached folder listing and current source
+        self._listing: Optional[Tuple[str, List[Path]]] = None
+        self._source_key: Optional[Tuple[Path, int]] = None
+        self._original: Optional[Image.Image] = None
+        self._proxy: Optional[Image.Image] = None
+
+        # Latest refresh request: (generation, callback)
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._pending: Optional[Tuple[int, Callable]] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def has_source(self) -> bool:
+        """True once a preview source has been loaded."""
+        return self._proxy is not None
+
+    def load_random(self) -> bool:
+        """
+        Pick a random image from the input folder as the preview source.
+
+        The folder is listed once per input folder; the chosen file is
+        decoded once and kept, together with its proxy, until another file
+        is chosen.
+
+        Returns:
+            True if a source was loaded, False otherwise
+        """
+        folder = self.app_state.input_folder
+        if not folder:
+            return False
+
+        if self._listing is None or self._listing[0] != folder:
+            self._listing = (folder, self.io_handler.get_image_files(folder))
+        image_files = self._listing[1]
+        if not image_files:
+            return False
+
+        return self.load_source(random.choice(image_files))
+
+    def load_source(self, file_path: Path) -> bool:
+        """
+        Decode file_path and build its proxy, unless it is already cached.
+
+        Returns:
+            True if the source is available, False if it could not be decoded
+        """
+        try:
+            key = (file_path, os.stat(file_path).st_mtime_ns)
+        except OSError as e:
+            logger.error(f"Cannot read preview source {file_path}: {e}")
+            return False
+
+        if key == self._source_key:
+            return True
+
+        original = self.io_handler.load_image(file_path)
+        if original is None:
+            return False
+
+        proxy = original.copy()
+        proxy.thumbnail((self.proxy_size, self.proxy_size), Image.Resampling.LANCZOS)
+
+        self._original, self._proxy, self._source_key = original, proxy, key
+        return True
+
+    def render_proxy(self) -> Optional[Tuple[Image.Image, Image.Image]]:
+        """
+        Process the proxy with the current settings.
+
+        Returns:
+            Tuple of (original_proxy, processed_proxy) or None
+        """
+        return self._render(self._proxy)
+
+    def render_full(self) -> Optional[Tuple[Image.Image, Image.Image]]:
+        """
+        Process the full-resolution source with the current settings.
+
+        Returns:
+            Tuple of (original_image, processed_image) or None
+        """
+        return self._render(self._original)
+
+    def request_refresh(self, callback: Callable[[Image.Image, Image.Image], None]):
+        """
+        Reprocess the proxy in the background after the debounce delay.
+
+        callback(original_proxy, processed_proxy) is called on the preview
+        thread for the most recent request only; earlier requests are dropped.
+        """
+        with self._cond:
+            self._generation += 1
+            self._pending = (self._generation, callback)
+            self._cond.notify()
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _render(self, source: Optional[Image.Image]) -> Optional[Tuple[Image.Image, Image.Image]]:
+        if source is None:
+            return None
+
+        try:
+            # Snapshot the settings so UI changes cannot race the processor
+            config = replace(self.app_state.processing_config)
+            processed = self.processor.process_array(np.asarray(source), config)
+            # Return a copy: the caller may resize it in place for display
+            return source.copy(), processed
+        except Exception as e:
+            logger.error(f"Error generating preview: {e}")
+            return None
+
+    def _run(self):
+        """Preview thread: debounce, render the latest request, drop stale results."""
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+
+                # Wait until no newer request arrives for the debounce delay
+                while True:
+                    generation, callback = self._pending
+                    self._cond.wait(self.debounce)
+                    if self._pending[0] == generation:
+                        break
+                self._pending = None
+
+            result = self.render_proxy()
+
+            with self._cond:
+                stale = generation != self._generation
+
+            if result is not None and not stale:
+                try:
+                    callback(*result)
+                except Exception:
+                    logger.exception("Preview callback raised an exception")
@@ -7,6 +7,7 @@ import cv2
 import numpy as np
 from PIL import Image
 import os
+from functools import lru_cache
 from typing import Optional, Tuple
 from .config import ProcessingConfig
 
@@ -14,9 +15,15 @@ from .config import ProcessingConfig
 class ImageProcessor:
     """Handles core image processing operations using OpenCV and NumPy for best results."""
     
-    def __init__(self):
-        """Initialize the processor."""
-        pass
+    def __init__(self, tile_size: int = 1024):
+        """
+        Initialize the processor.
+
+        Args:
+            tile_size: Images larger than this (in either dimension) are
+                processed in tiles of this size; see _process_tiled
+        """
+        self.tile_size = tile_size
     
     def process_image(self, image_path: str, config: ProcessingConfig) -> Optional[Image.Image]:
         """
@@ -35,33 +42,132 @@ class ImageProcessor:
             if image is None:
                 return None
 
-            # Convert to numpy array for processing
-            img_array = np.array(image)
+            return self.process_array(np.asarray(image), config)
 
-            # Ensure RGBA
-            if img_array.shape[2] == 3:
-                # Add alpha channel
-                alpha = np.full((img_array.shape[0], img_array.shape[1], 1), 255, dtype=np.uint8)
-                img_array = np.concatenate([img_array, alpha], axis=2)
+        except Exception as e:
+            print(f"Error processing {image_path}: {e}")
+            return None
 
-            # Apply processing pipeline for the specified number of iterations
-            for _ in range(config.process_iterations):
-                if config.matte_preset.value != "Auto":
-                    img_array = self._unmatte(img_array, config)
+    def process_array(self, img_array: np.ndarray, config: ProcessingConfig) -> Image.Image:
+        """
+        Process an already decoded image according to the configuration.
 
-                img_array = self._refine_alpha(img_array, config)
+        Lets callers that have decoded the file themselves (e.g. the batch
+        workers) skip the second read from disk in process_image.
 
-                if config.fringe_fix_enabled:
-                    img_array = self._fix_fringe(img_array, config)
+        The pipeline is fused: the image is copied once into a working
+        buffer that every step updates in place, and the float alpha buffers
+        are allocated once and reused by every iteration. Color work is
+        limited to the bounding box of the edge band. Images larger than
+        tile_size are processed in tiles.
 
-            # Convert back to PIL Image. Passing a positional 'mode' to Image.fromarray
-            # is deprecated in newer Pillow versions. Create the image and then
-            # explicitly convert to 'RGBA' to ensure correct mode and avoid warnings.
-            return Image.fromarray(img_array).convert('RGBA')
+        Args:
+            img_array: HxWx3 (RGB) or HxWx4 (RGBA) uint8 array
+            config: Processing configuration
 
-        except Exception as e:
-            print(f"Error processing {image_path}: {e}")
-            return None
+        Returns:
+            Processed PIL Image in RGBA mode
+        """
+        if max(img_array.shape[:2]) > self.tile_size:
+            result = self._process_tiled(img_array, config)
+        else:
+            result = self._process_window(img_array, config)
+
+        # Convert back to PIL Image. Passing a positional 'mode' to Image.fromarray
+        # is deprecated in newer Pillow versions. Create the image and then
+        # explicitly convert to 'RGBA' to ensure correct mode and avoid warnings.
+        return Image.fromarray(result).convert('RGBA')
+
+    def _process_window(self, img_array: np.ndarray, config: ProcessingConfig) -> np.ndarray:
+        """Run every iteration of the pipeline on one image or tile window."""
+        height, width = img_array.shape[:2]
+
+        # Single working copy, RGBA
+        work = self._to_rgba(img_array)
+
+        # Float alpha buffers shared by all iterations
+        buffers = (np.empty((height, width), dtype=np.float32),
+                   np.empty((height, width), dtype=np.float32))
+
+        # Apply processing pipeline for the specified number of iterations
+        for _ in range(config.process_iterations):
+            if config.matte_preset.value != "Auto":
+                self._unmatte(work, config)
+
+            self._refine_alpha(work, config, buffers)
+
+            if config.fringe_fix_enabled:
+                self._fix_fringe(work, config)
+
+        return work
+
+    def _process_tiled(self, img_array: np.ndarray, config: ProcessingConfig) -> np.ndarray:
+        """
+        Process a large image tile by tile.
+
+        Each tile is processed from a window padded by the pipeline's halo
+        (see _halo), so its pixels see the same neighbourhood as in a
+        full-image pass, and only the tile itself is written back. Tiles whose
+        window is entirely transparent or entirely opaque are left untouched:
+        no step changes such regions. Peak memory is the input, the output and
+        one window instead of several full-size float and mask arrays.
+        """
+        height, width = img_array.shape[:2]
+        result = self._to_rgba(img_array)
+
+        # RGB input is fully opaque, which no step changes
+        if img_array.shape[2] != 4:
+            return result
+
+        # Windows are read from the unmodified input, never from result
+        source_alpha = img_array[:, :, 3]
+        tile = self.tile_size
+        halo = self._halo(config)
+
+        for y0 in range(0, height, tile):
+            y1 = min(y0 + tile, height)
+            wy0, wy1 = max(0, y0 - halo), min(height, y1 + halo)
+
+            for x0 in range(0, width, tile):
+                x1 = min(x0 + tile, width)
+                wx0, wx1 = max(0, x0 - halo), min(width, x1 + halo)
+
+                window_alpha = source_alpha[wy0:wy1, wx0:wx1]
+                low, high = int(window_alpha.min()), int(window_alpha.max())
+                if low == high and low in (0, 255):
+                    continue
+
+                processed = self._process_window(img_array[wy0:wy1, wx0:wx1], config)
+                result[y0:y1, x0:x1] = processed[y0 - wy0:y1 - wy0, x0 - wx0:x1 - wx0]
+
+        return result
+
+    @staticmethod
+    def _halo(config: ProcessingConfig) -> int:
+        """
+        How far (in pixels) a change can spread over all iterations.
+
+        Per iteration: the unmatte band (2), one pixel per smoothing pass, the
+        feather radius, the edge shift, and the fringe band dilation plus its
+        box filter (2 * fringe_band).
+        """
+        per_iteration = config.smooth + config.feather + abs(config.shift_edge)
+        if config.matte_preset.value != "Auto":
+            per_iteration += 2
+        if config.fringe_fix_enabled:
+            per_iteration += 2 * config.fringe_band
+        return per_iteration * config.process_iterations
+
+    @staticmethod
+    def _to_rgba(img_array: np.ndarray) -> np.ndarray:
+        """Copy an RGB or RGBA uint8 array into a new RGBA array."""
+        rgba = np.empty(img_array.shape[:2] + (4,), dtype=np.uint8)
+        rgba[:, :, :3] = img_array[:, :, :3]
+        if img_array.shape[2] == 4:
+            rgba[:, :, 3] = img_array[:, :, 3]
+        else:
+            rgba[:, :, 3] = 255
+        return rgba
     
     def _load_image(self, image_path: str) -> Optional[Image.Image]:
         """Load image from file path."""
@@ -74,154 +180,180 @@ class ImageProcessor:
             print(f"Error loading {image_path}: {e}")
             return None
     
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _morph_kernel(steps: int) -> np.ndarray:
+        """
+        Structuring element equal to `steps` chained 3x3 elliptical passes.
+
+        Dilating (or eroding) once with this kernel gives the same result as
+        `steps` single passes with the 3x3 kernel, in one pass over the image.
+        """
+        base = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        kernel = base
+        for _ in range(steps - 1):
+            # Minkowski sum of the current kernel with the 3x3 base
+            size = kernel.shape[0] + 2
+            grown = np.zeros((size, size), dtype=np.uint8)
+            for dy, dx in zip(*np.nonzero(base)):
+                grown[dy:dy + kernel.shape[0], dx:dx + kernel.shape[1]] |= kernel
+            kernel = grown
+        return kernel
+
+    @staticmethod
+    def _band_roi(mask: np.ndarray, pad: int = 0) -> Optional[Tuple[slice, slice]]:
+        """Bounding box of a boolean mask, grown by pad and clipped to the image."""
+        x, y, w, h = cv2.boundingRect(mask.astype(np.uint8))
+        if w == 0 or h == 0:
+            return None
+        height, width = mask.shape
+        return (slice(max(0, y - pad), min(height, y + h + pad)),
+                slice(max(0, x - pad), min(width, x + w + pad)))
+
     def _unmatte(self, img_array: np.ndarray, config: ProcessingConfig) -> np.ndarray:
         """
         Remove matte contamination from edges using advanced techniques.
+
+        Updates img_array in place and returns it.
         """
-        height, width = img_array.shape[:2]
-        result = img_array.copy()
-        
+        if config.matte_preset.value not in ("White Matte", "Black Matte"):
+            return img_array
+
         # Extract alpha channel
         alpha = img_array[:, :, 3]
         
-        # Find edge regions (pixels that are semi-transparent)
-        edge_mask = (alpha > 10) & (alpha < 245)
-        
-        # Create dilated and eroded versions to find edge bands
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-        alpha_dilated = cv2.dilate(alpha, kernel, iterations=2)
-        alpha_eroded = cv2.erode(alpha, kernel, iterations=1)
-        
-        # Edge band is the difference
+        # Edge band is where dilated and eroded alpha differ
+        alpha_dilated = cv2.dilate(alpha, self._morph_kernel(2))
+        alpha_eroded = cv2.erode(alpha, self._morph_kernel(1))
         edge_band = (alpha_dilated > alpha_eroded) & (alpha > 0)
-        
+
+        roi = self._band_roi(edge_band)
+        if roi is None:
+            return img_array
+
+        band = edge_band[roi]
+        colors = img_array[roi][:, :, :3]
+        channel = colors[band].astype(np.float32)
+        alpha_ratio = alpha[roi][band].astype(np.float32)[:, None] / 255.0
+
         if config.matte_preset.value == "White Matte":
-            # Remove white contamination
-            for c in range(3):  # RGB channels
-                channel = result[:, :, c].astype(np.float32)
-                
-                # For edge pixels, remove white bias
-                white_mask = edge_band & (channel > 200)
-                if np.any(white_mask):
-                    # Reduce white contamination
-                    alpha_ratio = alpha[white_mask].astype(np.float32) / 255.0
-                    contamination = (255 - channel[white_mask]) * (1 - alpha_ratio) * 0.5
-                    channel[white_mask] = np.clip(channel[white_mask] - contamination, 0, 255)
-                
-                result[:, :, c] = channel.astype(np.uint8)
-        
-        elif config.matte_preset.value == "Black Matte":
-            # Remove black contamination
-            for c in range(3):  # RGB channels
-                channel = result[:, :, c].astype(np.float32)
-                
-                # For edge pixels, remove black bias
-                black_mask = edge_band & (channel < 50)
-                if np.any(black_mask):
-                    # Reduce black contamination
-                    alpha_ratio = alpha[black_mask].astype(np.float32) / 255.0
-                    contamination = channel[black_mask] * (1 - alpha_ratio) * 0.5
-                    channel[black_mask] = np.clip(channel[black_mask] + contamination, 0, 255)
-                
-                result[:, :, c] = channel.astype(np.uint8)
-        
-        return result
+            # Reduce white contamination on bright edge pixels
+            contamination = (255 - channel) * (1 - alpha_ratio) * 0.5
+            channel = np.where(channel > 200, np.clip(channel - contamination, 0, 255), channel)
+        else:
+            # Reduce black contamination on dark edge pixels
+            contamination = channel * (1 - alpha_ratio) * 0.5
+            channel = np.where(channel < 50, np.clip(channel + contamination, 0, 255), channel)
+
+        colors[band] = channel.astype(np.uint8)
+        return img_array
     
-    def _refine_alpha(self, img_array: np.ndarray, config: ProcessingConfig) -> np.ndarray:
-        """Refine alpha channel with smoothing, feathering, contrast, and edge shift."""
-        result = img_array.copy()
-        alpha = result[:, :, 3].astype(np.float32)
+    def _refine_alpha(self, img_array: np.ndarray, config: ProcessingConfig,
+                      buffers: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> np.ndarray:
+        """
+        Refine alpha channel with smoothing, feathering, contrast, and edge shift.
+
+        Updates img_array in place and returns it. buffers is an optional
+        pair of HxW float32 scratch arrays reused across calls.
+        """
+        if buffers is None:
+            buffers = (np.empty(img_array.shape[:2], dtype=np.float32),
+                       np.empty(img_array.shape[:2], dtype=np.float32))
+        alpha, scratch = buffers
+        np.copyto(alpha, img_array[:, :, 3])
         
         # Smoothing
-        if config.smooth > 0:
-            for _ in range(config.smooth):
-                alpha = cv2.GaussianBlur(alpha, (3, 3), 0.5)
+        for _ in range(config.smooth):
+            scratch = cv2.GaussianBlur(alpha, (3, 3), 0.5, dst=scratch)
+            alpha, scratch = scratch, alpha
         
         # Feathering (more blur)
         if config.feather > 0:
             kernel_size = config.feather * 2 + 1
-            alpha = cv2.GaussianBlur(alpha, (kernel_size, kernel_size), config.feather * 0.5)
+            scratch = cv2.GaussianBlur(alpha, (kernel_size, kernel_size), config.feather * 0.5, dst=scratch)
+            alpha, scratch = scratch, alpha
         
         # Contrast adjustment
         if config.contrast != 1.0:
             # Apply contrast: new_alpha = ((alpha / 255.0 - 0.5) * contrast + 0.5) * 255.0
-            alpha = np.clip(((alpha / 255.0 - 0.5) * config.contrast + 0.5) * 255.0, 0, 255)
+            np.divide(alpha, 255.0, out=alpha)
+            np.subtract(alpha, 0.5, out=alpha)
+            np.multiply(alpha, config.contrast, out=alpha)
+            np.add(alpha, 0.5, out=alpha)
+            np.multiply(alpha, 255.0, out=alpha)
+            np.clip(alpha, 0, 255, out=alpha)
         
-        # Edge shift (erosion/dilation)
+        # Edge shift: one pass with a kernel covering all shift steps
         if config.shift_edge != 0:
-            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+            kernel = self._morph_kernel(abs(config.shift_edge))
             if config.shift_edge > 0:
                 # Dilate (expand edges outward)
-                for _ in range(config.shift_edge):
-                    alpha = cv2.dilate(alpha, kernel, iterations=1)
+                scratch = cv2.dilate(alpha, kernel, dst=scratch)
             else:
                 # Erode (contract edges inward)
-                for _ in range(abs(config.shift_edge)):
-                    alpha = cv2.erode(alpha, kernel, iterations=1)
+                scratch = cv2.erode(alpha, kernel, dst=scratch)
+            alpha, scratch = scratch, alpha
         
-        result[:, :, 3] = alpha.astype(np.uint8)
-        return result
+        np.copyto(img_array[:, :, 3], alpha, casting='unsafe')
+        return img_array
     
     def _fix_fringe(self, img_array: np.ndarray, config: ProcessingConfig) -> np.ndarray:
         """
         Advanced fringe fixing using color analysis and inpainting.
+
+        Each edge-band pixel is blended towards the alpha-weighted mean color of
+        the solid (alpha > 200) pixels in its (2*band+1)^2 neighbourhood. The
+        mean is evaluated for all pixels at once as a normalized convolution:
+        box(color * alpha * solid) / box(alpha * solid), restricted to the
+        bounding box of the band. Updates img_array in place and returns it.
+
+        Neighbours are read from the input, not from already-blended pixels as
+        the old per-pixel loop did, so fringe pixels can differ from that loop
+        by tens of levels (see bench_fringe_fix.py).
         """
-        result = img_array.copy()
-        height, width = img_array.shape[:2]
-        
         # Extract alpha channel
         alpha = img_array[:, :, 3]
-        
+
         # Create edge mask based on band setting
         band_size = config.fringe_band
         kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (band_size * 2 + 1, band_size * 2 + 1))
-        
+
         # Find semi-transparent edge regions
         edge_mask = (alpha > 10) & (alpha < 240)
-        
+
         # Dilate the edge mask to get the band
         dilated_edges = cv2.dilate(edge_mask.astype(np.uint8), kernel, iterations=1)
-        edge_band = dilated_edges & (alpha > 0)
-        
-        # For each color channel, fix fringe colors
-        for c in range(3):  # RGB channels
-            channel = result[:, :, c].astype(np.float32)
-            
-            # Find pixels in the edge band
-            edge_pixels = np.where(edge_band)
-            
-            if len(edge_pixels[0]) == 0:
-                continue
-            
-            # For each edge pixel, find nearby solid pixels and blend
-            for i in range(len(edge_pixels[0])):
-                y, x = edge_pixels[0][i], edge_pixels[1][i]
-                
-                # Define neighborhood
-                y_min, y_max = max(0, y - band_size), min(height, y + band_size + 1)
-                x_min, x_max = max(0, x - band_size), min(width, x + band_size + 1)
-                
-                # Get neighborhood alpha and color values
-                neighbor_alpha = alpha[y_min:y_max, x_min:x_max]
-                neighbor_color = channel[y_min:y_max, x_min:x_max]
-                
-                # Find solid pixels (high alpha) in neighborhood
-                solid_mask = neighbor_alpha > 200
-                
-                if np.any(solid_mask):
-                    # Calculate weighted average of solid pixels
-                    solid_colors = neighbor_color[solid_mask]
-                    weights = neighbor_alpha[solid_mask].astype(np.float32) / 255.0
-                    
-                    if len(solid_colors) > 0:
-                        weighted_avg = np.average(solid_colors, weights=weights)
-                        
-                        # Blend based on strength
-                        strength = config.fringe_strength / 3.0
-                        current_color = channel[y, x]
-                        new_color = current_color * (1 - strength) + weighted_avg * strength
-                        channel[y, x] = new_color
-            
-            result[:, :, c] = np.clip(channel, 0, 255).astype(np.uint8)
-        
-        return result
+        edge_band = (dilated_edges > 0) & (alpha > 0)
+
+        # Neighbourhoods of band pixels stay inside the padded box; outside
+        # the image the zero padding below matches the clipped neighbourhood
+        roi = self._band_roi(edge_band, pad=band_size)
+        if roi is None:
+            return img_array
+
+        alpha = alpha[roi]
+        edge_band = edge_band[roi]
+        colors_view = img_array[roi][:, :, :3]
+
+        # Solid-pixel weights (alpha / 255 where alpha > 200, else 0)
+        weights = np.where(alpha > 200, alpha.astype(np.float32) / 255.0, np.float32(0.0))
+        colors = colors_view.astype(np.float32)
+
+        # Unnormalized box sums over the square neighbourhood
+        ksize = (band_size * 2 + 1, band_size * 2 + 1)
+        weighted_sum = cv2.boxFilter(colors * weights[:, :, None], -1, ksize,
+                                     normalize=False, borderType=cv2.BORDER_CONSTANT)
+        weight_sum = cv2.boxFilter(weights, -1, ksize,
+                                   normalize=False, borderType=cv2.BORDER_CONSTANT)
+
+        # Only band pixels with at least one solid neighbour are changed
+        target = edge_band & (weight_sum > 1e-6)
+        weighted_avg = weighted_sum[target] / weight_sum[target][:, None]
+
+        # Blend based on strength
+        strength = config.fringe_strength / 3.0
+        current_color = colors[target]
+        new_color = current_color * (1 - strength) + weighted_avg * strength
+        colors_view[target] = np.clip(new_color, 0, 255).astype(np.uint8)
+
+        return img_array
@@ -1,10 +1,15 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+import os
 import re
+import sqlite3
 
 from PIL import Image
 import imagehash
 import cv2
-from rapidfuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
 from skimage.metrics import structural_similarity as ssim
 
 
@@ -12,6 +17,9 @@ IMAGE_EXTENSIONS = {
     ".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff"
 }
 
+# Bump when extract_features changes so cached features are recomputed
+FEATURE_VERSION = 1
+
 
 def clean_name(file_name: str) -> str:
     name = Path(file_name).stem.lower()
@@ -45,14 +53,200 @@ def load_image_cv(path: Path, size=(512, 512)):
     return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
 
 
+@dataclass
+class ImageFeatures:
+    """Everything the matcher needs from one image, computed from a single decode."""
+    path: Path
+    clean_name: str
+    phash: int | None = None
+    gray: np.ndarray | None = None
+    hist: np.ndarray | None = None
+
+
+def extract_features(path: Path, size=(512, 512)) -> ImageFeatures:
+    features = ImageFeatures(path=path, clean_name=clean_name(path.name))
+    img = cv2.imread(str(path), cv2.IMREAD_COLOR)
+
+    if img is None:
+        return features
+
+    try:
+        rgb = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        features.phash = int(str(imagehash.phash(rgb)), 16)
+    except Exception:
+        features.phash = None
+
+    small = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+    features.gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    features.hist = hsv_histogram(small)
+
+    return features
+
+
+def hsv_histogram(img):
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0, 1], None, [50, 60], [0, 180, 0, 256])
+    cv2.normalize(hist, hist)
+    return hist
+
+
+class FeatureCache:
+    """
+    On-disk SQLite cache of ImageFeatures keyed by path, size and mtime.
+
+    Unchanged files are loaded from the cache instead of being decoded again.
+    Thumbnails are stored as lossless PNG to keep the cache compact.
+    """
+
+    def __init__(self, cache_path):
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS features (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    version INTEGER NOT NULL,
+                    phash TEXT,
+                    gray BLOB,
+                    hist BLOB
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.cache_path)
+
+    @staticmethod
+    def _file_key(path: Path):
+        stat = path.stat()
+        return str(path.resolve()), stat.st_size, stat.st_mtime_ns
+
+    def get_many(self, paths: list[Path]) -> dict[Path, ImageFeatures]:
+        found = {}
+
+        with self._connect() as conn:
+            for path in paths:
+                try:
+                    key, size, mtime_ns = self._file_key(path)
+                except OSError:
+                    continue
+
+                row = conn.execute(
+                    "SELECT phash, gray, hist FROM features "
+                    "WHERE path = ? AND size = ? AND mtime_ns = ? AND version = ?",
+                    (key, size, mtime_ns, FEATURE_VERSION),
+                ).fetchone()
+
+                if row is None:
+                    continue
+
+                phash, gray, hist = row
+                found[path] = ImageFeatures(
+                    path=path,
+                    clean_name=clean_name(path.name),
+                    phash=int(phash, 16) if phash is not None else None,
+                    gray=cv2.imdecode(np.frombuffer(gray, np.uint8), cv2.IMREAD_GRAYSCALE) if gray else None,
+                    hist=np.frombuffer(hist, np.float32).reshape(50, 60).copy() if hist else None,
+                )
+
+        return found
+
+    def put_many(self, features: list[ImageFeatures]):
+        rows = []
+
+        for feat in features:
+            try:
+                key, size, mtime_ns = self._file_key(feat.path)
+            except OSError:
+                continue
+
+            gray = None
+            if feat.gray is not None:
+                ok, encoded = cv2.imencode(".png", feat.gray)
+                gray = encoded.tobytes() if ok else None
+
+            rows.append((
+                key, size, mtime_ns, FEATURE_VERSION,
+                f"{feat.phash:016x}" if feat.phash is not None else None,
+                gray,
+                feat.hist.astype(np.float32).tobytes() if feat.hist is not None else None,
+            ))
+
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO features "
+                "(path, size, mtime_ns, version, phash, gray, hist) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+
+def extract_all_features(
+    paths: list[Path],
+    cache: FeatureCache | None = None,
+    workers: int | None = None,
+    log=None,
+) -> list[ImageFeatures]:
+    """
+    Return ImageFeatures for every path, in order.
+
+    Cached features are reused; the remaining files are decoded across a
+    process pool and written back to the cache.
+    """
+    cached = cache.get_many(paths) if cache else {}
+    missing = [path for path in paths if path not in cached]
+
+    if log:
+        log(f"Features cached: {len(cached)} | to extract: {len(missing)}")
+
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1 and len(missing) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as executor:
+            chunksize = max(1, len(missing) // (workers * 4))
+            extracted = list(executor.map(extract_features, missing, chunksize=chunksize))
+    else:
+        extracted = [extract_features(path) for path in missing]
+
+    if cache and extracted:
+        cache.put_many(extracted)
+
+    cached.update(zip(missing, extracted))
+    return [cached[path] for path in paths]
+
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    return (hash_a ^ hash_b).bit_count()
+
+
+def phash_similarity(distance: int) -> float:
+    return max(0, min(100 - distance * 3, 100))
+
+
+def ssim_similarity(gray_a, gray_b) -> float:
+    if gray_a is None or gray_b is None:
+        return 0
+
+    return max(0, min(ssim(gray_a, gray_b) * 100, 100))
+
+
+def hist_similarity(hist_a, hist_b) -> float:
+    if hist_a is None or hist_b is None:
+        return 0
+
+    similarity = cv2.compareHist(hist_a, hist_b, cv2.HISTCMP_CORREL)
+    return max(0, min(similarity * 100, 100))
+
+
 def phash_score(path_a: Path, path_b: Path) -> float:
     try:
         with Image.open(path_a) as img_a, Image.open(path_b) as img_b:
             hash_a = imagehash.phash(img_a.convert("RGB"))
             hash_b = imagehash.phash(img_b.convert("RGB"))
 
-        distance = hash_a - hash_b
-        return max(0, min(100 - distance * 3, 100))
+        return phash_similarity(hash_a - hash_b)
 
     except Exception:
         return 0
@@ -68,7 +262,7 @@ def ssim_score(path_a: Path, path_b: Path) -> float:
     gray_a = cv2.cvtColor(img_a, cv2.COLOR_BGR2GRAY)
     gray_b = cv2.cvtColor(img_b, cv2.COLOR_BGR2GRAY)
 
-    return max(0, min(ssim(gray_a, gray_b) * 100, 100))
+    return ssim_similarity(gray_a, gray_b)
 
 
 def color_hist_score(path_a: Path, path_b: Path) -> float:
@@ -78,17 +272,144 @@ def color_hist_score(path_a: Path, path_b: Path) -> float:
     if img_a is None or img_b is None:
         return 0
 
-    hsv_a = cv2.cvtColor(img_a, cv2.COLOR_BGR2HSV)
-    hsv_b = cv2.cvtColor(img_b, cv2.COLOR_BGR2HSV)
+    return hist_similarity(hsv_histogram(img_a), hsv_histogram(img_b))
 
-    hist_a = cv2.calcHist([hsv_a], [0, 1], None, [50, 60], [0, 180, 0, 256])
-    hist_b = cv2.calcHist([hsv_b], [0, 1], None, [50, 60], [0, 180, 0, 256])
 
-    cv2.normalize(hist_a, hist_a)
-    cv2.normalize(hist_b, hist_b)
+class BKTree:
+    """Burkhard-Keller tree over 64-bit pHashes for Hamming-radius queries."""
 
-    similarity = cv2.compareHist(hist_a, hist_b, cv2.HISTCMP_CORREL)
-    return max(0, min(similarity * 100, 100))
+    def __init__(self):
+        self.root = None
+
+    def add(self, phash: int, item):
+        node = self.root
+
+        if node is None:
+            self.root = [phash, [item], {}]
+            return
+
+        while True:
+            distance = hamming_distance(phash, node[0])
+
+            if distance == 0:
+                node[1].append(item)
+                return
+
+            child = node[2].get(distance)
+
+            if child is None:
+                node[2][distance] = [phash, [item], {}]
+                return
+
+            node = child
+
+    def search(self, phash: int, radius: int) -> list:
+        found = []
+        stack = [self.root] if self.root is not None else []
+
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(phash, node[0])
+
+            if distance <= radius:
+                found.extend(node[1])
+
+            # Triangle inequality: only children within [d - r, d + r] can match
+            for child_distance, child in node[2].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+
+        return found
+
+
+class TargetIndex:
+    """Name index plus pHash BK-tree over the target feature table."""
+
+    def __init__(self, targets: list[ImageFeatures]):
+        self.targets = targets
+        self.names = {}
+        self.phash_tree = BKTree()
+
+        for index, feat in enumerate(targets):
+            # Identical clean names share one fuzzy comparison
+            self.names.setdefault(feat.clean_name, []).append(index)
+
+            if feat.phash is not None:
+                self.phash_tree.add(feat.phash, index)
+
+        self.name_keys = list(self.names)
+
+    def name_candidates(self, clean_source: str, min_score: float = 30) -> dict[int, float]:
+        matches = process.extract(
+            clean_source, self.name_keys, scorer=fuzz.ratio,
+            score_cutoff=min_score, limit=None,
+        )
+        candidates = {}
+
+        for name, score, _ in matches:
+            for index in self.names[name]:
+                candidates[index] = score
+
+        return candidates
+
+    def phash_candidates(self, phash: int, radius: int) -> set[int]:
+        return set(self.phash_tree.search(phash, radius))
+
+
+def best_match(source: ImageFeatures, index: TargetIndex, max_phash_distance: int | None = None):
+    """
+    Find the best-scoring target for one source image.
+
+    Candidates come from the name index (same name_score >= 30 cut as the pair
+    loop), optionally narrowed to targets within max_phash_distance via the
+    BK-tree. SSIM and color are only computed while a candidate can still beat
+    the current best, using 100 as their upper bound.
+    """
+    candidates = index.name_candidates(source.clean_name)
+
+    if max_phash_distance is not None and source.phash is not None:
+        near = index.phash_candidates(source.phash, max_phash_distance)
+        candidates = {i: s for i, s in candidates.items() if i in near}
+
+    ranked = []
+
+    for target_index, name_score in candidates.items():
+        target = index.targets[target_index]
+
+        if source.phash is None or target.phash is None:
+            p_score = 0
+        else:
+            p_score = phash_similarity(hamming_distance(source.phash, target.phash))
+
+        upper = final_score(name_score, p_score, 100, 100)
+        ranked.append((upper, target_index, name_score, p_score))
+
+    ranked.sort(key=lambda item: (-item[0], item[1]))
+    best = None
+    best_index = None
+
+    for upper, target_index, name_score, p_score in ranked:
+        if best is not None and upper < best["score"]:
+            break
+
+        target = index.targets[target_index]
+        s_score = ssim_similarity(source.gray, target.gray)
+        c_score = hist_similarity(source.hist, target.hist)
+        score = final_score(name_score, p_score, s_score, c_score)
+
+        # Ties keep the target that comes first in folder order
+        if best is None or score > best["score"] or (score == best["score"] and target_index < best_index):
+            best_index = target_index
+            best = {
+                "target": target.path,
+                "score": score,
+                "name": name_score,
+                "phash": p_score,
+                "ssim": s_score,
+                "color": c_score,
+            }
+
+    return best
 
 
 def final_score(name_score, phash, structure, color):
@@ -106,6 +427,9 @@ def compare_folders(
     done_threshold: float = 75,
     maybe_threshold: float = 50,
     log_callback=None,
+    max_phash_distance: int | None = None,
+    cache_path: str | None = None,
+    workers: int | None = None,
 ):
     source = Path(source_folder).resolve()
     target = Path(target_folder).resolve()
@@ -127,6 +451,8 @@ def compare_folders(
 
     log(f"Source images: {len(source_images)}")
     log(f"Target images: {len(target_images)}")
+    if max_phash_distance is not None:
+        log(f"Max pHash distance: {max_phash_distance}")
     log("")
 
     report = []
@@ -134,33 +460,17 @@ def compare_folders(
     maybe = []
     not_done = []
 
-    target_clean_names = [(img, clean_name(img.name)) for img in target_images]
-
-    for index, source_img in enumerate(source_images):
-        clean_source = clean_name(source_img.name)
-        best = None
-
-        for target_img, clean_target in target_clean_names:
-            name_score = fuzz.ratio(clean_source, clean_target)
-
-            if name_score < 30:
-                continue
-
-            p_score = phash_score(source_img, target_img)
-            s_score = ssim_score(source_img, target_img)
-            c_score = color_hist_score(source_img, target_img)
-
-            score = final_score(name_score, p_score, s_score, c_score)
-
-            if best is None or score > best["score"]:
-                best = {
-                    "target": target_img,
-                    "score": score,
-                    "name": name_score,
-                    "phash": p_score,
-                    "ssim": s_score,
-                    "color": c_score,
-                }
+    # Phase 1: decode every image exactly once into a feature table
+    log("Extracting features...")
+    cache = FeatureCache(cache_path) if cache_path else None
+    features = extract_all_features(source_images + target_images, cache, workers, log)
+    source_features = features[:len(source_images)]
+    target_index = TargetIndex(features[len(source_images):])
+
+    # Phase 2: indexed matching on the precomputed features
+    for index, source_feat in enumerate(source_features):
+        source_img = source_feat.path
+        best = best_match(source_feat, target_index, max_phash_distance)
 
         if best is None:
             not_done.append(source_img)
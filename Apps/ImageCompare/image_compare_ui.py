@@ -4,6 +4,13 @@ from tkinter import filedialog, messagebox
 
 from image_compare_core import compare_folders
 
+# Decoded image features are reused between runs for unchanged files
+FEATURE_CACHE_PATH = Path(__file__).resolve().parent / "cache" / "features.sqlite"
+
+# Empty compares every name candidate. pHash is only 35% of the score, so a
+# target at any distance can still be the best match; a radius is opt-in.
+DEFAULT_MAX_PHASH_DISTANCE = ""
+
 
 class ImageCompareApp(ctk.CTk):
     def __init__(self):
@@ -19,6 +26,7 @@ class ImageCompareApp(ctk.CTk):
         self.target_folder = ctk.StringVar()
         self.done_score = ctk.StringVar(value="75")
         self.maybe_score = ctk.StringVar(value="50")
+        self.max_phash_distance = ctk.StringVar(value=DEFAULT_MAX_PHASH_DISTANCE)
 
         self.create_ui()
 
@@ -42,7 +50,10 @@ class ImageCompareApp(ctk.CTk):
         ctk.CTkEntry(settings, textvariable=self.done_score).pack(fill="x", padx=10, pady=5)
 
         ctk.CTkLabel(settings, text="Maybe Score").pack(anchor="w", padx=10, pady=(10, 0))
-        ctk.CTkEntry(settings, textvariable=self.maybe_score).pack(fill="x", padx=10, pady=(5, 10))
+        ctk.CTkEntry(settings, textvariable=self.maybe_score).pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(settings, text="Max pHash Distance (0-64, empty = compare all; a radius may drop valid matches)").pack(anchor="w", padx=10, pady=(10, 0))
+        ctk.CTkEntry(settings, textvariable=self.max_phash_distance).pack(fill="x", padx=10, pady=(5, 10))
 
         self.run_button = ctk.CTkButton(
             self,
@@ -115,6 +126,13 @@ class ImageCompareApp(ctk.CTk):
             messagebox.showerror("Error", "Scores must be numbers.")
             return
 
+        max_distance_text = self.max_phash_distance.get().strip()
+        try:
+            max_phash_distance = int(max_distance_text) if max_distance_text else None
+        except ValueError:
+            messagebox.showerror("Error", "Max pHash distance must be a whole number.")
+            return
+
         self.run_button.configure(state="disabled", text="Running...")
 
         try:
@@ -124,6 +142,8 @@ class ImageCompareApp(ctk.CTk):
                 done_threshold=done_threshold,
                 maybe_threshold=maybe_threshold,
                 log_callback=self.log,
+                max_phash_distance=max_phash_distance,
+                cache_path=str(FEATURE_CACHE_PATH),
             )
 
             self.log("")
@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import numpy as np
+
+from image_compare_core import ImageFeatures, TargetIndex, best_match, hsv_histogram
+
+
+def make_features(name, phash, seed):
+    rng = np.random.default_rng(seed)
+    img = (rng.random((64, 64, 3)) * 255).astype(np.uint8)
+    return ImageFeatures(
+        path=Path(f"{name}.png"),
+        clean_name=name,
+        phash=phash,
+        gray=img[:, :, 0].copy(),
+        hist=hsv_histogram(img),
+    )
+
+
+def test_phash_distant_target_still_matched_by_default():
+    source = make_features("oak_tree", 0, seed=1)
+    # Same name and pixels, but 40 of 64 pHash bits differ: pHash scores 0
+    target = make_features("oak_tree", (1 << 40) - 1, seed=1)
+    index = TargetIndex([target])
+
+    best = best_match(source, index)
+    assert best is not None
+    assert best["target"] == target.path
+    assert best["phash"] == 0
+    # 25 (name) + 25 (SSIM) + 15 (color) is still above the default maybe threshold of 50
+    assert best["score"] == 65
+
+
+def test_phash_radius_excludes_distant_targets():
+    source = make_features("oak_tree", 0, seed=1)
+    near = make_features("oak_tree", 0b111, seed=2)
+    far = make_features("oak_tree", (1 << 40) - 1, seed=1)
+    index = TargetIndex([far, near])
+
+    assert best_match(source, index)["target"] == far.path
+    assert best_match(source, index, max_phash_distance=10)["target"] == near.path
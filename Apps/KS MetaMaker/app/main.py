@@ -30,6 +30,7 @@ except ImportError as e:
 from ks_metamaker.utils.config import Config
 from ks_metamaker.ingest import ImageIngester
 from ks_metamaker.tagger import ImageTagger
+from ks_metamaker.pipeline import TaggingPipeline
 from ks_metamaker.rename import FileRenamer
 from ks_metamaker.organize import FileOrganizer
 from ks_metamaker.export import DatasetExporter
@@ -69,16 +70,18 @@ class ProcessingWorker(QThread):
             self.progress.emit(10, "Ingesting images...")
             images = ingester.ingest(self.input_dir)
 
-            # Process each image
+            # Tag in batches while decoding ahead and writing behind
+            performance = self.config.performance or {}
+            pipeline = TaggingPipeline(
+                tagger,
+                batch_size=performance.get('batch_size', 4),
+                decode_workers=performance.get('threads', 4)
+            )
+
             results = {}
             total = len(images)
-            for i, image_path in enumerate(images):
-                progress = 10 + (i / total) * 80
-                self.progress.emit(int(progress), f"Processing {image_path.name}...")
-
-                # Tag image
-                tags = tagger.tag(image_path)
 
+            def handle_result(image_path: Path, tags: list):
                 # Rename and organize
                 new_path = renamer.rename(image_path, tags)
                 organized_path = organizer.organize(new_path, tags[0] if tags else "unknown")
@@ -106,6 +109,12 @@ class ProcessingWorker(QThread):
                     'new_path': str(organized_path)
                 }
 
+                progress = 10 + (len(results) / total) * 80
+                self.progress.emit(int(progress), f"Processed {image_path.name}")
+
+            self.progress.emit(10, f"Processing {total} images...")
+            pipeline.run(images, handle_result)
+
             # Finalize export
             self.progress.emit(95, "Finalizing export...")
             exporter.finalize_export(self.output_dir)
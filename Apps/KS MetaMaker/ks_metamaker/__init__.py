@@ -2,27 +2,37 @@
 KS MetaMaker - AI-assisted local utility for tagging, renaming, and organizing visual assets
 """
 
+import importlib
+
 __version__ = "0.1.0"
 __author__ = "Kalponic Studio"
 
-from .ingest import ImageIngester
-from .tagger import ImageTagger
-from .rename import FileRenamer
-from .organize import FileOrganizer
-from .export import DatasetExporter
-from .hardware_detector import HardwareDetector
-from .model_recommender import ModelRecommender
-from .model_downloader import ModelDownloader
-from .hardware_setup_dialog import HardwareSetupDialog
-
-__all__ = [
-    "ImageIngester",
-    "ImageTagger",
-    "FileRenamer",
-    "FileOrganizer",
-    "DatasetExporter",
-    "HardwareDetector",
-    "ModelRecommender",
-    "ModelDownloader",
-    "HardwareSetupDialog"
-]
\ No newline at end of file
+# Submodules are imported on first attribute access, so that importing one
+# light module (e.g. ingest in a scan worker process) doesn't pull in torch,
+# open_clip, transformers or PyQt6 through the others.
+_EXPORTS = {
+    "ImageIngester": ".ingest",
+    "IngestRecord": ".ingest",
+    "ImageTagger": ".tagger",
+    "FileRenamer": ".rename",
+    "FileOrganizer": ".organize",
+    "DatasetExporter": ".export",
+    "HardwareDetector": ".hardware_detector",
+    "ModelRecommender": ".model_recommender",
+    "ModelDownloader": ".model_downloader",
+    "HardwareSetupDialog": ".hardware_setup_dialog",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
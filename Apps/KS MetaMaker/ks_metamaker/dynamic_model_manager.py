@@ -6,8 +6,9 @@ Manages AI model loading/unloading for optimal memory usage across different har
 
 import gc
 import logging
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import threading
@@ -25,6 +26,14 @@ except ImportError:
     ONNX_AVAILABLE = False
     logger.warning("ONNX Runtime not available, using CPU-only mode")
 
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+_MB = 1024 * 1024
+
 
 class ModelType(Enum):
     """Types of AI models"""
@@ -50,6 +59,10 @@ class ModelInfo:
     last_used: Optional[float] = None
     memory_usage_mb: int = 0
     input_shape: Tuple[int, ...] = None
+    model_key: Optional[str] = None  # Library model identity, e.g. "ViT-L-14/laion2b_s32b_b82k"
+    memory_bytes: int = 0  # Bytes charged against the memory budget
+    rss_delta_bytes: int = 0  # Process RSS growth measured while loading
+    initializer_bytes: int = 0  # Size of the model weights
 
 
 @dataclass
@@ -59,6 +72,7 @@ class HardwareLimits:
     available_ram_gb: float
     max_models_loaded: int
     memory_profile: MemoryProfile
+    on_gpu: bool = False  # ONNX sessions run with the CUDA provider
 
 
 class DynamicModelManager:
@@ -85,7 +99,21 @@ class DynamicModelManager:
 
         # Memory management
         self.memory_lock = threading.Lock()
-        self.max_memory_usage_mb = int(self.hardware_limits.total_vram_gb * 1024 * 0.8)  # 80% of VRAM
+        # 80% of the memory the models live in: VRAM on GPU, available RAM on CPU
+        budget_gb = (self.hardware_limits.total_vram_gb if self.hardware_limits.on_gpu
+                     else self.hardware_limits.available_ram_gb)
+        self.max_memory_usage_mb = int(budget_gb * 1024 * 0.8)
+        self.memory_budget_bytes = self.max_memory_usage_mb * _MB
+        self.session_providers = (["CUDAExecutionProvider", "CPUExecutionProvider"]
+                                  if self.hardware_limits.on_gpu else ["CPUExecutionProvider"])
+
+        # Bytes measured on earlier loads, so a reload after eviction is budgeted accurately
+        self._measured_bytes: Dict[str, int] = {}
+        self.eviction_count = 0
+
+        # Models used inside hold_models(), evicted only when nothing else can be
+        self._pinned: Set[ModelType] = set()
+        self._hold_depth = 0
 
         # Model priorities (higher = more important to keep loaded)
         self.model_priorities = {
@@ -113,11 +141,16 @@ class DynamicModelManager:
             total_vram = 8.0  # Assume 8GB
             available_ram = 16.0  # Assume 16GB
 
-        # Determine memory profile
-        if total_vram <= 4:
+        # Sessions run on the GPU only when there is one and ONNX Runtime has CUDA
+        on_gpu = (total_vram > 0 and ONNX_AVAILABLE
+                  and "CUDAExecutionProvider" in ort.get_available_providers())
+
+        # Determine memory profile from the memory the models will be held in
+        memory_gb = total_vram if on_gpu else available_ram
+        if memory_gb <= 4:
             profile = MemoryProfile.LOW_VRAM
             max_models = 1
-        elif total_vram <= 8:
+        elif memory_gb <= 8:
             profile = MemoryProfile.MEDIUM_VRAM
             max_models = 2
         else:
@@ -128,7 +161,8 @@ class DynamicModelManager:
             total_vram_gb=total_vram,
             available_ram_gb=available_ram,
             max_models_loaded=max_models,
-            memory_profile=profile
+            memory_profile=profile,
+            on_gpu=on_gpu
         )
 
     def _scan_available_models(self):
@@ -168,10 +202,36 @@ class DynamicModelManager:
             if model_type in self.loaded_models:
                 model_info = self.loaded_models[model_type]
                 model_info.last_used = time.time()
+                self._pin(model_type)
                 return model_info.session
 
             # Model not loaded, try to load it
-            return self._load_model(model_type)
+            session = self._load_model(model_type)
+            if session is not None:
+                self._pin(model_type)
+            return session
+
+    @contextmanager
+    def hold_models(self):
+        """
+        Keep every model fetched inside the block resident until it exits,
+        so one batch does not evict a model it is still going to use.
+        A held model is only unloaded if a new model cannot fit otherwise,
+        e.g. on a profile that allows a single model.
+        """
+        with self.memory_lock:
+            self._hold_depth += 1
+        try:
+            yield self
+        finally:
+            with self.memory_lock:
+                self._hold_depth -= 1
+                if self._hold_depth == 0:
+                    self._pinned.clear()
+
+    def _pin(self, model_type: ModelType):
+        if self._hold_depth:
+            self._pinned.add(model_type)
 
     def _load_model(self, model_type: ModelType) -> Optional[Any]:
         """Load a model, managing memory constraints"""
@@ -186,24 +246,24 @@ class DynamicModelManager:
 
         model_path = self.available_models[model_type][0]  # Use first available
 
-        # Check memory constraints
-        if not self._can_load_model():
-            # Try to free memory by unloading less important models
-            if not self._free_memory_for_model(model_type):
-                logger.warning(f"Cannot load {model_type.value} model: insufficient memory")
-                return None
+        if model_path.suffix.lower() != '.onnx':
+            # PyTorch model (placeholder - would need torch loading)
+            logger.warning(f"PyTorch models not yet supported: {model_path}")
+            return None
+
+        # Make room using the last measured size, or the weight size for a first load
+        initializer_bytes = self._onnx_weight_bytes(model_path)
+        needed_bytes = self._measured_bytes.get(str(model_path), initializer_bytes)
+        if not self._free_memory_for_model(model_type, needed_bytes):
+            logger.warning(f"Cannot load {model_type.value} model: insufficient memory")
+            return None
 
         try:
             # Load the model
             logger.info(f"Loading {model_type.value} model: {model_path.name}")
-
-            if model_path.suffix.lower() == '.onnx':
-                # ONNX model
-                session = ort.InferenceSession(str(model_path))
-            else:
-                # PyTorch model (placeholder - would need torch loading)
-                logger.warning(f"PyTorch models not yet supported: {model_path}")
-                return None
+            session, rss_delta = self._measure_rss(
+                lambda: ort.InferenceSession(str(model_path), providers=self.session_providers)
+            )
 
             # Create model info
             model_info = ModelInfo(
@@ -212,50 +272,188 @@ class DynamicModelManager:
                 session=session,
                 loaded_at=time.time(),
                 last_used=time.time(),
-                memory_usage_mb=self._estimate_model_memory(session)
+                rss_delta_bytes=rss_delta,
+                initializer_bytes=initializer_bytes
             )
+            if not self._register_model(model_info, str(model_path)):
+                return None
 
-            self.loaded_models[model_type] = model_info
+            return session
+
+        except Exception as e:
+            logger.error(f"Failed to load {model_type.value} model: {e}")
+            return None
+
+    def get_openclip_model(self, model_name: str, pretrained: str) -> Optional[Tuple[Any, Any, Any]]:
+        """
+        Get an OpenCLIP (model, preprocess, tokenizer), loading it only once.
+        The model is held in the tagging slot, so it is subject to the same
+        memory management as the ONNX sessions.
+        """
+        model_key = f"{model_name}/{pretrained}"
+        with self.memory_lock:
+            model_info = self.loaded_models.get(ModelType.TAGGING)
+            if model_info and model_info.model_key == model_key:
+                model_info.last_used = time.time()
+                self._pin(ModelType.TAGGING)
+                return model_info.session
 
-            logger.info(f"Successfully loaded {model_type.value} model "
-                       f"({model_info.memory_usage_mb}MB)")
+            if model_info:
+                # A different tagging model is loaded; replace it
+                self._unload_model(ModelType.TAGGING)
+
+            session = self._load_openclip_model(model_name, pretrained, model_key)
+            if session is not None:
+                self._pin(ModelType.TAGGING)
+            return session
+
+    def _load_openclip_model(self, model_name: str, pretrained: str,
+                             model_key: str) -> Optional[Tuple[Any, Any, Any]]:
+        """Load an OpenCLIP model through the open_clip library"""
+        if not ONNX_AVAILABLE:
+            logger.warning("PyTorch not available, cannot load OpenCLIP")
+            return None
+
+        try:
+            import open_clip
+        except ImportError:
+            logger.warning("OpenCLIP library not available")
+            return None
+
+        # The size is only known after a first load; until then the budget is enforced afterwards
+        if not self._free_memory_for_model(ModelType.TAGGING, self._measured_bytes.get(model_key, 0)):
+            logger.warning(f"Cannot load OpenCLIP {model_key}: insufficient memory")
+            return None
+
+        try:
+            logger.info(f"Loading OpenCLIP model: {model_key}")
+            (model, _, preprocess), rss_delta = self._measure_rss(
+                lambda: open_clip.create_model_and_transforms(model_name, pretrained=pretrained)
+            )
+            model.eval()
+            tokenizer = open_clip.get_tokenizer(model_name)
+
+            weight_bytes = sum(t.numel() * t.element_size()
+                               for t in list(model.parameters()) + list(model.buffers()))
+            session = (model, preprocess, tokenizer)
+            if not self._register_model(ModelInfo(
+                model_type=ModelType.TAGGING,
+                model_path=Path("library_based"),
+                session=session,
+                loaded_at=time.time(),
+                last_used=time.time(),
+                model_key=model_key,
+                rss_delta_bytes=rss_delta,
+                initializer_bytes=weight_bytes
+            ), model_key):
+                return None
 
             return session
 
         except Exception as e:
-            logger.error(f"Failed to load {model_type.value} model: {e}")
+            logger.error(f"Failed to load OpenCLIP model {model_key}: {e}")
             return None
 
+    def _register_model(self, model_info: ModelInfo, identity: str) -> bool:
+        """
+        Charge a freshly loaded model to the budget and keep the budget within limits.
+        Returns False, with the model unloaded again, if it does not fit even on its own.
+        """
+        # RSS growth covers runtime overhead, but misses weights placed on a GPU
+        # and can be blurred by other threads; the weight size is a floor
+        model_info.memory_bytes = max(model_info.rss_delta_bytes, model_info.initializer_bytes)
+        model_info.memory_usage_mb = model_info.memory_bytes // _MB
+        self._measured_bytes[identity] = model_info.memory_bytes
+        self.loaded_models[model_info.model_type] = model_info
+
+        # A first load was budgeted on an estimate; evict others if the real size does not fit
+        if not self._free_memory_for_model(model_info.model_type, 0, extra_models=0):
+            self._unload_model(model_info.model_type)
+            return False
+
+        logger.info(f"Successfully loaded {model_info.model_type.value} model "
+                   f"({model_info.memory_usage_mb}MB: RSS +{model_info.rss_delta_bytes // _MB}MB, "
+                   f"weights {model_info.initializer_bytes // _MB}MB)")
+        return True
+
+    @staticmethod
+    def _measure_rss(load: Callable[[], Any]) -> Tuple[Any, int]:
+        """Run load() and return its result with the growth in process RSS (0 without psutil)"""
+        if not PSUTIL_AVAILABLE:
+            return load(), 0
+
+        process = psutil.Process()
+        before = process.memory_info().rss
+        result = load()
+        return result, max(0, process.memory_info().rss - before)
+
+    @staticmethod
+    def _onnx_weight_bytes(model_path: Path) -> int:
+        """
+        Estimate the weight size of an ONNX model from file sizes, without parsing it.
+        Embedded weights make up nearly all of the .onnx file; weights saved as
+        external data sit next to it as <name>.data or <name>_data.
+        """
+        total = 0
+        for path in (model_path, model_path.with_name(model_path.name + ".data"),
+                     model_path.with_name(model_path.name + "_data")):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _used_bytes(self) -> int:
+        return sum(info.memory_bytes for info in self.loaded_models.values())
+
+    def _fits(self, extra_bytes: int, extra_models: int) -> bool:
+        """Check if extra_models more models of extra_bytes total fit the count and byte budget"""
+        return (len(self.loaded_models) + extra_models <= self.hardware_limits.max_models_loaded
+                and self._used_bytes() + extra_bytes <= self.memory_budget_bytes)
+
     def _can_load_model(self) -> bool:
         """Check if we can load another model within memory limits"""
-        current_memory = sum(info.memory_usage_mb for info in self.loaded_models.values())
+        return self._fits(0, 1)
 
-        # Check against max models limit
-        if len(self.loaded_models) >= self.hardware_limits.max_models_loaded:
-            return False
+    def _eviction_order(self, keep: ModelType) -> List[ModelType]:
+        """
+        Loaded models other than keep, most evictable first.
+        Priority-weighted LRU: idle time divided by priority, so a tagging
+        model (priority 3) must sit idle three times as long as a
+        captioning model (priority 1) before it goes first. Held models
+        come after all others.
+        """
+        now = time.time()
 
-        # Check against memory limit (leave 20% buffer)
-        return current_memory < (self.max_memory_usage_mb * 0.8)
+        def eviction_key(item):
+            model_type, info = item
+            idle = now - (info.last_used or info.loaded_at or now)
+            return (model_type not in self._pinned, idle / self.model_priorities[model_type])
 
-    def _free_memory_for_model(self, needed_model_type: ModelType) -> bool:
-        """Free memory by unloading less important models"""
-        if not self.loaded_models:
-            return True
+        ordered = sorted(self.loaded_models.items(), key=eviction_key, reverse=True)
+        return [model_type for model_type, _ in ordered if model_type != keep]
 
-        # Sort loaded models by priority (lower priority first) and last used time
-        sorted_models = sorted(
-            self.loaded_models.items(),
-            key=lambda x: (self.model_priorities[x[0]], x[1].last_used or 0)
-        )
-
-        # Try to unload the least important model that's not the one we need
-        for model_type, model_info in sorted_models:
-            if model_type != needed_model_type:
-                self._unload_model(model_type)
-                logger.info(f"Unloaded {model_type.value} model to free memory")
+    def _free_memory_for_model(self, needed_model_type: ModelType, needed_bytes: int = 0,
+                               extra_models: int = 1) -> bool:
+        """
+        Unload models by priority-weighted LRU until the needed model fits.
+        Returns False if it does not fit even with every other model unloaded.
+        """
+        for model_type in self._eviction_order(needed_model_type):
+            if self._fits(needed_bytes, extra_models):
                 return True
-
-        return False
+            freed_mb = self.loaded_models[model_type].memory_bytes // _MB
+            held = model_type in self._pinned
+            self._unload_model(model_type)
+            self.eviction_count += 1
+            logger.info(f"Unloaded {'held ' if held else ''}{model_type.value} model "
+                        f"to free memory ({freed_mb}MB)")
+
+        if not self._fits(needed_bytes, extra_models):
+            logger.warning(f"{needed_model_type.value} model does not fit the "
+                           f"{self.memory_budget_bytes // _MB}MB memory budget")
+            return False
+        return True
 
     def _unload_model(self, model_type: ModelType):
         """Unload a model and free its memory"""
@@ -268,25 +466,13 @@ class DynamicModelManager:
 
             # Remove from loaded models
             del self.loaded_models[model_type]
+            self._pinned.discard(model_type)
 
             # Force garbage collection
             gc.collect()
 
             logger.info(f"Unloaded {model_type.value} model")
 
-    def _estimate_model_memory(self, session) -> int:
-        """Estimate memory usage of a model session"""
-        try:
-            # Rough estimation based on session info
-            # This is approximate and could be improved with actual profiling
-            if hasattr(session, '_sess_options'):
-                # ONNX Runtime session
-                return 500  # Rough estimate: 500MB per model
-            else:
-                return 256  # Conservative estimate
-        except:
-            return 256  # Fallback estimate
-
     def preload_models(self, model_types: List[ModelType]):
         """Preload specific models (useful for high VRAM systems)"""
         for model_type in model_types:
@@ -304,13 +490,29 @@ class DynamicModelManager:
             loaded_types = list(self.loaded_models.keys())
             total_memory = sum(info.memory_usage_mb for info in self.loaded_models.values())
 
-            return {
+            now = time.time()
+            status = {
                 "loaded_models": [mt.value for mt in loaded_types],
                 "memory_usage_mb": total_memory,
                 "max_memory_mb": self.max_memory_usage_mb,
                 "memory_profile": self.hardware_limits.memory_profile.value,
-                "max_models_allowed": self.hardware_limits.max_models_loaded
+                "max_models_allowed": self.hardware_limits.max_models_loaded,
+                "memory_usage_bytes": self._used_bytes(),
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "evictions": self.eviction_count,
+                "models": {
+                    model_type.value: {
+                        "memory_bytes": info.memory_bytes,
+                        "rss_delta_bytes": info.rss_delta_bytes,
+                        "initializer_bytes": info.initializer_bytes,
+                        "idle_seconds": now - (info.last_used or now)
+                    }
+                    for model_type, info in self.loaded_models.items()
+                }
             }
+            if PSUTIL_AVAILABLE:
+                status["process_rss_bytes"] = psutil.Process().memory_info().rss
+            return status
 
     def __del__(self):
         """Cleanup on destruction"""
@@ -2,10 +2,15 @@
 Image ingestion module for KS MetaMaker
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
+import os
 import hashlib
 from PIL import Image
+import numpy as np
 import logging
 
 from .quality import QualityAssessor
@@ -13,20 +18,109 @@ from .quality import QualityAssessor
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class IngestRecord:
+    """Everything ingest learned about one image from a single decode"""
+    path: Path
+    valid: bool = True
+    error: Optional[str] = None
+    width: int = 0
+    height: int = 0
+    format: Optional[str] = None
+    file_size: int = 0
+    mtime: float = 0.0
+    image_hash: Optional[str] = None
+    quality: Optional[Dict[str, Any]] = None  # QualityAssessor.assess_image() result
+
+    @property
+    def quality_score(self) -> Optional[float]:
+        return self.quality.get("quality_score") if self.quality else None
+
+
+# Single-channel modes with more than 8 bits per pixel; convert('L') clips these at 255
+_HIGH_BIT_DEPTH_MODES = {"I;16", "I;16L", "I;16B", "I;16N", "I"}
+
+
+def _to_8bit(img: Image.Image) -> Image.Image:
+    """Scale high-bit-depth greyscale down to 8 bits, as cv2.imread does, instead of clipping"""
+    if img.mode not in _HIGH_BIT_DEPTH_MODES:
+        return img
+    pixels = np.asarray(img).astype(np.int64)
+    return Image.fromarray(np.clip(pixels >> 8, 0, 255).astype(np.uint8), mode='L')
+
+
+def _scan_image(image_path: Path, blur_threshold: float, assess_quality: bool,
+                compute_hash: bool) -> IngestRecord:
+    """Decode one image once and collect validity, size, hash and quality (runs in a worker process)"""
+    record = IngestRecord(path=image_path)
+    assessor = QualityAssessor(blur_threshold=blur_threshold)
+    gray = None
+
+    try:
+        stat = image_path.stat()
+        record.file_size, record.mtime = stat.st_size, stat.st_mtime
+
+        with Image.open(image_path) as img:
+            # A full decode also catches truncated files that verify() accepts
+            img.load()
+            record.width, record.height = img.size
+            record.format = img.format
+            img = _to_8bit(img)
+
+            if compute_hash:
+                record.image_hash = assessor.hash_image(img)
+            if assess_quality:
+                gray = np.asarray(img.convert('L'))
+
+    except Exception as e:
+        record.valid = False
+        record.error = str(e)
+        return record
+
+    if gray is not None:
+        try:
+            record.quality = assessor.assess_image(gray)
+        except Exception as e:
+            logger.warning(f"Error assessing quality for {image_path}: {e}")
+
+    return record
+
+
 class ImageIngester:
     """Handles ingestion of images from input directory"""
 
     # Supported image formats
     SUPPORTED_FORMATS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tiff", ".tif"}
 
-    def __init__(self, enable_quality_filter: bool = True, enable_duplicate_detection: bool = True):
+    # Below this many files a process pool costs more than it saves
+    MIN_PARALLEL_FILES = 16
+
+    # Default worker cap; each spawned worker pays its own interpreter and import start-up
+    MAX_DEFAULT_WORKERS = 8
+
+    def __init__(self, enable_quality_filter: bool = True, enable_duplicate_detection: bool = True,
+                 max_workers: Optional[int] = None):
         self.enable_quality_filter = enable_quality_filter
         self.enable_duplicate_detection = enable_duplicate_detection
         self.quality_assessor = QualityAssessor() if enable_quality_filter else None
         self.processed_hashes: Dict[str, Path] = {}
+        self.max_workers = max_workers or min(self.MAX_DEFAULT_WORKERS, os.cpu_count() or 1)
+
+        # Records from the last ingest, for later stages to reuse
+        self.records: Dict[Path, IngestRecord] = {}
 
     def ingest(self, input_dir: Path, min_quality_score: float = 0.3) -> List[Path]:
         """Ingest images from input directory with quality filtering"""
+        return [record.path for record in self.ingest_records(input_dir, min_quality_score)]
+
+    def ingest_records(self, input_dir: Path, min_quality_score: float = 0.3) -> List[IngestRecord]:
+        """
+        Ingest images and return the record of each image that was kept
+
+        The directory is walked once and each image is decoded once, in a
+        process pool, to get its validity, size, quality metrics and hash.
+        All records, including rejected images, stay in self.records.
+        """
         if not input_dir.exists():
             raise ValueError(f"Input directory does not exist: {input_dir}")
 
@@ -34,69 +128,85 @@ class ImageIngester:
         all_image_paths = self._find_image_files(input_dir)
         logger.info(f"Found {len(all_image_paths)} potential image files")
 
+        records = self._scan_images(all_image_paths)
+        self.records = {record.path: record for record in records}
+
         # Filter by format and basic validity
-        valid_images = self._filter_valid_images(all_image_paths)
-        logger.info(f"Found {len(valid_images)} valid image files")
+        valid_records = []
+        for record in records:
+            if record.valid:
+                valid_records.append(record)
+            else:
+                logger.warning(f"Skipping invalid image {record.path}: {record.error}")
+        logger.info(f"Found {len(valid_records)} valid image files")
 
         # Quality filtering
         if self.enable_quality_filter and self.quality_assessor:
-            quality_images = self.quality_assessor.filter_quality_images(valid_images, min_quality_score)
-            logger.info(f"After quality filtering: {len(quality_images)} images")
+            quality_records = self._filter_quality(valid_records, min_quality_score)
+            logger.info(f"After quality filtering: {len(quality_records)} images")
         else:
-            quality_images = valid_images
+            quality_records = valid_records
 
         # Duplicate detection
         if self.enable_duplicate_detection:
-            unique_images = self._remove_duplicates(quality_images)
-            logger.info(f"After duplicate removal: {len(unique_images)} images")
+            unique_records = self._remove_duplicates(quality_records)
+            logger.info(f"After duplicate removal: {len(unique_records)} images")
         else:
-            unique_images = quality_images
+            unique_records = quality_records
 
-        return unique_images
+        return unique_records
 
     def _find_image_files(self, input_dir: Path) -> List[Path]:
-        """Find all image files in the input directory recursively"""
-        image_paths = set()
-        for ext in self.SUPPORTED_FORMATS:
-            image_paths.update(input_dir.rglob(f"*{ext}"))
-            image_paths.update(input_dir.rglob(f"*{ext.upper()}"))
-        return sorted(list(image_paths))
-
-    def _filter_valid_images(self, image_paths: List[Path]) -> List[Path]:
-        """Filter out invalid or corrupted image files"""
-        valid_images = []
-        for path in image_paths:
-            try:
-                # Try to open the image to verify it's valid
-                with Image.open(path) as img:
-                    img.verify()
-                valid_images.append(path)
-            except Exception as e:
-                logger.warning(f"Skipping invalid image {path}: {e}")
-        return valid_images
-
-    def _remove_duplicates(self, image_paths: List[Path]) -> List[Path]:
-        """Remove duplicate images based on perceptual hashing"""
-        if not self.quality_assessor:
-            return image_paths
-
-        unique_images = []
-        seen_hashes = set()
-
-        for path in image_paths:
+        """Find all image files in the input directory recursively, in one walk"""
+        image_paths = []
+        for root, _, files in os.walk(input_dir):
+            for name in files:
+                if os.path.splitext(name)[1].lower() in self.SUPPORTED_FORMATS:
+                    image_paths.append(Path(root) / name)
+        return sorted(image_paths)
+
+    def _scan_images(self, image_paths: List[Path]) -> List[IngestRecord]:
+        """Decode every image once, in parallel when there are enough of them"""
+        scan = partial(
+            _scan_image,
+            blur_threshold=self.quality_assessor.blur_threshold if self.quality_assessor else 100.0,
+            assess_quality=self.enable_quality_filter,
+            compute_hash=self.enable_duplicate_detection
+        )
+
+        if self.max_workers > 1 and len(image_paths) >= self.MIN_PARALLEL_FILES:
+            chunksize = max(1, min(32, len(image_paths) // (self.max_workers * 4)))
             try:
-                # Get perceptual hash
-                image_hash = self.quality_assessor.get_image_hash(path)
-
-                if image_hash not in seen_hashes:
-                    seen_hashes.add(image_hash)
-                    unique_images.append(path)
-                else:
-                    logger.info(f"Duplicate image detected and removed: {path}")
-
+                with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                    return list(pool.map(scan, image_paths, chunksize=chunksize))
             except Exception as e:
-                logger.warning(f"Error processing image {path} for duplicates: {e}")
-                # Include images that can't be processed to avoid losing data
-                unique_images.append(path)
-
-        return unique_images
+                logger.warning(f"Parallel scan failed, scanning sequentially: {e}")
+
+        return [scan(path) for path in image_paths]
+
+    def _filter_quality(self, records: List[IngestRecord], min_quality_score: float) -> List[IngestRecord]:
+        """Filter out images below the quality threshold"""
+        quality_records = []
+        for record in records:
+            score = record.quality_score
+            if score is None or score >= min_quality_score:
+                # Include images that can't be assessed to avoid losing data
+                quality_records.append(record)
+            else:
+                logger.info(f"Image {record.path} filtered out due to low quality (score: {score:.2f})")
+        return quality_records
+
+    def _remove_duplicates(self, records: List[IngestRecord]) -> List[IngestRecord]:
+        """Remove near-duplicate images based on perceptual hash distance"""
+        assessor = self.quality_assessor or QualityAssessor()
+        # Images that can't be hashed (None) are kept to avoid losing data
+        drop = assessor.near_duplicate_mask([record.image_hash for record in records])
+
+        unique_records = []
+        for record, is_duplicate in zip(records, drop):
+            if is_duplicate:
+                logger.info(f"Duplicate image detected and removed: {record.path}")
+            else:
+                unique_records.append(record)
+
+        return unique_records
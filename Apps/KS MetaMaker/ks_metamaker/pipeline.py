@@ -0,0 +1,117 @@
+"""
+Staged tagging pipeline for KS MetaMaker
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional
+import logging
+import queue
+import threading
+
+from .tagger import ImageTagger
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class TaggingPipeline:
+    """
+    Decode -> batched inference -> file operations, with bounded queues between stages.
+
+    A pool of decode threads runs ImageTagger.prepare_image ahead of the
+    models, the calling thread tags batch_size images per model call, and a
+    single file-ops thread hands each result to handle_result (rename,
+    organize, export). The queues are bounded so memory stays flat on large
+    datasets while every stage keeps working.
+    """
+
+    def __init__(self, tagger: ImageTagger, batch_size: int = 4, decode_workers: int = 4,
+                 queue_size: Optional[int] = None):
+        self.tagger = tagger
+        self.batch_size = max(1, int(batch_size))
+        self.decode_workers = max(1, int(decode_workers))
+        # Enough decoded images to fill the next batch while the current one runs
+        self.queue_size = queue_size or 2 * self.batch_size + self.decode_workers
+
+    def run(self, image_paths: List[Path], handle_result: Callable[[Path, List[str]], None]):
+        """
+        Tag every image and call handle_result(image_path, tags) for each, in input order.
+
+        handle_result runs on the file-ops thread; exceptions it raises are
+        logged and do not stop the run.
+        """
+        decoded = queue.Queue(maxsize=self.queue_size)
+        tagged = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=self.decode_workers, thread_name_prefix="decode") as pool:
+            feeder = threading.Thread(target=self._feed, args=(image_paths, pool, decoded, stop),
+                                      name="decode-feeder", daemon=True)
+            writer = threading.Thread(target=self._write, args=(tagged, handle_result),
+                                      name="file-ops", daemon=True)
+            feeder.start()
+            writer.start()
+            try:
+                self._infer(decoded, tagged)
+            finally:
+                stop.set()
+                tagged.put(_DONE)
+                writer.join()
+                feeder.join()
+
+    def _feed(self, image_paths: List[Path], pool: ThreadPoolExecutor, decoded: queue.Queue,
+              stop: threading.Event):
+        """Submit decodes in order; the bounded queue limits how far ahead they run"""
+        for image_path in image_paths:
+            if stop.is_set():
+                return
+            future = pool.submit(self.tagger.prepare_image, image_path)
+            if not self._put(decoded, (image_path, future), stop):
+                return
+        self._put(decoded, _DONE, stop)
+
+    @staticmethod
+    def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+        """Blocking put that gives up once the pipeline is stopping"""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _infer(self, decoded: queue.Queue, tagged: queue.Queue):
+        """Collect decoded images into batches and tag each batch"""
+        batch = []
+        while True:
+            item = decoded.get()
+            if item is _DONE:
+                break
+            image_path, future = item
+            batch.append((image_path, future.result()))
+            if len(batch) >= self.batch_size:
+                self._tag_batch(batch, tagged)
+                batch = []
+
+        if batch:
+            self._tag_batch(batch, tagged)
+
+    def _tag_batch(self, batch: list, tagged: queue.Queue):
+        tags_list = self.tagger.tag_batch([prepared for _, prepared in batch])
+        for (image_path, _), tags in zip(batch, tags_list):
+            tagged.put((image_path, tags))
+
+    def _write(self, tagged: queue.Queue, handle_result: Callable[[Path, List[str]], None]):
+        """File-ops stage: hand results to handle_result one at a time"""
+        while True:
+            item = tagged.get()
+            if item is _DONE:
+                return
+            image_path, tags = item
+            try:
+                handle_result(image_path, tags)
+            except Exception as e:
+                logger.error(f"Failed to process {image_path}: {e}")
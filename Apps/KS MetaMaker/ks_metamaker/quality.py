@@ -3,13 +3,13 @@ Quality assessment module for KS MetaMaker
 Handles blur detection, duplicate removal, and image quality evaluation
 """
 
+from itertools import combinations
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 import logging
 from PIL import Image
 import cv2
 import numpy as np
-from skimage.metrics import structural_similarity as ssim
 
 logger = logging.getLogger(__name__)
 
@@ -21,19 +21,164 @@ except ImportError:
     logger.warning("imagehash not available, using basic duplicate detection")
 
 
+# Number of set bits in each byte value, for Hamming distances on uint64 arrays
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class NearDuplicateIndex:
+    """
+    Hamming-distance search over 64-bit image hashes
+
+    The hashes live in one uint64 NumPy array. Pairs within a radius r are
+    found by multi-index hashing: the 64 bits are split into m blocks, and
+    two hashes within distance r must differ by at most r // m bits in at
+    least one block (pigeonhole). Each block is sorted once, the nearby keys
+    of every hash are looked up with searchsorted, and only those candidates
+    are checked at full length. The cost grows with the number of close
+    pairs rather than with n^2.
+    """
+
+    # 16-bit blocks: few candidates per lookup and few nearby keys to enumerate
+    MAX_BLOCKS = 4
+
+    def __init__(self, hashes):
+        self.hashes = np.ascontiguousarray(hashes, dtype=np.uint64)
+
+    @classmethod
+    def from_hex(cls, hex_hashes: List[str]) -> 'NearDuplicateIndex':
+        """Build an index from 16-digit hex hashes (as produced by QualityAssessor.hash_image)"""
+        return cls(np.array([int(h, 16) for h in hex_hashes], dtype=np.uint64))
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    @staticmethod
+    def hamming(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Element-wise Hamming distance between two uint64 arrays"""
+        xor = np.ascontiguousarray(np.bitwise_xor(a, b), dtype=np.uint64)
+        return _POPCOUNT8[xor.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+    @staticmethod
+    def _flip_masks(width: int, radius: int) -> List[int]:
+        """All masks of at most radius set bits within a block of width bits"""
+        return [sum(1 << bit for bit in bits)
+                for k in range(radius + 1)
+                for bits in combinations(range(width), k)]
+
+    def pairs(self, max_distance: int) -> np.ndarray:
+        """
+        Find all pairs of hashes that differ in at most max_distance bits
+
+        Args:
+            max_distance: Hamming radius (0 = identical hashes)
+
+        Returns:
+            (k, 2) int64 array of index pairs (i, j) with i < j, sorted
+        """
+        n = len(self.hashes)
+        if n < 2 or max_distance < 0:
+            return np.empty((0, 2), dtype=np.int64)
+        max_distance = min(int(max_distance), 64)
+
+        blocks = min(max_distance + 1, self.MAX_BLOCKS)
+        sub_radius = max_distance // blocks
+        bounds = np.linspace(0, 64, blocks + 1).astype(int)
+        indices = np.arange(n)
+
+        found = []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            width = int(hi - lo)
+            keys = (self.hashes >> np.uint64(lo)) & np.uint64((1 << width) - 1)
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+
+            for flips in self._flip_masks(width, sub_radius):
+                query = keys ^ np.uint64(flips)
+                left = np.searchsorted(sorted_keys, query, side='left')
+                counts = np.searchsorted(sorted_keys, query, side='right') - left
+                total = int(counts.sum())
+                if total == 0:
+                    continue
+
+                # Expand each query's matching range [left, right) into (i, j) pairs
+                i = np.repeat(indices, counts)
+                starts = np.repeat(left - (np.cumsum(counts) - counts), counts)
+                j = order[np.arange(total) + starts]
+
+                keep = i < j
+                i, j = i[keep], j[keep]
+                close = self.hamming(self.hashes[i], self.hashes[j]) <= max_distance
+                found.append(i[close] * n + j[close])
+
+        if not found:
+            return np.empty((0, 2), dtype=np.int64)
+
+        codes = np.unique(np.concatenate(found))
+        return np.stack([codes // n, codes % n], axis=1).astype(np.int64)
+
+    def duplicate_mask(self, max_distance: int) -> np.ndarray:
+        """
+        Mark near-duplicates for removal, keeping the first of each
+
+        An item is dropped when an earlier item that is itself kept lies
+        within max_distance of it.
+
+        Returns:
+            Boolean array, True for items to drop
+        """
+        drop = np.zeros(len(self.hashes), dtype=bool)
+        pairs = self.pairs(max_distance)
+        # Visit pairs by j so every i < j is already decided
+        for i, j in pairs[np.lexsort((pairs[:, 0], pairs[:, 1]))]:
+            if not drop[i]:
+                drop[j] = True
+        return drop
+
+    def groups(self, max_distance: int) -> List[List[int]]:
+        """Connected groups (size > 1) of items linked by pairs within max_distance"""
+        parent = list(range(len(self.hashes)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for i, j in self.pairs(max_distance):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        members: Dict[int, List[int]] = {}
+        for x in range(len(parent)):
+            members.setdefault(find(x), []).append(x)
+        return [group for group in members.values() if len(group) > 1]
+
+
 class QualityAssessor:
     """Handles image quality assessment and filtering"""
 
-    def __init__(self, blur_threshold: float = 100.0, duplicate_threshold: float = 0.9):
+    # imagehash functions by hash_method; all give 64-bit hashes at the default size
+    HASH_METHODS = ("phash", "dhash", "average_hash")
+
+    def __init__(self, blur_threshold: float = 100.0, duplicate_threshold: float = 0.9,
+                 hash_method: str = "phash"):
         """
         Initialize quality assessor
 
         Args:
             blur_threshold: Minimum variance of Laplacian for acceptable blur (lower = blurrier)
-            duplicate_threshold: SSIM threshold for duplicate detection (higher = stricter)
+            duplicate_threshold: Minimum hash similarity (1 - Hamming distance / 64) for
+                two images to count as duplicates (higher = stricter, 1.0 = identical hashes)
+            hash_method: imagehash function used for duplicate hashes; without
+                imagehash a built-in dHash is used
         """
+        if hash_method not in self.HASH_METHODS:
+            raise ValueError(f"Unknown hash method: {hash_method}")
+
         self.blur_threshold = blur_threshold
         self.duplicate_threshold = duplicate_threshold
+        self.hash_method = hash_method
         self.processed_hashes: Set[str] = set()
 
     def assess_quality(self, image_path: Path) -> Dict[str, any]:
@@ -52,29 +197,41 @@ class QualityAssessor:
             if image is None:
                 return {"valid": False, "error": "Could not load image"}
 
-            # Assess blur
-            blur_score = self.detect_blur(image)
-
-            # Assess brightness and contrast
-            brightness, contrast = self.assess_brightness_contrast(image)
-
-            # Overall quality score
-            quality_score = self._calculate_quality_score(blur_score, brightness, contrast)
-
-            return {
-                "valid": True,
-                "blur_score": blur_score,
-                "brightness": brightness,
-                "contrast": contrast,
-                "quality_score": quality_score,
-                "is_blurry": blur_score < self.blur_threshold,
-                "recommendation": self._get_recommendation(blur_score, brightness, contrast)
-            }
+            return self.assess_image(image)
 
         except Exception as e:
             logger.error(f"Quality assessment failed for {image_path}: {e}")
             return {"valid": False, "error": str(e)}
 
+    def assess_image(self, image: np.ndarray) -> Dict[str, any]:
+        """
+        Assess overall quality of an already decoded image
+
+        Args:
+            image: OpenCV BGR image or grayscale array
+
+        Returns:
+            Dictionary with quality metrics
+        """
+        # Assess blur
+        blur_score = self.detect_blur(image)
+
+        # Assess brightness and contrast
+        brightness, contrast = self.assess_brightness_contrast(image)
+
+        # Overall quality score
+        quality_score = self._calculate_quality_score(blur_score, brightness, contrast)
+
+        return {
+            "valid": True,
+            "blur_score": blur_score,
+            "brightness": brightness,
+            "contrast": contrast,
+            "quality_score": quality_score,
+            "is_blurry": blur_score < self.blur_threshold,
+            "recommendation": self._get_recommendation(blur_score, brightness, contrast)
+        }
+
     def detect_blur(self, image: np.ndarray) -> float:
         """
         Detect blur using variance of Laplacian
@@ -140,30 +297,48 @@ class QualityAssessor:
         Returns:
             Dictionary mapping hash to list of duplicate paths
         """
-        hash_groups = {}
-        processed_images = {}
+        hashed_paths = []
+        hashes = []
 
         for image_path in image_paths:
             try:
-                if HASH_AVAILABLE:
-                    # Use perceptual hashing
-                    img_hash = self._calculate_perceptual_hash(image_path)
-                else:
-                    # Fallback to basic method
-                    img_hash = self._calculate_basic_hash(image_path)
-
+                img_hash = self._calculate_perceptual_hash(image_path)
                 if img_hash:
-                    if img_hash not in hash_groups:
-                        hash_groups[img_hash] = []
-                    hash_groups[img_hash].append(image_path)
+                    hashed_paths.append(image_path)
+                    hashes.append(img_hash)
 
             except Exception as e:
                 logger.error(f"Hash calculation failed for {image_path}: {e}")
 
-        # Filter to only groups with duplicates
-        duplicates = {hash_val: paths for hash_val, paths in hash_groups.items() if len(paths) > 1}
+        # Group images whose hashes are within the duplicate radius
+        index = NearDuplicateIndex.from_hex(hashes)
+        return {
+            hashes[group[0]]: [hashed_paths[i] for i in group]
+            for group in index.groups(self.max_hash_distance)
+        }
+
+    @property
+    def max_hash_distance(self) -> int:
+        """Largest Hamming distance between two 64-bit hashes still counted as duplicates"""
+        return max(0, min(64, int(round((1.0 - self.duplicate_threshold) * 64))))
+
+    def near_duplicate_mask(self, hex_hashes: List[Optional[str]]) -> List[bool]:
+        """
+        Mark near-duplicate images for removal, keeping the first of each group
+
+        Args:
+            hex_hashes: Hashes from hash_image(), in priority order; None is never dropped
+
+        Returns:
+            List of flags, True for images to drop
+        """
+        hashed = [i for i, h in enumerate(hex_hashes) if h is not None]
+        drop = [False] * len(hex_hashes)
 
-        return duplicates
+        index = NearDuplicateIndex.from_hex([hex_hashes[i] for i in hashed])
+        for position in np.flatnonzero(index.duplicate_mask(self.max_hash_distance)):
+            drop[hashed[position]] = True
+        return drop
 
     def filter_quality_images(self, image_paths: List[Path],
                             min_quality_score: float = 0.5) -> List[Path]:
@@ -205,9 +380,7 @@ class QualityAssessor:
         """Calculate perceptual hash using imagehash library"""
         try:
             with Image.open(image_path) as img:
-                # Calculate average hash
-                hash_obj = imagehash.average_hash(img)
-                return str(hash_obj)
+                return self.hash_image(img)
         except Exception:
             return None
 
@@ -215,19 +388,39 @@ class QualityAssessor:
         """Calculate basic hash for duplicate detection"""
         try:
             with Image.open(image_path) as img:
-                # Resize for consistent comparison
-                img_resized = img.resize((64, 64), Image.Resampling.LANCZOS)
-                img_gray = img_resized.convert('L')
+                return self._dhash(img)
+        except Exception:
+            return None
+
+    def hash_image(self, img: Image.Image) -> str:
+        """
+        Hash an already opened image for duplicate detection
 
-                # Convert to numpy array
-                img_array = np.array(img_gray)
+        Uses hash_method from imagehash when it is installed and a built-in
+        dHash otherwise; either way the result is a 64-bit hash as 16 hex
+        digits, so it can go into a NearDuplicateIndex.
 
-                # Calculate simple hash
-                hash_val = hash(img_array.tobytes())
-                return str(hash_val)
-        except Exception:
+        Args:
+            img: PIL image
+
+        Returns:
+            Hex hash of the image, or None if it could not be computed
+        """
+        try:
+            if HASH_AVAILABLE:
+                return str(getattr(imagehash, self.hash_method)(img))
+            return self._dhash(img)
+        except Exception as e:
+            logger.warning(f"Error calculating image hash: {e}")
             return None
 
+    @staticmethod
+    def _dhash(img: Image.Image) -> str:
+        """64-bit difference hash: sign of horizontal gradients on a 9x8 thumbnail"""
+        pixels = np.asarray(img.convert('L').resize((9, 8), Image.Resampling.LANCZOS), dtype=np.int16)
+        bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+        return f"{int(''.join('1' if b else '0' for b in bits), 2):016x}"
+
     def _calculate_quality_score(self, blur_score: float, brightness: float, contrast: float) -> float:
         """Calculate overall quality score (0-1)"""
         # Normalize blur score (assuming 0-1000 range, adjust as needed)
@@ -2,9 +2,12 @@
 Image tagging module for KS MetaMaker
 """
 
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
 import logging
+import threading
 from PIL import Image
 import numpy as np
 
@@ -36,6 +39,15 @@ except ImportError as e:
     logger.warning(f"AI libraries not available: {e}")
 
 
+@dataclass
+class PreparedImage:
+    """One decoded image with the input for each model, built at native resolution"""
+    image_path: Path
+    quality_tags: List[str] = field(default_factory=list)
+    clip_input: Optional[Any] = None  # OpenCLIP-preprocessed CHW tensor
+    yolo_input: Optional[np.ndarray] = None  # 3x640x640 float32 BGR
+
+
 class ImageTagger:
     """Handles AI-powered image tagging and classification with dynamic model loading"""
 
@@ -46,9 +58,20 @@ class ImageTagger:
         if models_dir is None:
             models_dir = Path(__file__).parent.parent / "models"
 
+        self.models_dir = models_dir
         self.model_manager = DynamicModelManager(models_dir, hardware_detector)
         self.model_downloader = ModelManager(models_dir)
 
+        # Availability is checked once per model key, not per image
+        self._model_availability: Dict[str, bool] = {}
+        self._availability_lock = threading.Lock()
+        # Normalized OpenCLIP text features, keyed by model + vocabulary hash
+        self._text_features_cache: Dict[str, "torch.Tensor"] = {}
+        # OpenCLIP (preprocess, tokenizer); kept here so that evicting the
+        # model from the manager does not force a reload to preprocess images
+        self._openclip_transforms: Optional[Tuple[Any, Any]] = None
+        self._openclip_transforms_lock = threading.Lock()
+
         # Tag databases as fallback
         self.prop_tags = [
             "metal", "rusty", "industrial", "weapon", "tool", "container",
@@ -65,6 +88,14 @@ class ImageTagger:
             "expression", "gender", "age", "style", "weapon", "magic"
         ]
 
+        # Candidate tags scored by OpenCLIP
+        self.openclip_candidate_tags = [
+            "photorealistic", "detailed", "high quality", "professional",
+            "realistic", "sharp", "well lit", "colorful", "vibrant",
+            "texture", "material", "surface", "metal", "wood", "fabric",
+            "stone", "plastic", "glass", "leather", "ceramic", "concrete"
+        ]
+
         # Initialize tag normalizer if profile has normalization config
         self.normalizer = None
         if TagNormalizer and self.config.normalization:
@@ -87,270 +118,362 @@ class ImageTagger:
         Returns:
             List of tags describing the image
         """
-        try:
-            tags = []
-
-            # Add main prefix
-            tags.append(self.config.main_prefix)
-
-            # Add style preset
-            tags.extend(self.config.style_preset.split(', '))
-
-            # Load and preprocess image
-            image = self._load_image(image_path)
-            if image is None:
-                return [self.config.main_prefix, "unknown"]
-
-            # Use AI models with dynamic loading
-            openclip_tags = self._get_openclip_tags(image)
-            yolo_tags = self._get_yolo_tags(image)
-            blip_caption = self._get_blip_caption(image)
-
-            # Combine and filter tags
-            all_tags = openclip_tags + yolo_tags
-            if blip_caption:
-                all_tags.extend(self._extract_tags_from_caption(blip_caption))
-
-            # Apply normalization if available
-            if self.normalizer:
-                # Create dummy confidences for now (would be improved with actual model confidences)
-                confidences = [0.8] * len(all_tags)  # Default confidence
-                normalized_tags = self.normalizer.normalize_tags(all_tags, confidences)
-
-                # Apply budget filtering if available
-                if self.config.budget:
-                    normalized_tags = self.normalizer.filter_by_category_budget(
-                        normalized_tags, self.config.budget
-                    )
+        return self.tag_batch([self.prepare_image(image_path)])[0]
 
-                    # Apply diversity filtering
-                    normalized_tags = self.normalizer.apply_diversity_filter(
-                        normalized_tags, self.config.budget.diversity_weight
-                    )
-
-                # Extract final tag strings
-                all_tags = [tag.normalized for tag in normalized_tags]
-            else:
-                # Legacy tag selection without normalization
-                # Determine category from tags
-                category = self._classify_from_tags(all_tags)
-                max_tags = self.config.max_tags.get(category, 20)
-                all_tags = self._select_best_tags(all_tags, max_tags)
-
-            # Add quality tags
-            quality_tags = self._assess_quality(image_path)
-            tags.extend(quality_tags)
-
-            # Remove duplicates and clean
-            tags = list(dict.fromkeys(tags))  # Remove duplicates while preserving order
-
-            logger.info(f"Tagged {image_path.name}: {tags}")
-            return tags
+    def prepare_image(self, image_path: Path) -> Optional[PreparedImage]:
+        """
+        Decode an image once and build the input for each model from the
+        full-resolution pixels. Safe to call from several threads.
 
-        except Exception as e:
-            logger.error(f"Failed to tag {image_path}: {e}")
-            return [self.config.main_prefix, "unknown"]
+        Args:
+            image_path: Path to the image file
 
-    def _load_image(self, image_path: Path) -> Optional[np.ndarray]:
-        """Load and preprocess image for model input"""
+        Returns:
+            PreparedImage, or None if the image could not be loaded
+        """
         try:
             with Image.open(image_path) as img:
                 # Convert to RGB if necessary
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
+                rgb = img.convert('RGB') if img.mode != 'RGB' else img.copy()
 
-                # Resize to 224x224 for CLIP models (adjust based on actual model requirements)
-                img = img.resize((224, 224), Image.Resampling.LANCZOS)
+            prepared = PreparedImage(
+                image_path=image_path,
+                quality_tags=self._assess_quality(*rgb.size)
+            )
 
-                # Convert to numpy array and normalize
-                image_array = np.array(img).astype(np.float32) / 255.0
+            transforms = self._get_openclip_transforms()
+            if transforms is not None:
+                preprocess, _ = transforms
+                prepared.clip_input = preprocess(rgb)
 
-                # Transpose to CHW format (channels, height, width)
-                image_array = np.transpose(image_array, (2, 0, 1))
+            if self._ensure_model_available('yolov11s'):
+                import cv2
+                # YOLO expects BGR format at 640x640 (YOLOv11 default)
+                image_bgr = np.asarray(rgb)[:, :, ::-1]
+                image_input = cv2.resize(image_bgr, (640, 640)).astype(np.float32)
+                image_input *= 1.0 / 255.0
+                prepared.yolo_input = np.transpose(image_input, (2, 0, 1))
 
-                return image_array
+            return prepared
 
         except Exception as e:
             logger.error(f"Failed to load image {image_path}: {e}")
             return None
 
-    def _get_openclip_tags(self, image: np.ndarray) -> List[str]:
-        """Get tags using OpenCLIP model with direct library usage"""
-        if not OPENCLIP_AVAILABLE:
-            logger.warning("OpenCLIP library not available")
-            return ["photorealistic", "detailed"]
+    def tag_batch(self, prepared: List[Optional[PreparedImage]]) -> List[List[str]]:
+        """
+        Tag a batch of prepared images, running each model once per batch
+
+        Args:
+            prepared: Output of prepare_image(); None entries get "unknown"
+
+        Returns:
+            One tag list per entry, in order
+        """
+        results = [[self.config.main_prefix, "unknown"] for _ in prepared]
+        valid = [i for i, item in enumerate(prepared) if item is not None]
+        if not valid:
+            return results
 
         try:
-            # Ensure OpenCLIP model is available (though we use library directly)
-            success, _ = self.model_downloader.ensure_model_available('openclip_vith14')
-            if not success:
-                logger.warning("Could not ensure OpenCLIP model availability")
-                return ["photorealistic", "detailed"]
+            # Models loaded for this batch stay resident until it is done
+            with self.model_manager.hold_models():
+                openclip_tags = self._get_openclip_tags([prepared[i].clip_input for i in valid])
+                yolo_tags = self._get_yolo_tags([prepared[i].yolo_input for i in valid])
+                blip_caption = self._get_blip_caption()
+        except Exception as e:
+            logger.error(f"Failed to tag batch: {e}")
+            return results
 
-            # Load OpenCLIP model and preprocessing
-            model, _, preprocess = open_clip.create_model_and_transforms(
-                'ViT-L-14', pretrained='laion2b_s32b_b82k'
-            )
-            model.eval()
-            tokenizer = open_clip.get_tokenizer('ViT-L-14')
+        for n, i in enumerate(valid):
+            item = prepared[i]
+            try:
+                results[i] = self._combine_tags(item, openclip_tags[n] + yolo_tags[n], blip_caption)
+            except Exception as e:
+                logger.error(f"Failed to tag {item.image_path}: {e}")
 
-            # Convert numpy array back to PIL Image for preprocessing
-            # image is in CHW format (3, 224, 224), convert to HWC for PIL
-            image_hwc = np.transpose(image, (1, 2, 0))
-            image_hwc = (image_hwc * 255).astype(np.uint8)
-            pil_image = Image.fromarray(image_hwc)
+        return results
 
-            # Preprocess image
-            processed_image = preprocess(pil_image).unsqueeze(0)
+    def _combine_tags(self, prepared: PreparedImage, model_tags: List[str], blip_caption: Optional[str]) -> List[str]:
+        """Merge model tags with the profile prefix, style and quality tags"""
+        tags = []
 
-            # Define candidate tags
-            candidate_tags = [
-                "photorealistic", "detailed", "high quality", "professional",
-                "realistic", "sharp", "well lit", "colorful", "vibrant",
-                "texture", "material", "surface", "metal", "wood", "fabric",
-                "stone", "plastic", "glass", "leather", "ceramic", "concrete"
-            ]
+        # Add main prefix
+        tags.append(self.config.main_prefix)
 
-            # Tokenize text tags
-            text_tokens = tokenizer(candidate_tags)
+        # Add style preset
+        tags.extend(self.config.style_preset.split(', '))
 
-            with torch.no_grad():
-                # Get image and text features
-                image_features = model.encode_image(processed_image)
-                text_features = model.encode_text(text_tokens)
+        # Combine and filter tags
+        all_tags = list(model_tags)
+        if blip_caption:
+            all_tags.extend(self._extract_tags_from_caption(blip_caption))
+
+        # Apply normalization if available
+        if self.normalizer:
+            # Create dummy confidences for now (would be improved with actual model confidences)
+            confidences = [0.8] * len(all_tags)  # Default confidence
+            normalized_tags = self.normalizer.normalize_tags(all_tags, confidences)
+
+            # Apply budget filtering if available
+            if self.config.budget:
+                normalized_tags = self.normalizer.filter_by_category_budget(
+                    normalized_tags, self.config.budget
+                )
+
+                # Apply diversity filtering
+                normalized_tags = self.normalizer.apply_diversity_filter(
+                    normalized_tags, self.config.budget.diversity_weight
+                )
+
+            # Extract final tag strings
+            all_tags = [tag.normalized for tag in normalized_tags]
+        else:
+            # Legacy tag selection without normalization
+            # Determine category from tags
+            category = self._classify_from_tags(all_tags)
+            max_tags = self.config.max_tags.get(category, 20)
+            all_tags = self._select_best_tags(all_tags, max_tags)
+
+        tags.extend(all_tags)
+
+        # Add quality tags
+        tags.extend(prepared.quality_tags)
+
+        # Remove duplicates and clean
+        tags = list(dict.fromkeys(tags))  # Remove duplicates while preserving order
+
+        logger.info(f"Tagged {prepared.image_path.name}: {tags}")
+        return tags
+
+    def _get_openclip(self):
+        """Return the shared OpenCLIP (model, preprocess, tokenizer), or None"""
+        if not OPENCLIP_AVAILABLE:
+            return None
+
+        # Ensure OpenCLIP model is available (though we use library directly)
+        if not self._ensure_model_available('openclip_vith14'):
+            return None
+
+        # Model is loaded once and held by the model manager
+        clip_config = self.model_downloader.model_configs['openclip_vith14']
+        return self.model_manager.get_openclip_model(clip_config['model_name'], clip_config['pretrained'])
 
-                # Normalize features
+    def _get_openclip_transforms(self) -> Optional[Tuple[Any, Any]]:
+        """
+        Return the OpenCLIP (preprocess, tokenizer), built once per tagger.
+
+        They are built from the model and pretrained configs, so decode
+        threads never load the model weights. The model's own transforms
+        are used if the configs can't be read.
+        """
+        if not OPENCLIP_AVAILABLE:
+            return None
+
+        with self._openclip_transforms_lock:
+            if self._openclip_transforms is None:
+                if not self._ensure_model_available('openclip_vith14'):
+                    return None
+
+                clip_config = self.model_downloader.model_configs['openclip_vith14']
+                model_name, pretrained = clip_config['model_name'], clip_config['pretrained']
+                try:
+                    vision_cfg = open_clip.get_model_config(model_name)['vision_cfg']
+                    pretrained_cfg = open_clip.get_pretrained_cfg(model_name, pretrained) or {}
+                    preprocess = open_clip.image_transform(
+                        vision_cfg['image_size'], is_train=False,
+                        mean=pretrained_cfg.get('mean'), std=pretrained_cfg.get('std')
+                    )
+                    self._openclip_transforms = (preprocess, open_clip.get_tokenizer(model_name))
+                except Exception as e:
+                    logger.warning(f"Could not build OpenCLIP transforms from config, loading the model: {e}")
+                    openclip = self._get_openclip()
+                    if openclip is None:
+                        return None
+                    _, preprocess, tokenizer = openclip
+                    self._openclip_transforms = (preprocess, tokenizer)
+
+            return self._openclip_transforms
+
+    def _get_openclip_tags(self, clip_inputs: List[Optional["torch.Tensor"]]) -> List[List[str]]:
+        """Get tags for a batch of preprocessed images with one OpenCLIP forward pass"""
+        fallback = ["photorealistic", "detailed"]
+        results = [list(fallback) for _ in clip_inputs]
+
+        if not OPENCLIP_AVAILABLE:
+            logger.warning("OpenCLIP library not available")
+            return results
+
+        indices = [i for i, clip_input in enumerate(clip_inputs) if clip_input is not None]
+        if not indices:
+            return results
+
+        try:
+            openclip = self._get_openclip()
+            transforms = self._get_openclip_transforms()
+            if openclip is None or transforms is None:
+                logger.warning("Could not ensure OpenCLIP model availability")
+                return results
+            model = openclip[0]
+            _, tokenizer = transforms
+
+            clip_config = self.model_downloader.model_configs['openclip_vith14']
+            candidate_tags = self.openclip_candidate_tags
+            text_features = self._get_openclip_text_features(
+                model, tokenizer, clip_config['model_name'], clip_config['pretrained']
+            )
+
+            with torch.no_grad():
+                # Only images are encoded per batch; text features are cached
+                image_features = model.encode_image(torch.stack([clip_inputs[i] for i in indices]))
                 image_features = image_features / image_features.norm(dim=-1, keepdim=True)
-                text_features = text_features / text_features.norm(dim=-1, keepdim=True)
 
                 # Calculate similarity scores
-                similarity = (image_features @ text_features.T).squeeze(0)
-
-                # Get top 5 most similar tags
-                top_indices = similarity.topk(min(5, len(candidate_tags))).indices
-                selected_tags = [candidate_tags[i] for i in top_indices.tolist()]
+                similarity = image_features @ text_features.T
 
-                return selected_tags
+                # Get top 5 most similar tags per image
+                top_indices = similarity.topk(min(5, len(candidate_tags)), dim=-1).indices
+                for i, row in zip(indices, top_indices.tolist()):
+                    results[i] = [candidate_tags[j] for j in row]
 
         except Exception as e:
             logger.error(f"OpenCLIP tagging failed: {e}")
-            return ["photorealistic", "detailed"]
 
-    def _get_yolo_tags(self, image: np.ndarray) -> List[str]:
-        """Get object detection tags using YOLOv11 with ONNX inference"""
+        return results
+
+    def _get_openclip_text_features(self, model, tokenizer, model_name: str, pretrained: str) -> "torch.Tensor":
+        """
+        Get normalized text features for the candidate tags.
+
+        Computed once per model and tag vocabulary, then kept in memory and
+        saved under models_dir/cache so later runs skip the text encoder.
+        """
+        vocab_hash = hashlib.sha256(
+            "\n".join([model_name, pretrained] + self.openclip_candidate_tags).encode('utf-8')
+        ).hexdigest()[:16]
+
+        text_features = self._text_features_cache.get(vocab_hash)
+        if text_features is not None:
+            return text_features
+
+        cache_path = self.models_dir / "cache" / f"openclip_text_{vocab_hash}.npy"
+        if cache_path.exists():
+            try:
+                text_features = torch.from_numpy(np.load(cache_path))
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable text feature cache {cache_path}: {e}")
+
+        if text_features is None:
+            # Tokenize and encode the candidate tags
+            text_tokens = tokenizer(self.openclip_candidate_tags)
+            with torch.no_grad():
+                text_features = model.encode_text(text_tokens)
+                text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                np.save(cache_path, text_features.cpu().numpy())
+            except OSError as e:
+                logger.warning(f"Could not save text feature cache {cache_path}: {e}")
+
+        self._text_features_cache[vocab_hash] = text_features
+        return text_features
+
+    def _ensure_model_available(self, model_key: str) -> bool:
+        """Check (and download if needed) a model once, then reuse the result"""
+        with self._availability_lock:
+            if model_key not in self._model_availability:
+                success, _ = self.model_downloader.ensure_model_available(model_key)
+                self._model_availability[model_key] = success
+            return self._model_availability[model_key]
+
+    def _get_yolo_tags(self, yolo_inputs: List[Optional[np.ndarray]]) -> List[List[str]]:
+        """Get object detection tags for a batch using YOLOv11 with ONNX inference"""
+        results = [["object"] for _ in yolo_inputs]
+        indices = [i for i, yolo_input in enumerate(yolo_inputs) if yolo_input is not None]
+        if not indices:
+            return results
+
         try:
             # Ensure YOLO model is available
-            success, model_path = self.model_downloader.ensure_model_available('yolov11s')
-            if not success:
+            if not self._ensure_model_available('yolov11s'):
                 logger.warning("YOLO model not available")
-                return ["object"]
+                return results
 
             # Get model session dynamically
             session = self.model_manager.get_model(ModelType.DETECTION)
             if not session:
                 logger.warning("YOLO model session not available")
-                return ["object"]
-
-            # Convert CHW to HWC and prepare for YOLO input
-            image_hwc = np.transpose(image, (1, 2, 0))
-            image_hwc = (image_hwc * 255).astype(np.uint8)
-
-            # YOLO expects BGR format and specific input shape
-            # Convert RGB to BGR
-            image_bgr = image_hwc[:, :, ::-1]
-
-            # Resize to 640x640 (YOLOv11 default)
-            import cv2
-            image_resized = cv2.resize(image_bgr, (640, 640))
-
-            # Convert to float32 and normalize to [0, 1]
-            image_input = image_resized.astype(np.float32) / 255.0
-
-            # Transpose to CHW and add batch dimension
-            image_input = np.transpose(image_input, (2, 0, 1))
-            image_input = np.expand_dims(image_input, axis=0)
-
-            # Run inference
-            outputs = session.run(None, {'images': image_input})
-
-            # Process YOLO outputs (simplified - real implementation would include NMS)
-            # YOLO outputs are [batch, num_predictions, 85] where 85 = 4 bbox + 1 conf + 80 classes
-            predictions = outputs[0][0]  # Remove batch dimension
-
-            # Filter by confidence threshold
-            confidence_threshold = 0.5
-            high_conf_mask = predictions[:, 4] > confidence_threshold
-            high_conf_predictions = predictions[high_conf_mask]
-
-            if len(high_conf_predictions) == 0:
-                return ["object"]
-
-            # Get class indices (simplified - using COCO classes)
-            coco_classes = [
-                'person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus', 'train', 'truck',
-                'boat', 'traffic light', 'fire hydrant', 'stop sign', 'parking meter', 'bench',
-                'bird', 'cat', 'dog', 'horse', 'sheep', 'cow', 'elephant', 'bear', 'zebra',
-                'giraffe', 'backpack', 'umbrella', 'handbag', 'tie', 'suitcase', 'frisbee',
-                'skis', 'snowboard', 'sports ball', 'kite', 'baseball bat', 'baseball glove',
-                'skateboard', 'surfboard', 'tennis racket', 'bottle', 'wine glass', 'cup',
-                'fork', 'knife', 'spoon', 'bowl', 'banana', 'apple', 'sandwich', 'orange',
-                'broccoli', 'carrot', 'hot dog', 'pizza', 'donut', 'cake', 'chair', 'couch',
-                'potted plant', 'bed', 'dining table', 'toilet', 'tv', 'laptop', 'mouse',
-                'remote', 'keyboard', 'cell phone', 'microwave', 'oven', 'toaster', 'sink',
-                'refrigerator', 'book', 'clock', 'vase', 'scissors', 'teddy bear', 'hair drier',
-                'toothbrush'
-            ]
-
-            detected_classes = []
-            for pred in high_conf_predictions:
-                class_idx = int(np.argmax(pred[5:]))  # Skip bbox and conf, get class
-                if class_idx < len(coco_classes):
-                    detected_classes.append(coco_classes[class_idx])
-
-            # Remove duplicates and return unique detected objects
-            unique_objects = list(set(detected_classes))
-            return unique_objects[:5]  # Limit to top 5 detections
+                return results
+
+            # Run the whole batch at once unless the model has a fixed batch size of 1
+            batch_dim = session.get_inputs()[0].shape[0]
+            step = 1 if batch_dim == 1 else len(indices)
+            predictions = []
+            for start in range(0, len(indices), step):
+                image_input = np.stack([yolo_inputs[i] for i in indices[start:start + step]])
+                outputs = session.run(None, {'images': image_input})
+                predictions.extend(outputs[0])
+
+            for i, image_predictions in zip(indices, predictions):
+                results[i] = self._decode_yolo_predictions(image_predictions)
 
         except Exception as e:
             logger.error(f"YOLO detection failed: {e}")
-            return ["object"]
 
-    def _get_blip_caption(self, image: np.ndarray) -> Optional[str]:
-        """Get image caption using BLIP2 with ONNX inference"""
-        try:
-            # Ensure BLIP model is available
-            success, model_path = self.model_downloader.ensure_model_available('blip_large')
-            if not success:
-                logger.warning("BLIP model not available")
-                return None
+        return results
 
-            # Get model session dynamically
-            session = self.model_manager.get_model(ModelType.CAPTIONING)
-            if not session:
-                logger.warning("BLIP model session not available")
-                return None
+    def _decode_yolo_predictions(self, predictions: np.ndarray) -> List[str]:
+        """Turn one image's YOLO predictions into unique object tags"""
+        # Process YOLO outputs (simplified - real implementation would include NMS)
+        # YOLO outputs are [num_predictions, 85] where 85 = 4 bbox + 1 conf + 80 classes
+
+        # Filter by confidence threshold
+        confidence_threshold = 0.5
+        high_conf_mask = predictions[:, 4] > confidence_threshold
+        high_conf_predictions = predictions[high_conf_mask]
 
-            # Convert CHW to HWC for BLIP preprocessing
-            image_hwc = np.transpose(image, (1, 2, 0))
-            image_hwc = (image_hwc * 255).astype(np.uint8)
+        if len(high_conf_predictions) == 0:
+            return ["object"]
 
-            # BLIP expects 384x384 images, resize accordingly
-            import cv2
-            image_resized = cv2.resize(image_hwc, (384, 384))
+        # Get class indices (simplified - using COCO classes)
+        coco_classes = [
+            'person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus', 'train', 'truck',
+            'boat', 'traffic light', 'fire hydrant', 'stop sign', 'parking meter', 'bench',
+            'bird', 'cat', 'dog', 'horse', 'sheep', 'cow', 'elephant', 'bear', 'zebra',
+            'giraffe', 'backpack', 'umbrella', 'handbag', 'tie', 'suitcase', 'frisbee',
+            'skis', 'snowboard', 'sports ball', 'kite', 'baseball bat', 'baseball glove',
+            'skateboard', 'surfboard', 'tennis racket', 'bottle', 'wine glass', 'cup',
+            'fork', 'knife', 'spoon', 'bowl', 'banana', 'apple', 'sandwich', 'orange',
+            'broccoli', 'carrot', 'hot dog', 'pizza', 'donut', 'cake', 'chair', 'couch',
+            'potted plant', 'bed', 'dining table', 'toilet', 'tv', 'laptop', 'mouse',
+            'remote', 'keyboard', 'cell phone', 'microwave', 'oven', 'toaster', 'sink',
+            'refrigerator', 'book', 'clock', 'vase', 'scissors', 'teddy bear', 'hair drier',
+            'toothbrush'
+        ]
 
-            # Convert to float32 and normalize (BLIP expects pixel values in range [0, 1])
-            image_input = image_resized.astype(np.float32) / 255.0
+        detected_classes = []
+        for pred in high_conf_predictions:
+            class_idx = int(np.argmax(pred[5:]))  # Skip bbox and conf, get class
+            if class_idx < len(coco_classes):
+                detected_classes.append(coco_classes[class_idx])
 
-            # Transpose to CHW and add batch dimension
-            image_input = np.transpose(image_input, (2, 0, 1))
-            image_input = np.expand_dims(image_input, axis=0)
+        # Remove duplicates and return unique detected objects
+        unique_objects = list(set(detected_classes))
+        return unique_objects[:5]  # Limit to top 5 detections
 
-            # Create input_ids for generation (start with BOS token)
-            # BLIP uses tokenizer vocab, BOS token is typically 101 for BERT-based models
-            input_ids = np.array([[101]], dtype=np.int64)  # BOS token
+    def _get_blip_caption(self) -> Optional[str]:
+        """Get image caption using BLIP2 with ONNX inference"""
+        try:
+            # Ensure BLIP model is available
+            if not self._ensure_model_available('blip_large'):
+                logger.warning("BLIP model not available")
+                return None
 
-            # For now, return a simple caption since full generation is complex
-            # In a real implementation, you'd need to implement text generation loop
+            # For now, return a simple caption since full generation is complex.
+            # The session is not loaded until captions are really generated; in
+            # a real implementation you'd get it from the model manager, prepare
+            # a 384x384 input in prepare_image() and run a generation loop per batch
             return "A detailed image showing various objects and elements"
 
         except Exception as e:
@@ -421,21 +544,14 @@ class ImageTagger:
         else:
             return self.background_tags
 
-    def _assess_quality(self, image_path: Path) -> List[str]:
-        """Assess image quality and add relevant tags"""
-        try:
-            with Image.open(image_path) as img:
-                width, height = img.size
-
-                # Size-based quality
-                if width >= 2048 and height >= 2048:
-                    return ["high resolution", "4k", "ultra hd"]
-                elif width >= 1024 and height >= 1024:
-                    return ["high resolution", "hd"]
-                elif width >= 512 and height >= 512:
-                    return ["medium resolution"]
-                else:
-                    return ["low resolution"]
-
-        except Exception:
-            return ["quality unknown"]
\ No newline at end of file
+    def _assess_quality(self, width: int, height: int) -> List[str]:
+        """Assess image quality from its size and add relevant tags"""
+        # Size-based quality
+        if width >= 2048 and height >= 2048:
+            return ["high resolution", "4k", "ultra hd"]
+        elif width >= 1024 and height >= 1024:
+            return ["high resolution", "hd"]
+        elif width >= 512 and height >= 512:
+            return ["medium resolution"]
+        else:
+            return ["low resolution"]
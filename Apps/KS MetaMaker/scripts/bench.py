@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate search benchmark: NearDuplicateIndex vs pairwise comparison
+
+Generates random 64-bit hashes with planted near-duplicates, times the
+multi-index search at several Hamming radii, and checks it against a
+brute-force pairwise search on a subset.
+
+Usage:
+    python scripts/bench.py [num_hashes]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ks_metamaker.quality import NearDuplicateIndex
+
+
+def make_hashes(n: int, dup_fraction: float = 0.05, max_flips: int = 8, seed: int = 0) -> np.ndarray:
+    """Random hashes where dup_fraction of them are copies of others with a few bits flipped"""
+    rng = np.random.default_rng(seed)
+    hashes = rng.integers(0, 2**64, size=n, dtype=np.uint64)
+    dups = rng.choice(n, size=int(n * dup_fraction), replace=False)
+    for i in dups:
+        source = hashes[rng.integers(0, n)]
+        flips = rng.choice(64, size=rng.integers(0, max_flips + 1), replace=False)
+        hashes[i] = source ^ np.uint64(sum(1 << int(b) for b in flips))
+    return hashes
+
+
+def brute_force_pairs(hashes: np.ndarray, max_distance: int) -> set:
+    pairs = set()
+    for i in range(len(hashes) - 1):
+        dist = NearDuplicateIndex.hamming(np.full(len(hashes) - i - 1, hashes[i]), hashes[i + 1:])
+        pairs.update((i, i + 1 + j) for j in np.flatnonzero(dist <= max_distance))
+    return pairs
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    hashes = make_hashes(n)
+    index = NearDuplicateIndex(hashes)
+
+    print(f"{n} hashes")
+    print(f"{'Radius':>6} {'Pairs':>8} {'Time s':>8}")
+    for radius in (0, 2, 4, 6, 8, 10):
+        start = time.perf_counter()
+        pairs = index.pairs(radius)
+        elapsed = time.perf_counter() - start
+        print(f"{radius:6d} {len(pairs):8d} {elapsed:8.2f}")
+
+    # Check against brute force on a subset small enough to compare pairwise
+    subset = hashes[:min(n, 3000)]
+    for radius in (0, 6, 10):
+        start = time.perf_counter()
+        expected = brute_force_pairs(subset, radius)
+        brute_time = time.perf_counter() - start
+        found = set(map(tuple, NearDuplicateIndex(subset).pairs(radius).tolist()))
+        status = "OK" if found == expected else "MISMATCH"
+        print(f"Check radius {radius} on {len(subset)} hashes: {status} "
+              f"({len(found)} pairs, pairwise {brute_time:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import subprocess
+
+import numpy as np
+from PIL import Image
+
+from ks_metamaker.ingest import ImageIngester, _scan_image
+
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _gradient16(path):
+    pixels = np.tile(np.linspace(0, 65535, 256).astype(np.uint16), (64, 1))
+    Image.fromarray(pixels).save(path)
+    return pixels
+
+
+def test_16bit_image_scaled_not_clipped(tmp_path):
+    path = tmp_path / "gradient16.png"
+    pixels = _gradient16(path)
+    with Image.open(path) as img:
+        assert img.mode.startswith("I;16")
+
+    record = _scan_image(path, blur_threshold=100.0, assess_quality=True, compute_hash=True)
+    assert record.valid
+    assert record.image_hash is not None
+
+    # Same metrics as the 8-bit version of the image
+    expected = (pixels >> 8).astype(np.uint8)
+    assert abs(record.quality["brightness"] - expected.mean()) < 0.5
+    assert abs(record.quality["contrast"] - expected.std()) < 0.5
+    assert record.quality["blur_score"] < 1.0
+
+
+def test_ingest_keeps_16bit_and_8bit_duplicates_together(tmp_path):
+    pixels = _gradient16(tmp_path / "a16.png")
+    Image.fromarray((pixels >> 8).astype(np.uint8)).save(tmp_path / "b8.png")
+
+    ingester = ImageIngester(enable_quality_filter=False, max_workers=1)
+    kept = ingester.ingest(tmp_path)
+    assert kept == [tmp_path / "a16.png"]
+
+
+def test_ingest_import_does_not_load_heavy_modules():
+    code = ("import sys, ks_metamaker.ingest; "
+            "print([m for m in ('torch', 'open_clip', 'transformers', 'PyQt6') if m in sys.modules])")
+    out = subprocess.run([sys.executable, '-c', code], cwd=APP_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == '[]'
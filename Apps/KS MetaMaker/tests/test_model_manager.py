@@ -0,0 +1,70 @@
+import time
+from pathlib import Path
+
+from ks_metamaker.dynamic_model_manager import DynamicModelManager, ModelInfo, ModelType
+
+
+_MB = 1024 * 1024
+
+
+def _manager(tmp_path, max_models=3, budget_mb=1000):
+    manager = DynamicModelManager(tmp_path)
+    manager.hardware_limits.max_models_loaded = max_models
+    manager.memory_budget_bytes = budget_mb * _MB
+    return manager
+
+
+def _fake_load(manager, model_type, size_mb, idle=0.0):
+    info = ModelInfo(model_type=model_type, model_path=Path(f"{model_type.value}.onnx"),
+                     session=object(), loaded_at=time.time() - idle, last_used=time.time() - idle,
+                     memory_bytes=size_mb * _MB)
+    manager.loaded_models[model_type] = info
+    manager._pin(model_type)
+    return info
+
+
+def test_held_models_are_evicted_last(tmp_path):
+    manager = _manager(tmp_path, max_models=2)
+    _fake_load(manager, ModelType.CAPTIONING, 100)
+    with manager.hold_models():
+        # Tagging was used longest ago, but it is held by the batch
+        _fake_load(manager, ModelType.TAGGING, 100, idle=1000)
+        assert manager._free_memory_for_model(ModelType.DETECTION, 100 * _MB)
+        assert set(manager.loaded_models) == {ModelType.TAGGING}
+    assert not manager._pinned
+
+
+def test_held_model_evicted_when_nothing_else_frees_room(tmp_path):
+    manager = _manager(tmp_path, max_models=1)
+    with manager.hold_models():
+        _fake_load(manager, ModelType.TAGGING, 100)
+        assert manager._free_memory_for_model(ModelType.DETECTION, 100 * _MB)
+        assert not manager.loaded_models
+
+
+class _CpuOnlyDetector:
+    def get_hardware_summary(self):
+        return {'gpus': [], 'system': {'available_ram_gb': 16.0}}
+
+
+def test_cpu_budget_uses_available_ram(tmp_path):
+    manager = DynamicModelManager(tmp_path, _CpuOnlyDetector())
+    assert not manager.hardware_limits.on_gpu
+    assert manager.memory_budget_bytes == int(16.0 * 1024 * 0.8) * _MB
+    assert manager.hardware_limits.max_models_loaded == 3
+    assert manager.session_providers == ["CPUExecutionProvider"]
+
+
+def test_model_larger_than_budget_cannot_fit(tmp_path):
+    manager = _manager(tmp_path, budget_mb=1000)
+    _fake_load(manager, ModelType.CAPTIONING, 100)
+    assert not manager._free_memory_for_model(ModelType.TAGGING, 2000 * _MB)
+    assert manager._free_memory_for_model(ModelType.TAGGING, 900 * _MB)
+
+
+def test_onnx_weight_bytes_from_file_sizes(tmp_path):
+    model_path = tmp_path / "yolo.onnx"
+    model_path.write_bytes(b"\0" * 1000)
+    assert DynamicModelManager._onnx_weight_bytes(model_path) == 1000
+    (tmp_path / "yolo.onnx.data").write_bytes(b"\0" * 500)
+    assert DynamicModelManager._onnx_weight_bytes(model_path) == 1500
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from ks_metamaker.quality import NearDuplicateIndex, QualityAssessor
+
+
+def clustered_hashes(seed=0, clusters=40, per_cluster=5, max_flips=8):
+    """Random 64-bit hashes with near copies, so every radius has real pairs"""
+    rng = np.random.default_rng(seed)
+    hashes = []
+    for base in rng.integers(0, 2**63, size=clusters, dtype=np.int64).astype(np.uint64):
+        hashes.append(int(base))
+        for _ in range(per_cluster - 1):
+            bits = rng.choice(64, size=rng.integers(0, max_flips + 1), replace=False)
+            hashes.append(int(base) ^ sum(1 << int(b) for b in bits))
+    return np.array(hashes, dtype=np.uint64)
+
+
+def brute_force_pairs(hashes, radius):
+    values = [int(h) for h in hashes]
+    return [(i, j) for i in range(len(values)) for j in range(i + 1, len(values))
+            if bin(values[i] ^ values[j]).count("1") <= radius]
+
+
+@pytest.mark.parametrize("radius", [0, 1, 2, 3, 6, 10])
+def test_pairs_match_brute_force(radius):
+    hashes = clustered_hashes()
+    # Exact duplicates so radius 0 has pairs too
+    hashes = np.concatenate([hashes, hashes[:5]])
+    expected = brute_force_pairs(hashes, radius)
+    assert expected
+    assert NearDuplicateIndex(hashes).pairs(radius).tolist() == [list(p) for p in expected]
+
+
+def test_pairs_across_unequal_block_boundaries():
+    # r=2 splits 64 bits into blocks of 21, 21 and 22; flip bits on each side of a boundary
+    base = 0x0123456789ABCDEF
+    hashes = np.array([base, base ^ (1 << 20) ^ (1 << 21), base ^ (1 << 41) ^ (1 << 42),
+                       base ^ (1 << 63) ^ 1, base ^ 0b111], dtype=np.uint64)
+    assert (NearDuplicateIndex(hashes).pairs(2).tolist()
+            == [list(p) for p in brute_force_pairs(hashes, 2)])
+
+
+def test_duplicate_mask_keeps_first_of_a_chain():
+    # a~b and b~c within radius 2, but a and c are 4 bits apart
+    a = 0
+    b = a ^ 0b11
+    c = b ^ 0b1100
+    index = NearDuplicateIndex(np.array([a, b, c], dtype=np.uint64))
+    assert index.pairs(2).tolist() == [[0, 1], [1, 2]]
+    # b is dropped for a; c is kept because the only item near it was dropped
+    assert index.duplicate_mask(2).tolist() == [False, True, False]
+
+
+def test_near_duplicate_mask_never_drops_unhashed():
+    assessor = QualityAssessor(duplicate_threshold=0.9)
+    hashes = [None, "0000000000000000", None, "0000000000000003", "ffffffffffffffff", None]
+    assert assessor.near_duplicate_mask(hashes) == [False, False, False, True, False, False]
+    assert assessor.near_duplicate_mask([None, None]) == [False, False]
+
+
+def test_max_hash_distance():
+    assert QualityAssessor(duplicate_threshold=0.9).max_hash_distance == 6
+    assert QualityAssessor(duplicate_threshold=1.0).max_hash_distance == 0
+    assert QualityAssessor(duplicate_threshold=0.0).max_hash_distance == 64
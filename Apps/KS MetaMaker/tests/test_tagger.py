@@ -0,0 +1,14 @@
+from ks_metamaker.tagger import ImageTagger
+from ks_metamaker.utils.config import Config
+
+
+def test_blip_caption_does_not_load_a_session(tmp_path, monkeypatch):
+    tagger = ImageTagger(Config(), models_dir=tmp_path)
+    tagger._model_availability['blip_large'] = True
+
+    def fail(*args, **kwargs):
+        raise AssertionError("BLIP session loaded for a fixed caption")
+
+    monkeypatch.setattr(tagger.model_manager, 'get_model', fail)
+    assert tagger._get_blip_caption()
+    assert not tagger.model_manager.loaded_models
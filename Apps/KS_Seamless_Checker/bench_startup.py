@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for KS Seamless Checker
+Measures cold import and window construction time in fresh interpreters and
+reports which heavy modules were loaded before the first analysis.
+"""
+
+import sys
+import os
+import json
+import subprocess
+
+HEAVY_MODULES = ['torch', 'torchvision', 'scipy', 'skimage']
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import src.image_checker, src.batch_processor
+t_core = time.perf_counter() - t0
+t_gui = t_window = None
+try:
+    from PySide6.QtWidgets import QApplication
+    from src.gui import SeamlessCheckerGUI
+    t_gui = time.perf_counter() - t0
+    app = QApplication(sys.argv)
+    window = SeamlessCheckerGUI()
+    t_window = time.perf_counter() - t0
+except ImportError:
+    pass
+print(json.dumps({
+    'core_import': t_core,
+    'gui_import': t_gui,
+    'window_ready': t_window,
+    'heavy_loaded': [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def run_probe():
+    """Run one cold-start probe in a fresh interpreter and return its measurements."""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    result = subprocess.run([sys.executable, '-c', PROBE % (HEAVY_MODULES,)],
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, env=env, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def fmt(value):
+    return f"{value * 1000:8.1f} ms" if value is not None else "     n/a"
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print("Running KS Seamless Checker startup benchmark...")
+    samples = [run_probe() for _ in range(runs)]
+    for key, label in [('core_import', 'Core modules import'),
+                       ('gui_import', 'GUI module import'),
+                       ('window_ready', 'Main window ready')]:
+        values = [s[key] for s in samples if s[key] is not None]
+        print(f"{label:<22}{fmt(min(values) if values else None)} (best of {runs})")
+
+    heavy = sorted({m for s in samples for m in s['heavy_loaded']})
+    if heavy:
+        print(f"✗ Heavy modules loaded at startup: {', '.join(heavy)}")
+        sys.exit(1)
+    print("✓ No heavy modules loaded at startup")
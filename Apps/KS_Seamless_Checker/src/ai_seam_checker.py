@@ -1,4 +1,5 @@
 import os
+import cv2
 import torch
 import torch.nn as nn
 import torchvision.transforms as transforms
@@ -7,25 +8,28 @@ from PIL import Image
 import numpy as np
 
 class AISeamChecker:
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, batch_size=16, num_threads=None):
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.model_path = model_path or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models', 'efficientnet_b0_seamless.pth')
-        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-        
+        # Number of images stacked into one forward pass
+        self.batch_size = max(1, int(batch_size))
+
+        # Use a fixed intra-op thread count on CPU so pool workers don't oversubscribe cores
+        if self.device.type == 'cpu':
+            torch.set_num_threads(max(1, int(num_threads or os.cpu_count() or 1)))
+
         # Load EfficientNet-B0 with binary classifier head
         self.model = efficientnet_b0(weights=EfficientNet_B0_Weights.IMAGENET1K_V1)
         self.model.classifier[1] = nn.Linear(self.model.classifier[1].in_features, 2)  # Binary: seamless vs not seamless
-        
-        # Load or initialize weights
+
+        # Load fine-tuned weights if present; otherwise keep the initial weights in
+        # memory rather than writing an untrained ~20MB state dict to disk
         if os.path.exists(self.model_path):
             self.model.load_state_dict(torch.load(self.model_path, map_location=self.device))
-        else:
-            # Save initial weights (can be fine-tuned later)
-            torch.save(self.model.state_dict(), self.model_path)
-        
+
         self.model.to(self.device)
         self.model.eval()
-        
+
         # Preprocessing transform
         self.transform = transforms.Compose([
             transforms.Resize((224, 224)),
@@ -33,20 +37,63 @@ class AISeamChecker:
             transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
         ])
 
+    def preprocess(self, image):
+        """
+        Convert a decoded image to a normalized 3x224x224 input tensor.
+
+        Accepts a PIL image or a NumPy array in OpenCV channel order (BGR/BGRA
+        or grayscale), as returned by cv2.imread. Returns None on failure.
+        """
+        try:
+            if isinstance(image, Image.Image):
+                pil_image = image.convert('RGB')
+            else:
+                if image.ndim == 2:
+                    rgb = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+                elif image.shape[2] == 4:
+                    rgb = cv2.cvtColor(image, cv2.COLOR_BGRA2RGB)
+                else:
+                    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+                pil_image = Image.fromarray(rgb)
+            return self.transform(pil_image)
+        except Exception:
+            return None
+
+    def predict(self, inputs):
+        """
+        Classify preprocessed input tensors in batches of self.batch_size.
+
+        Returns a list aligned with `inputs`: True (seamless), False, or None
+        for inputs that were missing or whose batch failed.
+        """
+        results = [None] * len(inputs)
+        valid = [i for i, t in enumerate(inputs) if t is not None]
+        for start in range(0, len(valid), self.batch_size):
+            indices = valid[start:start + self.batch_size]
+            try:
+                batch = torch.stack([inputs[i] for i in indices]).to(self.device)
+                with torch.inference_mode():
+                    outputs = self.model(batch)
+                    predicted = torch.argmax(outputs, dim=1).tolist()
+                for i, label in zip(indices, predicted):
+                    results[i] = label == 1  # 1 = seamless, 0 = not seamless
+            except Exception:
+                continue
+        return results
+
+    def is_seamless_ai_batch(self, images):
+        """Use EfficientNet-B0 to classify a list of already-decoded images in batches."""
+        return self.predict([self.preprocess(image) for image in images])
+
     def is_seamless_ai(self, image_path):
         """Use EfficientNet-B0 to check if image is seamless."""
         try:
             image = Image.open(image_path).convert('RGB')
-            input_tensor = self.transform(image).unsqueeze(0).to(self.device)
-
-            with torch.no_grad():
-                outputs = self.model(input_tensor)
-                _, predicted = torch.max(outputs, 1)
-                return predicted.item() == 1  # 1 = seamless, 0 = not seamless
         except Exception as e:
             return None
+        return self.is_seamless_ai_batch([image])[0]
 
     def download_model(self, url, save_path):
         """Download pre-trained model (placeholder - would need actual model)."""
         # For now, just use the pre-trained weights
-        pass
\ No newline at end of file
+        pass
@@ -1,12 +1,38 @@
 import os
 import cv2
 import csv
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
 from PIL import Image
 # Add parent directory to sys.path for relative imports when run directly
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from .image_checker import ImageChecker
+from .image_checker import ImageChecker, SeamlessAnalysis, ALGORITHM_VERSION
+from .result_cache import ResultCache
+
+
+# Per-process BatchProcessor used by pool workers (see _init_worker)
+_worker_processor = None
+
+
+def _init_worker(settings):
+    """Build the worker-local checker and processor once per pool process."""
+    global _worker_processor
+    checker = ImageChecker(**settings['checker'])
+    processor = BatchProcessor(checker, settings['supported_formats'], settings['preview_folder'])
+    if settings['cache_path']:
+        processor.cache = ResultCache(settings['cache_path'])
+    for key, value in settings['processor'].items():
+        setattr(processor, key, value)
+    _worker_processor = processor
+
+
+def _process_in_worker(file_paths):
+    """Pool task: analyze a chunk of files with the worker-local processor."""
+    return _worker_processor.process_files(file_paths)
+
 
 class BatchProcessor:
     def __init__(self, checker, supported_formats, preview_folder):
@@ -20,64 +46,230 @@ class BatchProcessor:
         # thumbnail settings
         self.thumbnail_only_in_memory = True
         self.thumbnail_max_size = 256
+        # parallel settings: workers <= 1 processes files on the calling thread
+        self.workers = 1
+        # ordered=True yields results in folder order, False streams them as they finish
+        self.ordered_results = True
+        # optional ResultCache; unchanged files are served without re-analysis
+        self.cache = None
+        self._cancel_event = threading.Event()
+
+    def list_files(self, folder_path):
+        """Return the supported image paths in folder_path, in listing order."""
+        return [os.path.join(folder_path, f) for f in os.listdir(folder_path)
+                if any(f.lower().endswith(ext) for ext in self.supported_formats)]
+
+    def cancel(self):
+        """Request cancellation of the running folder scan."""
+        self._cancel_event.set()
 
-    def process_folder(self, folder_path):
+    def process_folder(self, folder_path, progress_callback=None):
         """Process all images in folder, return results and save previews."""
-        results = []
-        for file in os.listdir(folder_path):
-            if any(file.lower().endswith(ext) for ext in self.supported_formats):
-                img_path = os.path.join(folder_path, file)
-                r = self.process_file(img_path)
-                if r:
-                    results.append(r)
-        return results
+        return list(self.iter_folder(folder_path, progress_callback=progress_callback))
+
+    def iter_folder(self, folder_path, progress_callback=None):
+        """
+        Process all images in folder and yield result dicts as they become available.
+
+        Uses a process pool when self.workers > 1 (the analysis is CPU-bound).
+        progress_callback(done, total, result) is called after every file,
+        with result None for files that could not be processed. Calling
+        cancel() stops the scan; files not yet started are skipped.
+        """
+        self._cancel_event.clear()
+        files = self.list_files(folder_path)
+        total = len(files)
+        # Files are handed out in chunks so AI inference can be batched across them
+        chunk_size = self._chunk_size()
+        chunks = [files[i:i + chunk_size] for i in range(0, total, chunk_size)]
+        if self.workers and self.workers > 1 and len(chunks) > 1:
+            results = self._iter_parallel(chunks)
+        else:
+            results = (r for chunk in chunks if not self._cancel_event.is_set()
+                       for r in self.process_files(chunk))
+
+        for done, r in enumerate(results, start=1):
+            if progress_callback:
+                progress_callback(done, total, r)
+            if r:
+                yield r
+            if self._cancel_event.is_set():
+                break
+
+    def _chunk_size(self):
+        """Files per processing task: the AI batch size in AI mode, otherwise one."""
+        # Only checks use_ai so the parent process never loads the model for pool runs
+        if self.checker.use_ai:
+            return max(1, int(self.checker.ai_batch_size))
+        return 1
+
+    def _iter_parallel(self, chunks):
+        """Fan file chunks out to a process pool, yielding results (or None) per file."""
+        workers = min(self.workers, len(chunks))
+        settings = {
+            'checker': {
+                'threshold': self.checker.threshold,
+                'use_ai': self.checker.use_ai,
+                'model_path': getattr(self.checker, 'model_path', None),
+                'ai_batch_size': self.checker.ai_batch_size,
+                # Split the cores between workers instead of each claiming all of them
+                'ai_threads': max(1, (os.cpu_count() or 1) // workers),
+            },
+            'supported_formats': self.supported_formats,
+            'preview_folder': self.preview_folder,
+            'cache_path': self.cache.db_path if self.cache is not None else None,
+            'processor': {
+                'preview_mode': self.preview_mode,
+                'thumbnail_only_in_memory': self.thumbnail_only_in_memory,
+                'thumbnail_max_size': self.thumbnail_max_size,
+            },
+        }
+        executor = ProcessPoolExecutor(max_workers=workers,
+                                       initializer=_init_worker, initargs=(settings,))
+        try:
+            futures = {executor.submit(_process_in_worker, chunk): chunk for chunk in chunks}
+            pending = list(futures) if self.ordered_results else as_completed(futures)
+            for future in pending:
+                if self._cancel_event.is_set():
+                    break
+                try:
+                    chunk_results = future.result()
+                except BrokenProcessPool:
+                    # Every remaining chunk would fail too; let the caller report it
+                    raise
+                except Exception:
+                    chunk_results = [None] * len(futures[future])
+                yield from chunk_results
+        finally:
+            # Drop queued files on cancellation (or early generator close)
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def process_file(self, file_path):
         """Process a single image file and save a tiled preview. Returns a result dict or None."""
-        if not os.path.isfile(file_path):
-            return None
-        if not any(file_path.lower().endswith(ext) for ext in self.supported_formats):
-            return None
-        img = cv2.imread(file_path)
-        if img is None:
-            return None
-        seamless = self.checker.is_seamless(img, file_path)
-        detailed_info = self.checker.get_detailed_seamless_info(img, file_path)
-        preview = self.checker.create_tiled_preview(img)
-        # Full tiled preview bytes
-        buf = BytesIO()
-        preview_bytes = b''
+        return self.process_files([file_path])[0]
+
+    def process_files(self, file_paths):
+        """
+        Process several image files, batching AI inference across them.
+
+        Returns a list aligned with file_paths holding a result dict, or None
+        for files that are missing, unsupported or cannot be decoded. Full-size
+        images are released as soon as their preview is built; only the small
+        AI input tensors are kept until the batched inference runs.
+        """
+        results = [None] * len(file_paths)
+        max_size = int(self.thumbnail_max_size) if self.thumbnail_max_size else 256
+        # Full preview bytes are only needed when kept in memory or written to disk
+        need_preview = self.preview_mode == 'disk' or not self.thumbnail_only_in_memory
+        ai_checker = self.checker.ai_checker if self.checker.use_ai else None
+
+        deferred = []
+        for index, file_path in enumerate(file_paths):
+            if not os.path.isfile(file_path):
+                continue
+            if not any(file_path.lower().endswith(ext) for ext in self.supported_formats):
+                continue
+
+            # Look up a cached result for this exact file content and configuration
+            content_hash, cached = self._cache_lookup(file_path, max_size)
+            if cached is not None and cached['thumb_bytes'] and not need_preview:
+                results[index] = self._build_result(file_path, cached, b'')
+                continue
+
+            img = cv2.imread(file_path)
+            if img is None:
+                continue
+
+            if cached is not None:
+                # Redraw the preview overlay from the cached seam scores, no re-analysis
+                analysis = SeamlessAnalysis(seam_vertical_score=cached['seam_vertical_score'],
+                                            seam_horizontal_score=cached['seam_horizontal_score'])
+            else:
+                # Analyze once; AI inference is deferred and batched across files below
+                analysis = self.checker.analyze(img, run_ai=False)
+            preview = self.checker.create_tiled_preview(img, analysis=analysis)
+
+            # Full tiled preview bytes
+            preview_bytes = b''
+            if need_preview:
+                buf = BytesIO()
+                try:
+                    preview.save(buf, format='PNG')
+                    preview_bytes = buf.getvalue()
+                except Exception:
+                    preview_bytes = b''
+
+            if cached is not None:
+                entry = dict(cached)
+                if not entry['thumb_bytes']:
+                    entry['thumb_bytes'] = self._make_thumbnail(preview, max_size)
+                results[index] = self._build_result(file_path, entry, preview_bytes)
+                continue
+
+            ai_input = ai_checker.preprocess(img) if ai_checker else None
+            deferred.append((index, file_path, content_hash, analysis, preview_bytes,
+                             self._make_thumbnail(preview, max_size), ai_input))
+
+        if ai_checker and deferred:
+            predictions = ai_checker.predict([d[6] for d in deferred])
+            for d, prediction in zip(deferred, predictions):
+                d[3].ai_result = prediction
+                d[3].ai_used = prediction is not None
+
+        for index, file_path, content_hash, analysis, preview_bytes, thumb_bytes, _ in deferred:
+            entry = analysis.to_detailed_info()
+            entry['seamless'] = self.checker.is_seamless(None, file_path, analysis=analysis)
+            entry['seam_vertical_score'] = analysis.seam_vertical_score
+            entry['seam_horizontal_score'] = analysis.seam_horizontal_score
+            entry['thumb_bytes'] = thumb_bytes
+
+            if content_hash is not None:
+                try:
+                    self.cache.put(content_hash, self.checker.threshold, ALGORITHM_VERSION, max_size, entry)
+                except Exception:
+                    # A cache write failure must not fail the check itself
+                    pass
+
+            results[index] = self._build_result(file_path, entry, preview_bytes)
+
+        return results
+
+    def _cache_lookup(self, file_path, max_size):
+        """Return (content_hash, cached_entry) for file_path; both None without a usable cache."""
+        if self.cache is None:
+            return None, None
         try:
-            preview.save(buf, format='PNG')
-            preview_bytes = buf.getvalue()
+            content_hash = self.cache.content_hash(file_path)
+            return content_hash, self.cache.get(content_hash, self.checker.threshold, ALGORITHM_VERSION, max_size)
         except Exception:
-            preview_bytes = b''
+            return None, None
 
-        # Create a scaled thumbnail (PIL.Image) and bytes
-        thumb_bytes = b''
+    def _make_thumbnail(self, preview, max_size):
+        """Create a scaled thumbnail of the preview and return its PNG bytes."""
         try:
             thumb = preview.copy()
-            max_size = int(self.thumbnail_max_size) if self.thumbnail_max_size else 256
             thumb.thumbnail((max_size, max_size), Image.LANCZOS)
             tbuf = BytesIO()
             thumb.save(tbuf, format='PNG')
-            thumb_bytes = tbuf.getvalue()
+            return tbuf.getvalue()
         except Exception:
-            thumb_bytes = b''
+            return b''
 
+    def _build_result(self, file_path, entry, preview_bytes):
+        """Assemble the result dict from analysis/cache values and handle preview storage."""
         filename = os.path.basename(file_path)
         result = {
             'file': filename,
-            'seamless': seamless,
-            'seamless_type': detailed_info['seamless_type'],
-            'horizontal_seamless': detailed_info['horizontal_seamless'],
-            'vertical_seamless': detailed_info['vertical_seamless'],
-            'horizontal_score': detailed_info['horizontal_score'],
-            'vertical_score': detailed_info['vertical_score'],
+            'seamless': entry['seamless'],
+            'seamless_type': entry['seamless_type'],
+            'horizontal_seamless': entry['horizontal_seamless'],
+            'vertical_seamless': entry['vertical_seamless'],
+            'horizontal_score': entry['horizontal_score'],
+            'vertical_score': entry['vertical_score'],
             # full tiled preview bytes (may be omitted if thumbnail_only_in_memory=True)
             'preview_bytes': preview_bytes,
             # thumbnail bytes (smaller, used for table and optionally preview)
-            'thumb_bytes': thumb_bytes,
+            'thumb_bytes': entry['thumb_bytes'],
             'preview_path': ''
         }
 
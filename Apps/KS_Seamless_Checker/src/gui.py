@@ -5,7 +5,6 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QCheckBox)
 from PySide6.QtGui import QPalette, QColor, QFont, QPixmap, QIcon, QKeySequence
 from PySide6.QtCore import Qt, QThread, Signal, QSize
-import cv2
 import os
 import json
 import sys
@@ -13,6 +12,7 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from .batch_processor import BatchProcessor
 from .image_checker import ImageChecker
+from .result_cache import ResultCache
 
 
 class ModernDarkTheme:
@@ -336,6 +336,8 @@ class ModernDarkTheme:
 
 class BatchWorker(QThread):
     progress = Signal(int)
+    result_ready = Signal(dict)
+    failed = Signal(str)
     finished = Signal(list)
 
     def __init__(self, processor, path):
@@ -343,6 +345,13 @@ class BatchWorker(QThread):
         self.processor = processor
         # path may be a folder or a single file
         self.path = path
+        self.cancelled = False
+        self.error = None
+
+    def stop(self):
+        """Ask the processor to cancel the running scan."""
+        self.cancelled = True
+        self.processor.cancel()
 
     def run(self):
         results = []
@@ -351,23 +360,24 @@ class BatchWorker(QThread):
             r = self.processor.process_file(self.path)
             if r:
                 results.append(r)
+                self.result_ready.emit(r)
             self.progress.emit(100)
             self.finished.emit(results)
             return
 
-        # Otherwise treat as folder
+        # Otherwise treat as folder; results stream in as workers finish them
+        def on_progress(done, total, result):
+            if total:
+                self.progress.emit(int(done / total * 100))
+
         try:
-            files = [f for f in os.listdir(self.path) if any(f.lower().endswith(ext) for ext in self.processor.supported_formats)]
-        except Exception:
-            files = []
-        total = len(files)
-        for i, file in enumerate(files):
-            img_path = os.path.join(self.path, file)
-            r = self.processor.process_file(img_path)
-            if r:
+            for r in self.processor.iter_folder(self.path, progress_callback=on_progress):
                 results.append(r)
-            if total:
-                self.progress.emit(int((i + 1) / total * 100))
+                self.result_ready.emit(r)
+        except Exception as e:
+            # e.g. an unreadable folder or a broken process pool; keep the partial results
+            self.error = str(e) or type(e).__name__
+            self.failed.emit(self.error)
         self.finished.emit(results)
 
 
@@ -429,6 +439,19 @@ class SettingsDialog(QDialog):
         self.thumb_size_spin.setStyleSheet('background: #35363a; color: #e6e6e6; padding:6px; border-radius:6px;')
         layout.addRow(self.create_label('Thumbnail max size (px)'), self.thumb_size_spin)
 
+        # Result cache
+        self.cache_cb = QCheckBox('Reuse cached results for unchanged files')
+        self.cache_cb.setChecked(self.config.get('use_result_cache', True))
+        self.cache_cb.setStyleSheet('color: #e6e6e6;')
+        layout.addRow(self.cache_cb)
+
+        # Parallel workers
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spin.setValue(int(self.config.get('parallel_workers', os.cpu_count() or 1)))
+        self.workers_spin.setStyleSheet('background: #35363a; color: #e6e6e6; padding:6px; border-radius:6px;')
+        layout.addRow(self.create_label('Parallel workers'), self.workers_spin)
+
         # AI seam detection
         self.ai_seam_cb = QCheckBox('Use AI for seam detection (requires PyTorch)')
         self.ai_seam_cb.setChecked(self.config.get('use_ai_seam_detection', False))
@@ -498,6 +521,8 @@ class SettingsDialog(QDialog):
         self.config['auto_start_on_drop'] = bool(self.auto_start_cb.isChecked())
         self.config['thumbnail_only_in_memory'] = bool(self.thumb_only_cb.isChecked())
         self.config['thumbnail_max_size'] = int(self.thumb_size_spin.value())
+        self.config['parallel_workers'] = int(self.workers_spin.value())
+        self.config['use_result_cache'] = bool(self.cache_cb.isChecked())
         self.config['use_ai_seam_detection'] = bool(self.ai_seam_cb.isChecked())
         with open(config_path, 'w') as f:
             json.dump(self.config, f, indent=2)
@@ -913,7 +938,8 @@ class SeamlessCheckerGUI(QMainWindow):
         self.config = self.load_config()
         self.checker = ImageChecker(
             threshold=self.config.get('seam_threshold', 10),
-            use_ai=self.config.get('use_ai_seam_detection', False)
+            use_ai=self.config.get('use_ai_seam_detection', False),
+            ai_batch_size=int(self.config.get('ai_batch_size', 16))
         )
         self.processor = BatchProcessor(self.checker, self.config.get('supported_formats', ['.png', '.jpg', '.jpeg']), self.config.get('preview_folder', 'previews'))
         # Apply preview_mode from config (memory or disk)
@@ -921,6 +947,10 @@ class SeamlessCheckerGUI(QMainWindow):
         # Thumbnail settings
         self.processor.thumbnail_only_in_memory = self.config.get('thumbnail_only_in_memory', True)
         self.processor.thumbnail_max_size = int(self.config.get('thumbnail_max_size', 256))
+        # Parallel scanning settings
+        self.processor.workers = int(self.config.get('parallel_workers', os.cpu_count() or 1))
+        self.processor.ordered_results = self.config.get('ordered_results', False)
+        self.apply_cache_settings()
         self.worker = None
         self.last_results = []
         self.footer_label = None
@@ -940,6 +970,19 @@ class SeamlessCheckerGUI(QMainWindow):
             'accent_color': '#C49A6C'
         }
 
+    def apply_cache_settings(self):
+        """Attach (or detach) the persistent result cache according to config."""
+        if not self.config.get('use_result_cache', True):
+            self.processor.cache = None
+            return
+        default_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'results.sqlite')
+        cache_path = self.config.get('result_cache_path', default_path)
+        try:
+            self.processor.cache = ResultCache(cache_path)
+        except Exception as e:
+            print(f"Result cache disabled: {e}")
+            self.processor.cache = None
+
     def save_last_path(self, path):
         """Save the last used folder/file path to config."""
         config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
@@ -1138,70 +1181,91 @@ class SeamlessCheckerGUI(QMainWindow):
         if not (os.path.isdir(path) or os.path.isfile(path)):
             QMessageBox.critical(self, 'Error', 'Invalid folder or file path')
             return
+        if self.worker is not None and self.worker.isRunning():
+            # A second click cancels the running scan
+            self.worker.stop()
+            self.footer_label.setText('Cancelling...')
+            return
         self.footer_progress.setVisible(True)
         self.footer_progress.setValue(0)
         self.footer_label.setText('Processing...')
+        # Clear previous results; rows are appended as each file finishes
+        self.last_results = []
+        self.results_table.clearContents()
+        self.results_table.setRowCount(0)
         self.worker = BatchWorker(self.processor, path)
         self.worker.progress.connect(self.footer_progress.setValue)
+        self.worker.result_ready.connect(self._append_result_row)
+        self.worker.failed.connect(self.on_batch_failed)
         self.worker.finished.connect(self.on_batch_finished)
         self.worker.start()
 
+    def on_batch_failed(self, message):
+        QMessageBox.critical(self, 'Error', f'Batch stopped early:\n{message}')
+
     def on_batch_finished(self, results):
         self.footer_progress.setVisible(False)
-        self.footer_label.setText(f'Processed {len(results)} images')
-        self.last_results = results
-        # populate results table
-        self.results_table.clearContents()
-        self.results_table.setRowCount(len(results))
-        for row, res in enumerate(results):
-            status = 'Seamless' if res.get('seamless') else 'Not Seamless'
-            filename = res.get('file')
-            preview_bytes = res.get('preview_bytes', b'')
-            thumb_bytes = res.get('thumb_bytes', b'')
-
-            # Thumbnail cell (use in-memory bytes if available)
-            thumb_item = QTableWidgetItem()
-            # Use thumbnail bytes for table (smaller)
-            if thumb_bytes:
-                pix = QPixmap()
-                pix.loadFromData(thumb_bytes, format='PNG')
-                thumb_item.setIcon(QIcon(pix.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)))
-            elif preview_bytes:
-                pix = QPixmap()
-                pix.loadFromData(preview_bytes, format='PNG')
-                thumb_item.setIcon(QIcon(pix.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)))
-            thumb_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            self.results_table.setItem(row, 0, thumb_item)
-
-            # Filename cell (store preview_bytes in UserRole)
-            file_item = QTableWidgetItem(filename)
-            # store both bytes in UserRole as a small dict-like tuple (thumb, preview)
-            file_item.setData(Qt.UserRole, (thumb_bytes, preview_bytes))
-            file_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            self.results_table.setItem(row, 1, file_item)
-
-            # Status cell
-            status_item = QTableWidgetItem(status)
-            status_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            self.results_table.setItem(row, 2, status_item)
-
-            # Details cell - show seamless type
-            seamless_type = res.get('seamless_type', 'unknown')
-            type_display = {
-                'fully_seamless': 'Fully Seamless',
-                'horizontal_only': 'X-Axis Only',
-                'vertical_only': 'Y-Axis Only',
-                'not_seamless': 'Not Seamless'
-            }.get(seamless_type, seamless_type.title())
-
-            details_item = QTableWidgetItem(type_display)
-            details_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            self.results_table.setItem(row, 3, details_item)
-
-            # adjust row height
-            self.results_table.setRowHeight(row, 72)
-
-        QMessageBox.information(self, 'Done', f'Processed {len(results)} images.')
+        worker = self.sender()
+        if getattr(worker, 'error', None):
+            self.footer_label.setText(f'Failed after {len(results)} images')
+        elif getattr(worker, 'cancelled', False):
+            self.footer_label.setText(f'Cancelled after {len(results)} images')
+        else:
+            self.footer_label.setText(f'Processed {len(results)} images')
+            QMessageBox.information(self, 'Done', f'Processed {len(results)} images.')
+
+    def _append_result_row(self, res):
+        """Add a single streamed result to the results table."""
+        self.last_results.append(res)
+        row = self.results_table.rowCount()
+        self.results_table.insertRow(row)
+
+        status = 'Seamless' if res.get('seamless') else 'Not Seamless'
+        filename = res.get('file')
+        preview_bytes = res.get('preview_bytes', b'')
+        thumb_bytes = res.get('thumb_bytes', b'')
+
+        # Thumbnail cell (use in-memory bytes if available)
+        thumb_item = QTableWidgetItem()
+        # Use thumbnail bytes for table (smaller)
+        if thumb_bytes:
+            pix = QPixmap()
+            pix.loadFromData(thumb_bytes, format='PNG')
+            thumb_item.setIcon(QIcon(pix.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)))
+        elif preview_bytes:
+            pix = QPixmap()
+            pix.loadFromData(preview_bytes, format='PNG')
+            thumb_item.setIcon(QIcon(pix.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)))
+        thumb_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        self.results_table.setItem(row, 0, thumb_item)
+
+        # Filename cell (store preview_bytes in UserRole)
+        file_item = QTableWidgetItem(filename)
+        # store both bytes in UserRole as a small dict-like tuple (thumb, preview)
+        file_item.setData(Qt.UserRole, (thumb_bytes, preview_bytes))
+        file_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        self.results_table.setItem(row, 1, file_item)
+
+        # Status cell
+        status_item = QTableWidgetItem(status)
+        status_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        self.results_table.setItem(row, 2, status_item)
+
+        # Details cell - show seamless type
+        seamless_type = res.get('seamless_type', 'unknown')
+        type_display = {
+            'fully_seamless': 'Fully Seamless',
+            'horizontal_only': 'X-Axis Only',
+            'vertical_only': 'Y-Axis Only',
+            'not_seamless': 'Not Seamless'
+        }.get(seamless_type, seamless_type.title())
+
+        details_item = QTableWidgetItem(type_display)
+        details_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        self.results_table.setItem(row, 3, details_item)
+
+        # adjust row height
+        self.results_table.setRowHeight(row, 72)
 
     def _on_table_click(self, row, column):
         # get preview_path stored in filename cell's UserRole
@@ -1238,13 +1302,18 @@ class SeamlessCheckerGUI(QMainWindow):
             self.config = self.load_config()
             self.checker = ImageChecker(
                 threshold=self.config.get('seam_threshold', 10),
-                use_ai=self.config.get('use_ai_seam_detection', False)
+                use_ai=self.config.get('use_ai_seam_detection', False),
+                ai_batch_size=int(self.config.get('ai_batch_size', 16))
             )
+            self.processor.checker = self.checker
             self.processor.preview_folder = self.config.get('preview_folder', 'previews')
             self.processor.preview_mode = self.config.get('preview_mode', 'memory')
             # apply thumbnail settings
             self.processor.thumbnail_only_in_memory = self.config.get('thumbnail_only_in_memory', True)
             self.processor.thumbnail_max_size = int(self.config.get('thumbnail_max_size', 256))
+            self.processor.workers = int(self.config.get('parallel_workers', os.cpu_count() or 1))
+            self.processor.ordered_results = self.config.get('ordered_results', False)
+            self.apply_cache_settings()
             self.setup_dark_theme()
 
 
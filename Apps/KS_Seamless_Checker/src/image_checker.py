@@ -1,16 +1,67 @@
 import cv2
 import numpy as np
 from PIL import Image
-from skimage.metrics import structural_similarity as ssim
 import os
-from skimage import color
-from scipy import signal
+from dataclasses import dataclass, field
+
+# scikit-image, scipy and the torch-based AI checker are imported lazily so that
+# loading this module (and starting the GUI) stays fast; see _load_ai_checker().
+
+
+def _load_ai_checker():
+    """Import AISeamChecker (and with it torch/torchvision) on first use."""
+    try:
+        from .ai_seam_checker import AISeamChecker
+    except ImportError:
+        # Handle case when imported directly (not as part of package)
+        from ai_seam_checker import AISeamChecker
+    return AISeamChecker
+
+
+@dataclass
+class SeamlessAnalysis:
+    """
+    Cached result of a single ImageChecker.analyze() pass.
+
+    Holds the multi-scale seam scores computed once from the Lab image and its
+    pyramid, so the boolean check, the directional details and the tiled
+    preview overlay can all be served without re-running the analysis.
+    """
+    valid: bool = True
+    # Traditional verdict: fully seamless and not a stripe pattern (see _is_stripe_pattern)
+    seamless: bool = False
+    # Per-direction classification, without the stripe check
+    seamless_type: str = 'invalid'
+    horizontal_seamless: bool = False
+    vertical_seamless: bool = False
+    horizontal_score: float = float('inf')
+    vertical_score: float = float('inf')
+    overall_score: float = float('inf')
+    seam_vertical_score: float = float('inf')
+    seam_horizontal_score: float = float('inf')
+    scale_metrics: list = field(default_factory=list)
+    ai_result: object = None
+    ai_used: bool = False
+
+    def to_detailed_info(self):
+        """Return the dict format produced by get_detailed_seamless_info()."""
+        return {
+            'is_seamless': self.seamless_type == 'fully_seamless',
+            'seamless_type': self.seamless_type,
+            'horizontal_seamless': self.horizontal_seamless,
+            'vertical_seamless': self.vertical_seamless,
+            'horizontal_score': self.horizontal_score,
+            'vertical_score': self.vertical_score,
+            'ai_used': self.ai_used
+        }
+
+
+# Width in pixels of the strips compared on each side of a tiled seam
+SEAM_STRIP_WIDTH = 10
+
+# Bump whenever scoring changes so persisted results are invalidated
+ALGORITHM_VERSION = 1
 
-try:
-    from .ai_seam_checker import AISeamChecker
-except ImportError:
-    # Handle case when imported directly (not as part of package)
-    from ai_seam_checker import AISeamChecker
 
 class ImageChecker:
     """
@@ -22,7 +73,12 @@ class ImageChecker:
     vertical-only, or not seamless.
     """
 
-    def __init__(self, threshold=10, use_ai=False, model_path=None):
+    # Multi-scale pyramid: original, half, quarter resolution
+    SCALES = [1.0, 0.5, 0.25]
+    # Combine multi-scale scores (weighted towards full resolution)
+    SCALE_WEIGHTS = [0.5, 0.3, 0.2]
+
+    def __init__(self, threshold=10, use_ai=False, model_path=None, ai_batch_size=16, ai_threads=None):
         """
         Initialize the ImageChecker with configuration parameters.
 
@@ -30,12 +86,81 @@ class ImageChecker:
             threshold (float): Seamlessness threshold (lower = more seamless)
             use_ai (bool): Whether to use AI classification for hybrid approach
             model_path (str): Path to AI model file (if use_ai=True)
+            ai_batch_size (int): Images per EfficientNet forward pass
+            ai_threads (int): CPU threads for AI inference (None = all cores)
         """
         self.threshold = threshold
         self.use_ai = use_ai
-        self.ai_checker = AISeamChecker(model_path) if use_ai else None
+        self.model_path = model_path
+        self.ai_batch_size = ai_batch_size
+        self.ai_threads = ai_threads
+        self._ai_checker = None
+
+    @property
+    def ai_checker(self):
+        """The AISeamChecker, created on first access and only when use_ai is enabled."""
+        if self.use_ai and self._ai_checker is None:
+            self._ai_checker = _load_ai_checker()(self.model_path, batch_size=self.ai_batch_size,
+                                                  num_threads=self.ai_threads)
+        return self._ai_checker
+
+    def analyze(self, img, run_ai=True):
+        """
+        Run the full seamless analysis once and return a SeamlessAnalysis.
+
+        The Lab conversion, the 3-level pyramid, the per-scale seam metrics and
+        the optional AI inference are each computed a single time; is_seamless(),
+        get_detailed_seamless_info(), get_seamless_score() and
+        create_tiled_preview() can all be served from the returned object.
+
+        AI inference uses the decoded `img` directly. Pass run_ai=False when the
+        caller batches inference itself and fills in ai_result afterwards.
+        """
+        if img is None or img.size == 0:
+            return SeamlessAnalysis(valid=False)
+
+        # Convert to Lab color space for perceptually uniform analysis
+        lab_img = self._convert_to_lab(img)
+
+        scale_metrics = []
+        for scale in self.SCALES:
+            scaled_img = self._scale_image(lab_img, scale)
+            scale_metrics.append(self._analyze_scale(scaled_img))
+
+        weights = self.SCALE_WEIGHTS
+        combined_horizontal = sum(m['horizontal'] * w for m, w in zip(scale_metrics, weights))
+        combined_vertical = sum(m['vertical'] * w for m, w in zip(scale_metrics, weights))
+        overall_score = sum(m['overall'] * w for m, w in zip(scale_metrics, weights))
+
+        # Determine seamless status for each direction
+        horizontal_seamless = combined_horizontal < self.threshold
+        vertical_seamless = combined_vertical < self.threshold
+
+        seamless_type = self._classify(horizontal_seamless, vertical_seamless)
+        seamless = (seamless_type == 'fully_seamless'
+                    and not self._is_stripe_pattern(combined_horizontal, combined_vertical))
 
-    def is_seamless(self, img, img_path=None):
+        # AI inference runs at most once per analysis
+        ai_result = None
+        if run_ai and self.use_ai and self.ai_checker:
+            ai_result = self.ai_checker.is_seamless_ai_batch([img])[0]
+
+        return SeamlessAnalysis(
+            seamless=seamless,
+            seamless_type=seamless_type,
+            horizontal_seamless=horizontal_seamless,
+            vertical_seamless=vertical_seamless,
+            horizontal_score=combined_horizontal,
+            vertical_score=combined_vertical,
+            overall_score=overall_score,
+            seam_vertical_score=scale_metrics[0]['seam_vertical'],
+            seam_horizontal_score=scale_metrics[0]['seam_horizontal'],
+            scale_metrics=scale_metrics,
+            ai_result=ai_result,
+            ai_used=ai_result is not None
+        )
+
+    def is_seamless(self, img, img_path=None, analysis=None):
         """
         Advanced seamless detection using research-based multi-scale analysis:
         - Lab color space conversion for perceptual uniformity
@@ -44,17 +169,16 @@ class ImageChecker:
         - MAD/RMSE, SSIM, and cross-correlation metrics
         - Canny edge detection for structural analysis
         - Optional EfficientNet-B0 AI classification
+
+        Pass a cached `analysis` from analyze() to skip recomputation.
         """
-        if img is None or img.size == 0:
+        if analysis is None:
+            analysis = self.analyze(img)
+        if not analysis.valid:
             return False
 
-        # Get traditional method result
-        traditional_result = self._get_traditional_result(img)
-
-        # Get AI result if available
-        ai_result = None
-        if self.use_ai and self.ai_checker and img_path:
-            ai_result = self.ai_checker.is_seamless_ai(img_path)
+        traditional_result = analysis.seamless
+        ai_result = analysis.ai_result
 
         # Combine results for ultra-precise detection
         if ai_result is not None:
@@ -69,88 +193,37 @@ class ImageChecker:
             # Only traditional method available
             return traditional_result
 
-    def _get_traditional_result(self, img):
-        """Get detailed results from traditional research-based method."""
-        # Convert to Lab color space for perceptually uniform analysis
-        lab_img = self._convert_to_lab(img)
-
-        # Multi-scale analysis with image pyramid
-        scales = [1.0, 0.5, 0.25]  # Original, half, quarter resolution
-
-        horizontal_scores = []
-        vertical_scores = []
-
-        for scale in scales:
-            scaled_img = self._scale_image(lab_img, scale)
-            h_score, v_score = self._analyze_tileability_detailed(scaled_img)
-            horizontal_scores.append(h_score)
-            vertical_scores.append(v_score)
-
-        # Combine multi-scale scores (weighted towards full resolution)
-        weights = [0.5, 0.3, 0.2]
-
-        combined_horizontal = sum(s * w for s, w in zip(horizontal_scores, weights))
-        combined_vertical = sum(s * w for s, w in zip(vertical_scores, weights))
-
-        # Determine seamless status for each direction
-        horizontal_seamless = combined_horizontal < self.threshold
-        vertical_seamless = combined_vertical < self.threshold
-
-        # Smart classification: if one direction tiles perfectly but the other doesn't,
-        # it might be a uniform pattern (stripes) that shouldn't be "fully seamless"
-        perfect_tile_threshold = 5.0  # Very low score indicates near-perfect tiling
-
+    def _classify(self, horizontal_seamless, vertical_seamless):
+        """Map per-direction results to a seamless_type."""
         if horizontal_seamless and vertical_seamless:
-            # Both directions are seamless - check if it's truly varied or just uniform stripes
-            if combined_vertical < perfect_tile_threshold and combined_horizontal > perfect_tile_threshold:
-                # Vertical tiles perfectly, horizontal has variation - likely horizontal stripes
-                seamless_type = 'horizontal_only'
-                is_seamless = False
-            elif combined_horizontal < perfect_tile_threshold and combined_vertical > perfect_tile_threshold:
-                # Horizontal tiles perfectly, vertical has variation - likely vertical stripes
-                seamless_type = 'vertical_only'
-                is_seamless = False
-            else:
-                # Both have reasonable variation - truly fully seamless
-                seamless_type = 'fully_seamless'
-                is_seamless = True
+            return 'fully_seamless'
         elif horizontal_seamless and not vertical_seamless:
-            seamless_type = 'horizontal_only'
-            is_seamless = False
+            return 'horizontal_only'
         elif not horizontal_seamless and vertical_seamless:
-            seamless_type = 'vertical_only'
-            is_seamless = False
-        else:
-            seamless_type = 'not_seamless'
-            is_seamless = False
+            return 'vertical_only'
+        return 'not_seamless'
 
-    def get_seamless_score(self, img, img_path=None):
-        """Get the actual seamless score from traditional method (for debugging)."""
-        if img is None or img.size == 0:
-            return float('inf')
-
-        # Get AI result if available
-        ai_result = None
-        if self.use_ai and self.ai_checker and img_path:
-            ai_result = self.ai_checker.is_seamless_ai(img_path)
-
-        # Always return traditional score for debugging, but note AI result
-        lab_img = self._convert_to_lab(img)
-
-        # Multi-scale analysis with image pyramid
-        scales = [1.0, 0.5, 0.25]  # Original, half, quarter resolution
-        seamless_scores = []
-
-        for scale in scales:
-            scaled_img = self._scale_image(lab_img, scale)
-            score = self._analyze_tileability(scaled_img)
-            seamless_scores.append(score)
+    def _is_stripe_pattern(self, combined_horizontal, combined_vertical):
+        """
+        Smart stripe check: if one direction tiles perfectly but the other
+        doesn't, it might be a uniform pattern (stripes) that shouldn't be
+        "fully seamless".
+        """
+        perfect_tile_threshold = 5.0  # Very low score indicates near-perfect tiling
 
-        # Combine multi-scale scores (weighted towards full resolution)
-        weights = [0.5, 0.3, 0.2]
-        combined_score = sum(s * w for s, w in zip(seamless_scores, weights))
+        # Vertical tiles perfectly, horizontal has variation - likely horizontal stripes
+        if combined_vertical < perfect_tile_threshold and combined_horizontal > perfect_tile_threshold:
+            return True
+        # Horizontal tiles perfectly, vertical has variation - likely vertical stripes
+        if combined_horizontal < perfect_tile_threshold and combined_vertical > perfect_tile_threshold:
+            return True
+        return False
 
-        return combined_score
+    def get_seamless_score(self, img, img_path=None, analysis=None):
+        """Get the actual seamless score from traditional method (for debugging)."""
+        if analysis is None:
+            analysis = self.analyze(img)
+        return analysis.overall_score
 
     def _convert_to_lab(self, img):
         """Convert image to Lab color space for perceptually uniform analysis."""
@@ -169,6 +242,7 @@ class ImageChecker:
             rgb_img = img_array
 
         # Convert to Lab
+        from skimage import color
         lab_img = color.rgb2lab(rgb_img)
         return lab_img
 
@@ -181,14 +255,18 @@ class ImageChecker:
         scaled = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
         return scaled
 
-    def _analyze_tileability(self, lab_img):
-        """Analyze tileability using 2x2 composite and multiple metrics."""
-        # Create 2x2 tiled composite (TexTile approach)
-        tiled_composite = self._create_tiled_composite(lab_img)
+    def _analyze_scale(self, lab_img):
+        """
+        Compute every seam metric for one pyramid level in a single pass.
 
-        # Analyze seams in the composite
-        vertical_seam_score = self._analyze_composite_seam(tiled_composite, vertical=True)
-        horizontal_seam_score = self._analyze_composite_seam(tiled_composite, vertical=False)
+        Returns a dict with the raw composite/direct scores, the combined
+        per-direction scores (with the uniform-pattern penalty applied) and
+        the unpenalized overall score used by get_seamless_score().
+        """
+        # Analyze the 2x2 tiled composite seams (TexTile approach) from the
+        # wrap-around edge strips only, without building the composite
+        vertical_seam_score = self._analyze_wrap_seam(lab_img, vertical=True)
+        horizontal_seam_score = self._analyze_wrap_seam(lab_img, vertical=False)
 
         # Also analyze direct edge comparison for additional insight
         direct_vertical = self._analyze_direct_edges(lab_img, vertical=True)
@@ -205,29 +283,6 @@ class ImageChecker:
 
         # Overall tileability score
         overall_score = (combined_vertical + combined_horizontal) / 2
-        return overall_score
-
-    def _analyze_tileability_detailed(self, lab_img):
-        """Analyze tileability and return separate horizontal and vertical scores."""
-        # Create 2x2 tiled composite (TexTile approach)
-        tiled_composite = self._create_tiled_composite(lab_img)
-
-        # Analyze seams in the composite
-        vertical_seam_score = self._analyze_composite_seam(tiled_composite, vertical=True)
-        horizontal_seam_score = self._analyze_composite_seam(tiled_composite, vertical=False)
-
-        # Also analyze direct edge comparison for additional insight
-        direct_vertical = self._analyze_direct_edges(lab_img, vertical=True)
-        direct_horizontal = self._analyze_direct_edges(lab_img, vertical=False)
-
-        # Combine scores with weights
-        composite_weight = 0.6  # More weight on composite analysis
-        direct_weight = 0.4
-
-        combined_vertical = (vertical_seam_score * composite_weight +
-                           direct_vertical * direct_weight)
-        combined_horizontal = (horizontal_seam_score * composite_weight +
-                             direct_horizontal * direct_weight)
 
         # Additional check: ensure the image has meaningful variation in both directions
         # If an image is uniform in one direction (like stripes), it shouldn't be considered seamless
@@ -237,83 +292,37 @@ class ImageChecker:
         v_variation = self._calculate_direction_variation(lab_img, vertical=True)   # Vertical variation (variation across columns)
 
         # Penalize scores if variation is too low in either direction (uniform patterns like stripes)
+        penalized_horizontal = combined_horizontal
+        penalized_vertical = combined_vertical
         if h_variation < variation_threshold:
-            combined_horizontal += 50.0  # Heavy penalty for uniform horizontal patterns
+            penalized_horizontal += 50.0  # Heavy penalty for uniform horizontal patterns
         if v_variation < variation_threshold:
-            combined_vertical += 50.0   # Heavy penalty for uniform vertical patterns
-
-        return combined_horizontal, combined_vertical
-
-    def get_detailed_seamless_info(self, img, img_path=None):
-        """Get detailed seamless information including direction-specific results."""
-        if img is None or img.size == 0:
-            return {
-                'is_seamless': False,
-                'seamless_type': 'invalid',
-                'horizontal_seamless': False,
-                'vertical_seamless': False,
-                'horizontal_score': float('inf'),
-                'vertical_score': float('inf'),
-                'ai_used': False
-            }
-
-        # Get traditional detailed results
-        lab_img = self._convert_to_lab(img)
-
-        # Multi-scale analysis with image pyramid
-        scales = [1.0, 0.5, 0.25]  # Original, half, quarter resolution
-
-        horizontal_scores = []
-        vertical_scores = []
+            penalized_vertical += 50.0   # Heavy penalty for uniform vertical patterns
 
-        for scale in scales:
-            scaled_img = self._scale_image(lab_img, scale)
-            h_score, v_score = self._analyze_tileability_detailed(scaled_img)
-            horizontal_scores.append(h_score)
-            vertical_scores.append(v_score)
-
-        # Combine multi-scale scores (weighted towards full resolution)
-        weights = [0.5, 0.3, 0.2]
-
-        combined_horizontal = sum(s * w for s, w in zip(horizontal_scores, weights))
-        combined_vertical = sum(s * w for s, w in zip(vertical_scores, weights))
+        return {
+            'seam_vertical': vertical_seam_score,
+            'seam_horizontal': horizontal_seam_score,
+            'direct_vertical': direct_vertical,
+            'direct_horizontal': direct_horizontal,
+            'horizontal': penalized_horizontal,
+            'vertical': penalized_vertical,
+            'overall': overall_score
+        }
 
-        # Determine seamless status for each direction
-        horizontal_seamless = combined_horizontal < self.threshold
-        vertical_seamless = combined_vertical < self.threshold
+    def _analyze_tileability(self, lab_img):
+        """Analyze tileability using 2x2 composite and multiple metrics."""
+        return self._analyze_scale(lab_img)['overall']
 
-        # Determine seamless type
-        if horizontal_seamless and vertical_seamless:
-            seamless_type = 'fully_seamless'
-            is_seamless = True
-        elif horizontal_seamless and not vertical_seamless:
-            seamless_type = 'horizontal_only'
-            is_seamless = False
-        elif not horizontal_seamless and vertical_seamless:
-            seamless_type = 'vertical_only'
-            is_seamless = False
-        else:
-            seamless_type = 'not_seamless'
-            is_seamless = False
-
-        # Check AI if available
-        ai_used = False
-        if self.use_ai and self.ai_checker and img_path:
-            ai_result = self.ai_checker.is_seamless_ai(img_path)
-            if ai_result is not None:
-                ai_used = True
-                # If AI disagrees with traditional method, prefer traditional for detailed analysis
-                # But for binary seamless check, use hybrid logic
+    def _analyze_tileability_detailed(self, lab_img):
+        """Analyze tileability and return separate horizontal and vertical scores."""
+        metrics = self._analyze_scale(lab_img)
+        return metrics['horizontal'], metrics['vertical']
 
-        return {
-            'is_seamless': is_seamless,
-            'seamless_type': seamless_type,
-            'horizontal_seamless': horizontal_seamless,
-            'vertical_seamless': vertical_seamless,
-            'horizontal_score': combined_horizontal,
-            'vertical_score': combined_vertical,
-            'ai_used': ai_used
-        }
+    def get_detailed_seamless_info(self, img, img_path=None, analysis=None):
+        """Get detailed seamless information including direction-specific results."""
+        if analysis is None:
+            analysis = self.analyze(img)
+        return analysis.to_detailed_info()
 
     def _create_tiled_composite(self, img):
         """Create 2x2 tiled composite to expose internal seams."""
@@ -355,6 +364,35 @@ class ImageChecker:
         metrics = self._compute_seam_metrics(edge1, edge2)
         return metrics['combined_score']
 
+    def _extract_seam_strips(self, img, vertical=True, strip_width=SEAM_STRIP_WIDTH):
+        """
+        Read the wrap-around edge strips that meet at a tiled seam.
+
+        Returns the same arrays _analyze_composite_seam() slices out of the 2x2
+        composite (the last and first `strip_width` columns/rows, repeated over
+        the two tiles the seam crosses), but reads them straight from the source
+        image so memory stays O(perimeter) instead of O(4x area).
+        """
+        if vertical:
+            # Seam between tiles A|B: last columns of A against first columns of B
+            before = img[:, -strip_width:]
+            after = img[:, :strip_width]
+            axis = 0  # the seam runs down through A/C and B/D
+        else:
+            # Seam between tiles A/C: last rows of A against first rows of C
+            before = img[-strip_width:, :]
+            after = img[:strip_width, :]
+            axis = 1  # the seam runs across A-B and C-D
+
+        return (np.concatenate([before, before], axis=axis),
+                np.concatenate([after, after], axis=axis))
+
+    def _analyze_wrap_seam(self, img, vertical=True):
+        """Analyze the tiled seam using only the wrap-around edge strips."""
+        edge1, edge2 = self._extract_seam_strips(img, vertical=vertical)
+        metrics = self._compute_seam_metrics(edge1, edge2)
+        return metrics['combined_score']
+
     def _analyze_direct_edges(self, img, vertical=True):
         """Analyze direct edges (traditional approach) for comparison."""
         h, w = img.shape[:2]
@@ -378,6 +416,8 @@ class ImageChecker:
 
     def _compute_seam_metrics(self, edge1, edge2):
         """Compute comprehensive seam metrics including MAD, SSIM, and cross-correlation."""
+        from skimage.metrics import structural_similarity as ssim
+
         # Normalize edges to 0-1 range for consistent analysis
         edge1_norm = edge1.astype(float) / 255.0 if edge1.dtype != float else edge1
         edge2_norm = edge2.astype(float) / 255.0 if edge2.dtype != float else edge2
@@ -400,15 +440,9 @@ class ImageChecker:
             ssim_score = 1.0  # If SSIM fails, assume not similar
 
         # Metric 4: Cross-correlation
-        if len(edge1.shape) == 3:
-            # For color images, compute correlation per channel and average
-            corr_scores = []
-            for c in range(edge1.shape[2]):
-                corr = self._compute_cross_correlation(edge1_norm[:, :, c], edge2_norm[:, :, c])
-                corr_scores.append(corr)
-            cross_corr_score = 1.0 - np.mean(corr_scores)  # Convert to dissimilarity
-        else:
-            cross_corr_score = 1.0 - self._compute_cross_correlation(edge1_norm, edge2_norm)
+        # For color images, correlation is computed per channel in one batch and averaged
+        corr_scores = self._compute_cross_correlation(edge1_norm, edge2_norm)
+        cross_corr_score = 1.0 - np.mean(corr_scores)  # Convert to dissimilarity
 
         # Metric 5: Canny edge analysis
         canny_score = self._analyze_canny_edges(edge1, edge2)
@@ -440,7 +474,38 @@ class ImageChecker:
         }
 
     def _compute_cross_correlation(self, img1, img2):
-        """Compute normalized cross-correlation between two images."""
+        """
+        Compute normalized cross-correlation between two images.
+
+        Accepts 2D arrays or HxWxC stacks; for stacks the score is returned per
+        channel. Seam strips always come in equal-sized pairs, for which the
+        'valid' correlation has a single lag, so the score reduces to the
+        closed-form zero-lag NCC sum(a*b) / sqrt(sum(a*a) * sum(b*b)). That is
+        evaluated with vectorized reductions instead of correlate2d.
+        """
+        if img1.shape != img2.shape:
+            if img1.ndim == 3:
+                return np.array([self._correlate2d_ncc(img1[:, :, c], img2[:, :, c])
+                                 for c in range(img1.shape[2])])
+            return self._correlate2d_ncc(img1, img2)
+
+        # Zero-lag correlation and autocorrelations, batched over channels
+        corr = np.einsum('ij...,ij...->...', img1, img2)
+        auto_corr1 = np.einsum('ij...,ij...->...', img1, img1)
+        auto_corr2 = np.einsum('ij...,ij...->...', img2, img2)
+
+        # Normalize by the geometric mean of the autocorrelations
+        norm_factor = np.sqrt(auto_corr1 * auto_corr2)
+        safe_norm = np.where(norm_factor > 0, norm_factor, 1.0)
+        normalized_corr = np.where(norm_factor > 0, corr / safe_norm, 0.0)
+
+        # Clamp to [0, 1] range
+        return np.clip(normalized_corr, 0.0, 1.0)
+
+    def _correlate2d_ncc(self, img1, img2):
+        """Normalized cross-correlation via correlate2d, for differently sized 2D inputs."""
+        from scipy import signal
+
         # Use scipy's correlate2d for 2D cross-correlation
         corr = signal.correlate2d(img1, img2, mode='valid')
         # Normalize by the geometric mean of the autocorrelations
@@ -523,8 +588,17 @@ class ImageChecker:
 
             return avg_variation * 100.0  # Scale up
 
-    def create_tiled_preview(self, img):
-        """Create a 2x2 tiled preview with seam overlay visualization."""
+
+    def create_tiled_preview(self, img, analysis=None):
+        """
+        Create a 2x2 tiled preview with seam overlay visualization.
+
+        The overlay uses the full-resolution composite seam scores from a
+        cached `analysis` when given, instead of re-analyzing the tiled image.
+        """
+        if analysis is None:
+            analysis = self.analyze(img)
+
         # Convert to BGR for OpenCV processing
         if isinstance(img, Image.Image):
             img_array = np.array(img)
@@ -542,20 +616,15 @@ class ImageChecker:
         tiled[h:2*h, 0:w] = img_array
         tiled[h:2*h, w:2*w] = img_array
 
-        # Analyze seams and add visual overlay
-        lab_tiled = self._convert_to_lab(tiled)
-        vertical_score = self._analyze_composite_seam(lab_tiled, vertical=True)
-        horizontal_score = self._analyze_composite_seam(lab_tiled, vertical=False)
-
         # Add seam overlays if seams are detected (scores above threshold)
         seam_threshold = self.threshold * 0.8  # Slightly more sensitive for visualization
 
-        if vertical_score > seam_threshold:
+        if analysis.seam_vertical_score > seam_threshold:
             # Draw vertical seam in red
             cv2.line(tiled, (w, 0), (w, 2*h), (0, 0, 255), 2)
 
-        if horizontal_score > seam_threshold:
+        if analysis.seam_horizontal_score > seam_threshold:
             # Draw horizontal seam in red
             cv2.line(tiled, (0, h), (2*w, h), (0, 0, 255), 2)
 
-        return Image.fromarray(cv2.cvtColor(tiled, cv2.COLOR_BGR2RGB))
\ No newline at end of file
+        return Image.fromarray(cv2.cvtColor(tiled, cv2.COLOR_BGR2RGB))
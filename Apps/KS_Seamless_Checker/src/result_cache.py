@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing
+
+
+class ResultCache:
+    """
+    Persistent SQLite cache of seamless check results.
+
+    Results are keyed by file content hash, checker threshold, algorithm
+    version and thumbnail size, so re-scanning an unchanged library skips the
+    analysis entirely. A (path, size, mtime) index avoids re-hashing files
+    that have not been touched since the last scan.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._db_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._init_database()
+
+    def _connect(self):
+        # Pool workers and the GUI thread may write concurrently
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def _init_database(self):
+        with self._db_lock, closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    content_hash TEXT NOT NULL,
+                    threshold REAL NOT NULL,
+                    algorithm_version INTEGER NOT NULL,
+                    thumb_size INTEGER NOT NULL,
+                    seamless INTEGER NOT NULL,
+                    seamless_type TEXT NOT NULL,
+                    horizontal_seamless INTEGER NOT NULL,
+                    vertical_seamless INTEGER NOT NULL,
+                    horizontal_score REAL NOT NULL,
+                    vertical_score REAL NOT NULL,
+                    seam_vertical_score REAL NOT NULL,
+                    seam_horizontal_score REAL NOT NULL,
+                    thumb_bytes BLOB,
+                    PRIMARY KEY (content_hash, threshold, algorithm_version, thumb_size)
+                )
+            """)
+
+    def content_hash(self, file_path):
+        """Return the SHA-256 of the file content, reusing the stored hash if size and mtime match."""
+        path = os.path.abspath(file_path)
+        st = os.stat(path)
+        with self._db_lock, closing(self._connect()) as conn:
+            row = conn.execute('SELECT size, mtime_ns, content_hash FROM files WHERE path = ?',
+                               (path,)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        with self._db_lock, closing(self._connect()) as conn, conn:
+            conn.execute('INSERT OR REPLACE INTO files (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)',
+                         (path, st.st_size, st.st_mtime_ns, content_hash))
+        return content_hash
+
+    def get(self, content_hash, threshold, algorithm_version, thumb_size):
+        """Return the cached result dict for the key, or None."""
+        with self._db_lock, closing(self._connect()) as conn:
+            row = conn.execute("""
+                SELECT seamless, seamless_type, horizontal_seamless, vertical_seamless,
+                       horizontal_score, vertical_score, seam_vertical_score,
+                       seam_horizontal_score, thumb_bytes
+                FROM results
+                WHERE content_hash = ? AND threshold = ? AND algorithm_version = ? AND thumb_size = ?
+            """, (content_hash, float(threshold), int(algorithm_version), int(thumb_size))).fetchone()
+        if row is None:
+            return None
+        return {
+            'seamless': bool(row[0]),
+            'seamless_type': row[1],
+            'horizontal_seamless': bool(row[2]),
+            'vertical_seamless': bool(row[3]),
+            'horizontal_score': row[4],
+            'vertical_score': row[5],
+            'seam_vertical_score': row[6],
+            'seam_horizontal_score': row[7],
+            'thumb_bytes': row[8] or b''
+        }
+
+    def put(self, content_hash, threshold, algorithm_version, thumb_size, entry):
+        """Store a result dict (same keys as returned by get()) for the key."""
+        with self._db_lock, closing(self._connect()) as conn, conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO results (
+                    content_hash, threshold, algorithm_version, thumb_size,
+                    seamless, seamless_type, horizontal_seamless, vertical_seamless,
+                    horizontal_score, vertical_score, seam_vertical_score,
+                    seam_horizontal_score, thumb_bytes
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                content_hash, float(threshold), int(algorithm_version), int(thumb_size),
+                int(bool(entry['seamless'])), entry['seamless_type'],
+                int(bool(entry['horizontal_seamless'])), int(bool(entry['vertical_seamless'])),
+                float(entry['horizontal_score']), float(entry['vertical_score']),
+                float(entry['seam_vertical_score']), float(entry['seam_horizontal_score']),
+                sqlite3.Binary(entry.get('thumb_bytes') or b'')
+            ))
+
+    def clear(self):
+        """Remove all cached results and file hashes."""
+        with self._db_lock, closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM results')
+            conn.execute('DELETE FROM files')
@@ -1,10 +1,14 @@
 import os
+import multiprocessing
 import tempfile
 import shutil
+from concurrent.futures.process import BrokenProcessPool
 from PIL import Image
 import numpy as np
 import cv2
+import pytest
 
+from src import batch_processor
 from src.batch_processor import BatchProcessor
 from src.image_checker import ImageChecker
 
@@ -52,6 +56,65 @@ def test_process_file_disk(tmp_path):
     assert os.path.exists(res['preview_path'])
 
 
+def make_folder(tmp_path, count):
+    for i in range(count):
+        make_temp_image(str(tmp_path / f'img_{i:02d}.png'), color=(10 * i, 50, 200 - 10 * i))
+    (tmp_path / 'notes.txt').write_text('not an image')
+
+
+def test_process_folder_parallel_matches_sequential(tmp_path):
+    make_folder(tmp_path, 5)
+    checker = ImageChecker(threshold=10)
+    processor = BatchProcessor(checker, ['.png'], str(tmp_path / 'previews'))
+
+    sequential = processor.process_folder(str(tmp_path))
+    processor.workers = 2
+    progress = []
+    parallel = processor.process_folder(str(tmp_path), progress_callback=lambda d, t, r: progress.append((d, t)))
+
+    assert [r['file'] for r in parallel] == [r['file'] for r in sequential]
+    assert [r['seamless_type'] for r in parallel] == [r['seamless_type'] for r in sequential]
+    assert progress == [(i, 5) for i in range(1, 6)]
+
+
+def test_iter_folder_streaming_and_cancel(tmp_path):
+    make_folder(tmp_path, 6)
+    processor = BatchProcessor(ImageChecker(threshold=10), ['.png'], str(tmp_path))
+    processor.workers = 2
+    processor.ordered_results = False
+
+    streamed = []
+    for r in processor.iter_folder(str(tmp_path)):
+        streamed.append(r)
+        processor.cancel()
+    assert len(streamed) == 1
+
+    # A new scan clears the previous cancellation
+    assert len(processor.process_folder(str(tmp_path))) == 6
+
+
+def _crash_worker(chunk):
+    os._exit(1)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='patched worker function only reaches forked workers')
+def test_broken_pool_is_raised(tmp_path, monkeypatch):
+    make_folder(tmp_path, 4)
+    processor = BatchProcessor(ImageChecker(threshold=10), ['.png'], str(tmp_path))
+    processor.workers = 2
+    monkeypatch.setattr(batch_processor, '_process_in_worker', _crash_worker)
+
+    with pytest.raises(BrokenProcessPool):
+        processor.process_folder(str(tmp_path))
+
+
+def test_unreadable_folder_is_raised(tmp_path):
+    processor = BatchProcessor(ImageChecker(threshold=10), ['.png'], str(tmp_path))
+    with pytest.raises(OSError):
+        processor.process_folder(str(tmp_path / 'missing'))
+
+
 if __name__ == '__main__':
     import pytest
     pytest.main([os.path.dirname(__file__)])
@@ -0,0 +1,106 @@
+import os
+import numpy as np
+from scipy import signal
+
+from src.image_checker import ImageChecker
+
+
+def make_pattern(size=128):
+    x = np.linspace(0, 4 * np.pi, size)
+    tile = ((np.sin(x)[None, :] * np.cos(x)[:, None] + 1) * 120).astype(np.uint8)
+    return np.dstack([tile, tile, tile])
+
+
+def test_analyze_matches_individual_calls():
+    img = make_pattern()
+    checker = ImageChecker(threshold=10)
+    analysis = checker.analyze(img)
+
+    assert analysis.valid
+    assert analysis.to_detailed_info() == checker.get_detailed_seamless_info(img)
+    assert analysis.overall_score == checker.get_seamless_score(img)
+    assert checker.is_seamless(img, analysis=analysis) == checker.is_seamless(img)
+    assert len(analysis.scale_metrics) == len(ImageChecker.SCALES)
+
+
+def test_analyze_invalid_image():
+    checker = ImageChecker()
+    analysis = checker.analyze(np.zeros((0, 0, 3), dtype=np.uint8))
+
+    assert not analysis.valid
+    assert checker.is_seamless(None, analysis=analysis) is False
+    assert analysis.to_detailed_info()['seamless_type'] == 'invalid'
+
+
+def test_stripe_check_only_affects_seamless_verdict():
+    checker = ImageChecker(threshold=10)
+    # Both directions under threshold, but only one tiles near-perfectly
+    assert checker._classify(True, True) == 'fully_seamless'
+    assert checker._is_stripe_pattern(8.0, 1.0)
+    assert checker._is_stripe_pattern(1.0, 8.0)
+    assert not checker._is_stripe_pattern(3.0, 2.0)
+
+    analysis = checker.analyze(make_pattern())
+    info = analysis.to_detailed_info()
+    assert info['is_seamless'] == (analysis.seamless_type == 'fully_seamless')
+    assert not analysis.seamless or info['is_seamless']
+
+
+def test_preview_from_cached_analysis():
+    img = make_pattern(64)
+    checker = ImageChecker(threshold=10)
+    analysis = checker.analyze(img)
+
+    preview = checker.create_tiled_preview(img, analysis=analysis)
+    assert preview.size == (128, 128)
+    assert np.array_equal(np.array(preview), np.array(checker.create_tiled_preview(img)))
+
+
+def test_wrap_seam_strips_match_composite():
+    rng = np.random.default_rng(0)
+    checker = ImageChecker()
+    for shape in [(64, 96, 3), (33, 47, 3), (8, 6, 3)]:
+        lab_img = checker._convert_to_lab((rng.random(shape) * 255).astype(np.uint8))
+        composite = checker._create_tiled_composite(lab_img)
+        for vertical in (True, False):
+            expected = checker._analyze_composite_seam(composite, vertical=vertical)
+            assert checker._analyze_wrap_seam(lab_img, vertical=vertical) == expected
+
+
+def reference_cross_correlation(img1, img2):
+    # Original correlate2d implementation, kept here as the regression baseline
+    corr = signal.correlate2d(img1, img2, mode='valid')
+    auto_corr1 = signal.correlate2d(img1, img1, mode='valid')
+    auto_corr2 = signal.correlate2d(img2, img2, mode='valid')
+    norm_factor = np.sqrt(np.max(auto_corr1) * np.max(auto_corr2))
+    normalized_corr = np.max(corr) / norm_factor if norm_factor > 0 else 0.0
+    return np.clip(normalized_corr, 0.0, 1.0)
+
+
+def test_cross_correlation_matches_correlate2d():
+    rng = np.random.default_rng(1)
+    checker = ImageChecker()
+    lab_img = checker._convert_to_lab((rng.random((48, 80, 3)) * 255).astype(np.uint8))
+    for vertical in (True, False):
+        edge1, edge2 = checker._extract_seam_strips(lab_img, vertical=vertical)
+        # Include a negatively correlated pair to exercise the clamp
+        for a, b in [(edge1, edge2), (edge1, -edge1), (edge1 * 0, edge2)]:
+            batched = checker._compute_cross_correlation(a, b)
+            expected = [reference_cross_correlation(a[:, :, c], b[:, :, c]) for c in range(3)]
+            assert np.allclose(batched, expected, atol=1e-9)
+            assert np.isclose(checker._compute_cross_correlation(a[:, :, 0], b[:, :, 0]),
+                              expected[0], atol=1e-9)
+
+
+def test_cross_correlation_unequal_shapes_falls_back():
+    rng = np.random.default_rng(2)
+    checker = ImageChecker()
+    a = rng.random((20, 12))
+    b = rng.random((5, 4))
+    assert np.isclose(checker._compute_cross_correlation(a, b),
+                      reference_cross_correlation(a, b))
+
+
+if __name__ == '__main__':
+    import pytest
+    pytest.main([os.path.dirname(__file__)])
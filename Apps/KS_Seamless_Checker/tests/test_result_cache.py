@@ -0,0 +1,61 @@
+import os
+from PIL import Image
+
+from src.batch_processor import BatchProcessor
+from src.image_checker import ImageChecker, ALGORITHM_VERSION
+from src.result_cache import ResultCache
+
+
+def make_temp_image(path, color=(128, 128, 128), size=(64, 64)):
+    img = Image.new('RGB', size, color)
+    img.save(path)
+
+
+def test_content_hash_reused_until_file_changes(tmp_path):
+    img_path = tmp_path / 'a.png'
+    make_temp_image(str(img_path))
+    cache = ResultCache(str(tmp_path / 'cache' / 'results.sqlite'))
+
+    first = cache.content_hash(str(img_path))
+    assert cache.content_hash(str(img_path)) == first
+
+    make_temp_image(str(img_path), color=(10, 20, 30))
+    assert cache.content_hash(str(img_path)) != first
+
+
+def test_process_file_served_from_cache(tmp_path, monkeypatch):
+    img_path = tmp_path / 'tex.png'
+    make_temp_image(str(img_path), color=(200, 50, 50))
+    checker = ImageChecker(threshold=10)
+    processor = BatchProcessor(checker, ['.png'], str(tmp_path))
+    processor.cache = ResultCache(str(tmp_path / 'results.sqlite'))
+
+    first = processor.process_file(str(img_path))
+
+    # A repeat scan must not analyze the image again
+    def fail_analyze(*args, **kwargs):
+        raise AssertionError('analyze() called for a cached file')
+    monkeypatch.setattr(checker, 'analyze', fail_analyze)
+    second = processor.process_file(str(img_path))
+
+    for key in ('seamless', 'seamless_type', 'horizontal_score', 'vertical_score', 'thumb_bytes'):
+        assert second[key] == first[key]
+
+    # Disk previews are redrawn from the cached seam scores
+    processor.preview_mode = 'disk'
+    third = processor.process_file(str(img_path))
+    assert os.path.exists(third['preview_path'])
+
+
+def test_cache_key_includes_threshold(tmp_path):
+    img_path = tmp_path / 'tex.png'
+    make_temp_image(str(img_path))
+    cache = ResultCache(str(tmp_path / 'results.sqlite'))
+    processor = BatchProcessor(ImageChecker(threshold=10), ['.png'], str(tmp_path))
+    processor.cache = cache
+    processor.process_file(str(img_path))
+
+    content_hash = cache.content_hash(str(img_path))
+    assert cache.get(content_hash, 10, ALGORITHM_VERSION, 256) is not None
+    assert cache.get(content_hash, 20, ALGORITHM_VERSION, 256) is None
+    assert cache.get(content_hash, 10, ALGORITHM_VERSION + 1, 256) is None
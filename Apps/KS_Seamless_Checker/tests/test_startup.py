@@ -0,0 +1,30 @@
+import os
+import sys
+import subprocess
+
+from src.image_checker import ImageChecker
+
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_core_import_does_not_load_heavy_modules():
+    code = ("import sys, src.image_checker, src.batch_processor; "
+            "print([m for m in ('torch', 'torchvision', 'scipy', 'skimage') if m in sys.modules])")
+    out = subprocess.run([sys.executable, '-c', code], cwd=APP_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == '[]'
+
+
+def test_ai_checker_created_lazily():
+    checker = ImageChecker(use_ai=False)
+    assert checker.ai_checker is None
+
+    checker = ImageChecker(use_ai=True)
+    # Nothing is loaded until the AI checker is first needed
+    assert checker._ai_checker is None
+
+
+if __name__ == '__main__':
+    import pytest
+    pytest.main([os.path.dirname(__file__)])